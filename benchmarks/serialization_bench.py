@@ -0,0 +1,140 @@
+"""
+Benchmark: serialization của response lịch sử (100k row).
+
+So sánh đường cũ (dựng model Pydantic cho từng row, FastAPI validate lại theo
+response_model rồi json.dumps) với đường nhanh (RowSchema kiểm tra schema một
+lần cho mỗi tập field, orjson encode một lần).
+
+Sử dụng:
+    python -m benchmarks.serialization_bench
+    python -m benchmarks.serialization_bench --rows 200000 --repeat 5
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from src.dto.btc_dominance_dto import BTCDominanceResponse
+from src.dto.gold_data_dto import GoldDataResponse
+from src.model.btc_dominance import BTCDominanceModel
+from src.model.gold_data import GoldDataModel
+from src.utils.fast_json import RowSchema, json_response
+
+
+def _gold_rows(count: int) -> List[Dict[str, Any]]:
+    """Row như `GoldDataService._to_row` trả về (còn _id, ts)"""
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        ts = start + timedelta(minutes=i)
+        rows.append(
+            {
+                "_id": f"{i:024x}",
+                "ts": ts,
+                "datetime": ts.strftime("%Y-%m-%d %H:%M:%S"),
+                "open": 2650.5 + i % 7,
+                "high": 2651.25 + i % 5,
+                "low": 2649 + i % 3,
+                "close": 2650.75,
+                "volume": i % 1000,
+            }
+        )
+    return rows
+
+
+def _btc_rows(count: int) -> List[Dict[str, Any]]:
+    """Document BTC dominance sau bước chuẩn hóa datetime/số của service"""
+    rows = []
+    for i in range(count):
+        rows.append(
+            {
+                "_id": f"{i:024x}",
+                "timestamp_ms": 1735689600000 + i * 60000,
+                "datetime": "2025-01-01",
+                "open": 57.1,
+                "high": 57.3,
+                "low": 56.9,
+                "close": 57.2,
+            }
+        )
+    return rows
+
+
+def _render(content: Any) -> bytes:
+    # Giống JSONResponse của Starlette
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def legacy_gold(rows: List[Dict[str, Any]]) -> bytes:
+    response = GoldDataResponse(data=[GoldDataModel(**row) for row in rows])
+    adapter = TypeAdapter(GoldDataResponse)
+    validated = adapter.validate_python(response.model_dump())
+    return _render(adapter.dump_python(validated, mode="json"))
+
+
+def fast_gold(rows: List[Dict[str, Any]]) -> bytes:
+    schema = RowSchema(GoldDataModel)
+    response = GoldDataResponse.model_construct(data=schema.project_all(rows))
+    return json_response(response).body
+
+
+def legacy_btc(rows: List[Dict[str, Any]]) -> bytes:
+    response = BTCDominanceResponse(
+        data=[BTCDominanceModel(**row).model_dump() for row in rows]
+    )
+    adapter = TypeAdapter(BTCDominanceResponse)
+    validated = adapter.validate_python(response.model_dump())
+    return _render(adapter.dump_python(validated, mode="json"))
+
+
+def fast_btc(rows: List[Dict[str, Any]]) -> bytes:
+    schema = RowSchema(BTCDominanceModel)
+    response = BTCDominanceResponse.model_construct(data=schema.project_all(rows))
+    return json_response(response).body
+
+
+def _best_of(fn: Callable[[list], bytes], rows: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # Mỗi lần dùng bản copy vì đường cũ không được hưởng lợi từ row đã xử lý
+        batch = [dict(row) for row in rows]
+        started = time.perf_counter()
+        fn(batch)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="History response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("gold", _gold_rows(args.rows), legacy_gold, fast_gold),
+        ("btc_dominance", _btc_rows(args.rows), legacy_btc, fast_btc),
+    ]
+
+    print(f"{'case':<15}{'rows':>9}{'legacy (s)':>13}{'fast (s)':>11}{'speedup':>10}{'bytes':>12}")
+    for name, rows, legacy, fast in cases:
+        legacy_body = legacy([dict(row) for row in rows])
+        fast_body = fast([dict(row) for row in rows])
+        if json.loads(legacy_body) != json.loads(fast_body):
+            raise SystemExit(f"{name}: fast path output differs from legacy output")
+
+        legacy_time = _best_of(legacy, rows, args.repeat)
+        fast_time = _best_of(fast, rows, args.repeat)
+        print(
+            f"{name:<15}{len(rows):>9}{legacy_time:>13.3f}{fast_time:>11.3f}"
+            f"{legacy_time / fast_time:>9.1f}x{len(fast_body):>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,4 @@
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 from src.config.variable_config import DB_BTC_DOMINANCE, DB_FUNDING_RATE, MONGO_CONFIG
 
@@ -16,6 +17,7 @@ class MongoDBConfig:
             cls._instance = super(MongoDBConfig, cls).__new__(cls)
             cls._instance.init_config()
             cls._instance._client = None
+            cls._instance._async_client = None
         return cls._instance
 
     def init_config(self):
@@ -26,30 +28,58 @@ class MongoDBConfig:
             "username": MONGO_CONFIG.get("user"),
             "password": MONGO_CONFIG.get("pass"),
             "authSource": MONGO_CONFIG.get("auth"),
+            "maxPoolSize": int(MONGO_CONFIG.get("max_pool_size") or 100),
         }
 
     @property
     def config(self):
         return self._config
 
+    def _client_kwargs(self):
+        # nếu username/password không được set, sử dụng kết nối không xác thực
+        kwargs = {}
+        if self._config.get("username"):
+            kwargs.update(
+                username=self._config.get("username"),
+                password=self._config.get("password"),
+                authSource=self._config.get("authSource"),
+            )
+        return kwargs
+
     def get_client(self):
+        """Client đồng bộ (pymongo) - dùng cho script/tool chạy ngoài event loop."""
         if self._client is None:
-            # nếu username/password không được set, sử dụng kết nối không xác thực
-            kwargs = {}
-            if self._config.get("username"):
-                kwargs.update(
-                    username=self._config.get("username"),
-                    password=self._config.get("password"),
-                    authSource=self._config.get("authSource"),
-                )
-
             self._client = MongoClient(
                 host=self._config["host"],
                 port=self._config["port"],
-                **kwargs,
+                **self._client_kwargs(),
             )
         return self._client
 
+    def get_async_client(self):
+        """Client bất đồng bộ (motor) dùng chung cho tất cả service.
+
+        Client được tạo một lần trong `lifespan` của `src/main.py` và giữ một
+        connection pool duy nhất (`maxPoolSize`), nên các request không phải
+        chờ slot của thread pool mặc định như khi dùng `run_in_executor`.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncIOMotorClient(
+                host=self._config["host"],
+                port=self._config["port"],
+                maxPoolSize=self._config["maxPoolSize"],
+                **self._client_kwargs(),
+            )
+        return self._async_client
+
+    def close(self):
+        """Đóng các client đang mở (gọi khi shutdown)."""
+        if self._async_client is not None:
+            self._async_client.close()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
 def get_db_and_collections_funding_rate():
     return (
@@ -8,6 +8,7 @@ MONGO_CONFIG = {
     "user": os.getenv("MONGO_USERNAME"),
     "pass": os.getenv("MONGO_PASSWORD"),
     "auth": os.getenv("MONGO_AUTH_SOURCE"),
+    "max_pool_size": os.getenv("MONGO_MAX_POOL_SIZE", "100"),
 }
 
 DB_FUNDING_RATE = {
@@ -36,6 +37,9 @@ DB_GOLD_DATA = {
     "database_name": "gold_db",
     "collection_history_name": "gold_minute_data",
     "collection_realtime_name": "gold_minute_data",
+    # Nến gộp sẵn: gold_candles_5m, gold_candles_15m, gold_candles_1h, gold_candles_1d
+    "collection_rollup_prefix": "gold_candles_",
+    "collection_rollup_state_name": "_rollups",
 }
 
 # Telegram Bot Configuration
@@ -50,6 +54,18 @@ MONITORING_CONFIG = {
     "funding_rate_check_interval": int(
         os.getenv("FUNDING_RATE_CHECK_INTERVAL", "3600")
     ),  # seconds (default: 1 hour)
+    "btc_dominance_check_interval": int(
+        os.getenv("BTC_DOMINANCE_CHECK_INTERVAL", "3600")
+    ),  # seconds (default: 1 hour)
+    "etf_candlestick_check_interval": int(
+        os.getenv("ETF_CANDLESTICK_CHECK_INTERVAL", "3600")
+    ),  # seconds (default: 1 hour)
+    "gold_data_check_interval": int(
+        os.getenv("GOLD_DATA_CHECK_INTERVAL", "600")
+    ),  # seconds (default: 10 minutes)
+    "check_timeout_seconds": float(
+        os.getenv("MONITORING_CHECK_TIMEOUT_SECONDS", "10")
+    ),  # per-check timeout of /crypto/check-data/all
     "expected_symbols": os.getenv("MONITORED_SYMBOLS", "BTCUSDT,ETHUSDT,BNBUSDT").split(
         ","
     ),
@@ -58,3 +74,69 @@ MONITORING_CONFIG = {
         os.getenv("TOLERANCE_MINUTES", "30")
     ),  # minutes tolerance for late data
 }
+
+# Cache Configuration
+CACHE_CONFIG = {
+    "funding_date_index_refresh_seconds": int(
+        os.getenv("FUNDING_DATE_INDEX_REFRESH_SECONDS", "60")
+    ),  # seconds between incremental refreshes of the funding date index
+    "realtime_funding_rate_refresh_seconds": float(
+        os.getenv("REALTIME_FUNDING_RATE_REFRESH_SECONDS", "5")
+    ),  # seconds between polls of the realtime funding rate collection
+    "history_cache_max_bytes": int(
+        os.getenv("HISTORY_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+    ),  # upper bound for closed-day history chunks kept in memory
+    "history_cache_ttl_seconds": float(
+        os.getenv("HISTORY_CACHE_TTL_SECONDS", "0")
+    ),  # closed-day chunks are re-read after this long (0: kept indefinitely)
+    "daily_candle_grace_seconds": float(
+        os.getenv("DAILY_CANDLE_GRACE_SECONDS", str(6 * 3600))
+    ),  # days of daily-candle datasets (BTC, ETF) stay open this long after midnight
+}
+
+# Keyset Pagination Configuration
+PAGINATION_CONFIG = {
+    "default_page_size": int(
+        os.getenv("DEFAULT_PAGE_SIZE", "1000")
+    ),  # page size when only a cursor is given
+    "max_page_size": int(
+        os.getenv("MAX_PAGE_SIZE", "10000")
+    ),  # upper bound for the limit query parameter
+}
+
+# Streaming (NDJSON/CSV) Configuration
+STREAMING_CONFIG = {
+    "batch_size": int(
+        os.getenv("STREAM_BATCH_SIZE", "1000")
+    ),  # Mongo cursor batch size and rows per flushed chunk
+    "export_batch_size": int(
+        os.getenv("EXPORT_BATCH_SIZE", "50000")
+    ),  # rows per Arrow record batch / Parquet row group
+}
+
+# Candle Rollup Configuration
+ROLLUP_CONFIG = {
+    "gold_refresh_seconds": float(
+        os.getenv("GOLD_ROLLUP_REFRESH_SECONDS", "60")
+    ),  # seconds between incremental runs of the gold rollup worker
+}
+
+# WebSocket / SSE Push Configuration
+WEBSOCKET_CONFIG = {
+    "gold_poll_seconds": float(
+        os.getenv("WS_GOLD_POLL_SECONDS", "5")
+    ),  # seconds between tail reads of gold_minute_data while someone subscribes
+    "subscriber_queue_size": int(
+        os.getenv("WS_SUBSCRIBER_QUEUE_SIZE", "256")
+    ),  # messages buffered per client; the oldest is dropped when full
+    "sse_keepalive_seconds": float(
+        os.getenv("SSE_KEEPALIVE_SECONDS", "15")
+    ),  # idle seconds before an SSE comment line keeps proxies from closing
+}
+
+# Admin API Configuration
+ADMIN_CONFIG = {
+    "api_key": os.getenv(
+        "ADMIN_API_KEY", ""
+    ),  # X-Admin-Key required by /admin routes; empty disables them
+}
@@ -0,0 +1,56 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Dict, Any, List, Optional
+from src.config.variable_config import ADMIN_CONFIG
+from src.service.index_manager import IndexManager, get_index_manager
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Các route admin yêu cầu header X-Admin-Key khớp ADMIN_API_KEY"""
+    expected = ADMIN_CONFIG.get("api_key")
+    if not expected:
+        raise HTTPException(
+            status_code=503, detail="Admin API is disabled (ADMIN_API_KEY not set)"
+        )
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, expected):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Key")
+
+
+# Create router instance
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_key)]
+)
+
+
+def _plans_response(
+    plans: List[Dict[str, Any]], indexes: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    collscan = [plan["name"] for plan in plans if plan["status"] == "COLLSCAN"]
+    return {
+        "status": "WARNING" if collscan else "OK",
+        "collscan_queries": collscan,
+        "plans": plans,
+        "indexes": indexes or [],
+    }
+
+
+@router.get("/indexes", response_model=Dict[str, Any])
+async def check_indexes(
+    manager: IndexManager = Depends(get_index_manager),
+) -> Dict[str, Any]:
+    """
+    Kiểm tra plan của các query mà service sử dụng (chỉ đọc)
+    - Chạy explain cho từng query mẫu, đánh dấu COLLSCAN nếu không dùng được index
+    """
+    return _plans_response(await manager.verify_plans())
+
+
+@router.post("/indexes", response_model=Dict[str, Any])
+async def ensure_indexes(
+    manager: IndexManager = Depends(get_index_manager),
+) -> Dict[str, Any]:
+    """
+    Tạo các index còn thiếu trên các collection production rồi kiểm tra lại plan
+    """
+    indexes = await manager.ensure_indexes()
+    return _plans_response(await manager.verify_plans(), indexes)
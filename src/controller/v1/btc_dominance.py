@@ -1,32 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional, Union
 from datetime import datetime, timedelta
 from src.service.btc_dominance_service import (
     BTCDominanceService,
     get_btc_dominance_service,
 )
 from src.dto.btc_dominance_dto import BTCDominanceRequest, BTCDominanceResponse
+from src.config.variable_config import PAGINATION_CONFIG
+from src.dto.columnar_dto import ColumnarResponse
+from src.utils.fast_json import json_response
+from src.utils.pagination import InvalidCursorError, decode_cursor
+from src.utils.resample import INTERVAL_PATTERN
+from src.utils.downsample import downsample_rows
+from src.utils.streaming import (
+    STREAM_FORMAT_PATTERN,
+    iterate_rows,
+    stream_rows,
+    watermark_headers,
+)
+from src.utils.time_fields import parse_time_value
 
 
 # Create router instance
 router = APIRouter(prefix="/crypto/btc-dominance", tags=["btc-dominance"])
 
 
-@router.get("/", response_model=BTCDominanceResponse)
+@router.get(
+    "/", response_model=Union[BTCDominanceResponse, ColumnarResponse]
+)
 async def get_btc_dominance_data(
     days: Optional[int] = None,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINATION_CONFIG["max_page_size"]),
+    cursor: Optional[str] = None,
+    interval: Optional[str] = Query(None, pattern=INTERVAL_PATTERN),
+    max_points: Optional[int] = Query(None, ge=3),
+    since: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern=STREAM_FORMAT_PATTERN),
+    layout: str = Query("rows", pattern="^(rows|columns)$"),
     service: BTCDominanceService = Depends(get_btc_dominance_service),
-) -> BTCDominanceResponse:
+) -> Union[BTCDominanceResponse, ColumnarResponse]:
     """
     BTC DOMINANCE DATA
     - /crypto/btc-dominance/?days=7 : Tham số days : Số ngày gần nhất (days = 0 : realtime)
     - /crypto/btc-dominance/?from_date=10092025&to_date=12092025 : tham số from_date , to_date format DDMMYYYY. from_date < to_date
 
+    - /crypto/btc-dominance/?days=365&format=ndjson : Stream toàn bộ khoảng dạng ndjson hoặc csv (mặc định format=json)
+    - /crypto/btc-dominance/?days=365&layout=columns : JSON dạng cột, một mảng cho mỗi field (chỉ với format=json)
+    - /crypto/btc-dominance/?days=365&limit=1000 : Phân trang keyset, truyền next_cursor của response vào tham số cursor để lấy trang tiếp theo
+    - /crypto/btc-dominance/?days=365&interval=1d : Nến OHLC gộp theo 5m, 15m, 1h, 4h, 1d hoặc 1w (timestamp_ms = đầu bucket, bỏ qua khi days=0)
+    - /crypto/btc-dominance/?days=365&max_points=2000 : Giảm còn tối đa max_points row bằng LTTB trên close (vừa kích thước chart)
+    - /crypto/btc-dominance/?since=1757462400000 : Chỉ các row mới hơn since (epoch ms hoặc ISO 8601), kèm watermark mới để dùng làm since lần sau
+
     Có thể sử dụng days hoặc from_date & to_date hoặc cả 3 tham số.
     """
 
+    # Cursor phải là giá trị next_cursor của trang trước
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Nến đã gộp nên ít, không phân trang
+    if interval is not None and (limit is not None or cursor is not None):
+        raise HTTPException(
+            status_code=400, detail="interval cannot be combined with limit or cursor"
+        )
+
+    # LTTB cần cả chuỗi nên không áp dụng trên một trang
+    if max_points is not None and (limit is not None or cursor is not None):
+        raise HTTPException(
+            status_code=400, detail="max_points cannot be combined with limit or cursor"
+        )
+
+    # since: epoch milliseconds hoặc ISO 8601, chỉ trả các row mới hơn
+    since_dt = None
+    if since is not None:
+        since_dt = parse_time_value(since)
+        if since_dt is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid since. Use epoch milliseconds or ISO 8601",
+            )
+        if limit is not None or cursor is not None or interval is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="since cannot be combined with limit, cursor or interval",
+            )
+
     # Validation logic
     if from_date is not None or to_date is not None:
         # Nếu có from_date hoặc to_date thì phải có đủ cả hai
@@ -65,6 +128,51 @@ async def get_btc_dominance_data(
         # Nếu không có tham số nào, mặc định days=1
         days = 1
 
-    request = BTCDominanceRequest(days=days, from_date=from_date, to_date=to_date)
-    response = await service.get_btc_dominance_data(request)
-    return response
+    request = BTCDominanceRequest(
+        days=days,
+        from_date=from_date,
+        to_date=to_date,
+        limit=limit,
+        cursor=cursor,
+        interval=interval,
+        since=since_dt,
+    )
+    if output_format != "json" and max_points is None and since_dt is None:
+        return stream_rows(
+            service.stream_btc_dominance_data(request),
+            output_format,
+            service.COLUMNS,
+            "btc-dominance",
+        )
+
+    # Cursor hợp lệ nhưng của route/thứ tự sort khác: service raise lại khi đọc trang
+    try:
+        response = await service.get_btc_dominance_data(request)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if max_points is not None:
+        # Response dùng chung qua single-flight: tạo mới, không sửa tại chỗ
+        response = BTCDominanceResponse.model_construct(
+            data=downsample_rows(response.data, max_points, "timestamp_ms"),
+            watermark=response.watermark,
+        )
+
+    if output_format != "json":
+        # Kết quả đã nằm trong bộ nhớ (since/max_points): watermark đi qua header
+        return stream_rows(
+            iterate_rows(response.data),
+            output_format,
+            service.COLUMNS,
+            "btc-dominance",
+            watermark_headers(response.watermark),
+        )
+
+    # Dữ liệu đã được chuẩn hóa ở service: encode thẳng bằng orjson, không validate lại
+    if layout == "columns":
+        return json_response(
+            ColumnarResponse.from_rows(
+                response.data, service.COLUMNS, response.next_cursor, response.watermark
+            )
+        )
+    return json_response(response)
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any, Optional, Union
 from src.service.etf_candlestick_service import (
     ETFCandlestickService,
     get_etf_candlestick_service,
@@ -8,20 +8,42 @@ from src.dto.etf_candlestick_dto import (
     ETFCandlestickRequest,
     ETFCandlestickResponse,
 )
+from src.config.variable_config import PAGINATION_CONFIG
+from src.dto.columnar_dto import ColumnarResponse
+from src.utils.fast_json import json_response
+from src.utils.pagination import InvalidCursorError, decode_cursor
+from src.utils.resample import INTERVAL_PATTERN
+from src.utils.downsample import downsample_rows
+from src.utils.streaming import (
+    STREAM_FORMAT_PATTERN,
+    iterate_rows,
+    stream_rows,
+    watermark_headers,
+)
+from src.utils.time_fields import parse_time_value
 
 
 # Create router instance
 router = APIRouter(prefix="/crypto/etf-candlestick", tags=["etf-candlestick"])
 
 
-@router.get("/", response_model=ETFCandlestickResponse)
+@router.get(
+    "/", response_model=Union[ETFCandlestickResponse, ColumnarResponse]
+)
 async def get_etf_candlestick_data(
     symbol: str = "FUEVN100",
     day: int = 1,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINATION_CONFIG["max_page_size"]),
+    cursor: Optional[str] = None,
+    interval: Optional[str] = Query(None, pattern=INTERVAL_PATTERN),
+    max_points: Optional[int] = Query(None, ge=3),
+    since: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern=STREAM_FORMAT_PATTERN),
+    layout: str = Query("rows", pattern="^(rows|columns)$"),
     service: ETFCandlestickService = Depends(get_etf_candlestick_service),
-) -> ETFCandlestickResponse:
+) -> Union[ETFCandlestickResponse, ColumnarResponse]:
     """
     ETF Candlestick data
 
@@ -30,9 +52,94 @@ async def get_etf_candlestick_data(
 
     - /crypto/etf-candlestick/?symbol=symbol&days=7 : Tham số days : Số ngày gần nhất (days = 0 : realtime)
     - /crypto/etf-candlestick/?symbol=symbol&from_date=10092025&to_date=12092025 : tham số from_date , to_date format DDMMYYYY. from_date < to_date
+    - /crypto/etf-candlestick/?symbol=symbol&day=365&format=csv : Stream toàn bộ khoảng dạng ndjson hoặc csv (mặc định format=json)
+    - /crypto/etf-candlestick/?symbol=symbol&day=30&layout=columns : JSON dạng cột, một mảng cho mỗi field (chỉ với format=json)
+    - /crypto/etf-candlestick/?symbol=symbol&day=365&limit=1000 : Phân trang keyset, truyền next_cursor của response vào tham số cursor để lấy trang tiếp theo
+    - /crypto/etf-candlestick/?symbol=symbol&day=365&interval=1w : Nến OHLC gộp theo 5m, 15m, 1h, 4h, 1d hoặc 1w (datetime = đầu bucket, bỏ qua khi day=0)
+    - /crypto/etf-candlestick/?symbol=symbol&day=365&max_points=500 : Giảm còn tối đa max_points row bằng LTTB trên close (vừa kích thước chart)
+    - /crypto/etf-candlestick/?symbol=symbol&since=1757462400000 : Chỉ các row mới hơn since (epoch ms hoặc ISO 8601), kèm watermark mới để dùng làm since lần sau
     """
+
+    # Cursor phải là giá trị next_cursor của trang trước
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Nến đã gộp nên ít, không phân trang
+    if interval is not None and (limit is not None or cursor is not None):
+        raise HTTPException(
+            status_code=400, detail="interval cannot be combined with limit or cursor"
+        )
+
+    # LTTB cần cả chuỗi nên không áp dụng trên một trang
+    if max_points is not None and (limit is not None or cursor is not None):
+        raise HTTPException(
+            status_code=400, detail="max_points cannot be combined with limit or cursor"
+        )
+
+    # since: epoch milliseconds hoặc ISO 8601, chỉ trả các row mới hơn
+    since_dt = None
+    if since is not None:
+        since_dt = parse_time_value(since)
+        if since_dt is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid since. Use epoch milliseconds or ISO 8601",
+            )
+        if limit is not None or cursor is not None or interval is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="since cannot be combined with limit, cursor or interval",
+            )
+
     request = ETFCandlestickRequest(
-        day=day, symbol=symbol, from_date=from_date, to_date=to_date
+        day=day,
+        symbol=symbol,
+        from_date=from_date,
+        to_date=to_date,
+        limit=limit,
+        cursor=cursor,
+        interval=interval,
+        since=since_dt,
     )
-    result = await service.get_etf_candlestick_data(request)
-    return result
+    if output_format != "json" and max_points is None and since_dt is None:
+        return stream_rows(
+            service.stream_etf_candlestick_data(request),
+            output_format,
+            service.COLUMNS,
+            f"etf-candlestick-{symbol}",
+        )
+
+    # Cursor hợp lệ nhưng của route/thứ tự sort khác: service raise lại khi đọc trang
+    try:
+        result = await service.get_etf_candlestick_data(request)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if max_points is not None:
+        # Response dùng chung qua single-flight: tạo mới, không sửa tại chỗ
+        result = ETFCandlestickResponse.model_construct(
+            data=downsample_rows(result.data, max_points, "datetime"),
+            watermark=result.watermark,
+        )
+
+    if output_format != "json":
+        # Kết quả đã nằm trong bộ nhớ (since/max_points): watermark đi qua header
+        return stream_rows(
+            iterate_rows(result.data),
+            output_format,
+            service.COLUMNS,
+            f"etf-candlestick-{symbol}",
+            watermark_headers(result.watermark),
+        )
+
+    # Dữ liệu đã được chuẩn hóa ở service: encode thẳng bằng orjson, không validate lại
+    if layout == "columns":
+        return json_response(
+            ColumnarResponse.from_rows(
+                result.data, service.COLUMNS, result.next_cursor, result.watermark
+            )
+        )
+    return json_response(result)
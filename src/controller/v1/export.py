@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, Tuple
+from datetime import datetime, timedelta
+from src.service.export_service import (
+    MEDIA_TYPES,
+    ExportService,
+    get_export_service,
+)
+
+
+# Create router instance
+router = APIRouter(prefix="/crypto/export", tags=["export"])
+
+_FORMAT_PATTERN = "^(arrow|parquet)$"
+_EXTENSIONS = {"arrow": "arrows", "parquet": "parquet"}
+
+
+def _resolve_range(
+    day: Optional[int], from_date: Optional[str], to_date: Optional[str]
+) -> Tuple[datetime, datetime]:
+    """Khoảng thời gian export: from_date & to_date (DDMMYYYY) hoặc day ngày gần nhất"""
+    if from_date is not None or to_date is not None:
+        # Nếu có from_date hoặc to_date thì phải có đủ cả hai
+        if from_date is None or to_date is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Both from_date and to_date are required when using date range",
+            )
+        try:
+            from_dt = datetime.strptime(from_date, "%d%m%Y")
+            to_dt = datetime.strptime(to_date, "%d%m%Y")
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="Invalid date format. Use DDMMYYYY format"
+            )
+        if from_dt >= to_dt:
+            raise HTTPException(
+                status_code=400, detail="from_date must be less than to_date"
+            )
+        return from_dt, to_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    end_date = datetime.now()
+    return end_date - timedelta(days=day if day is not None else 1), end_date
+
+
+def _export_response(chunks, output_format: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[output_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{_EXTENSIONS[output_format]}"'
+        },
+    )
+
+
+def _require_pyarrow(service: ExportService) -> None:
+    if not service.available():
+        raise HTTPException(
+            status_code=501, detail="Export requires pyarrow, which is not installed"
+        )
+
+
+@router.get("/gold-data")
+async def export_gold_data(
+    day: Optional[int] = Query(None, ge=1),
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    output_format: str = Query("arrow", alias="format", pattern=_FORMAT_PATTERN),
+    service: ExportService = Depends(get_export_service),
+) -> StreamingResponse:
+    """
+    Export gold minute data (Arrow IPC stream hoặc Parquet)
+    - /crypto/export/gold-data?from_date=01012024&to_date=31122024&format=parquet
+    - /crypto/export/gold-data?day=30 : 30 ngày gần nhất, mặc định format=arrow
+
+    Cột: datetime (timestamp[ms]), open, high, low, close, volume (float64), theo thời gian tăng dần.
+    Đọc bằng pyarrow.ipc.open_stream / pandas.read_parquet / polars.read_ipc_stream.
+    """
+    _require_pyarrow(service)
+    start_date, end_date = _resolve_range(day, from_date, to_date)
+    return _export_response(
+        service.export_gold_data(start_date, end_date, output_format),
+        output_format,
+        f"gold-data-{start_date:%Y%m%d}-{end_date:%Y%m%d}",
+    )
+
+
+@router.get("/etf-candlestick")
+async def export_etf_candlestick_data(
+    symbol: str = "FUEVN100",
+    day: Optional[int] = Query(None, ge=1),
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    output_format: str = Query("arrow", alias="format", pattern=_FORMAT_PATTERN),
+    service: ExportService = Depends(get_export_service),
+) -> StreamingResponse:
+    """
+    Export ETF candlestick data của một symbol (Arrow IPC stream hoặc Parquet)
+    - /crypto/export/etf-candlestick?symbol=FUEVN100&from_date=01012024&to_date=31122024&format=parquet
+    - /crypto/export/etf-candlestick?symbol=FUEVN100&day=365 : mặc định format=arrow
+
+    Cột: symbol, datetime (timestamp[ms]), open, high, low, close, volume (float64), theo thời gian tăng dần.
+    """
+    _require_pyarrow(service)
+    start_date, end_date = _resolve_range(day, from_date, to_date)
+    return _export_response(
+        service.export_etf_candlestick_data(
+            symbol, start_date, end_date, output_format
+        ),
+        output_format,
+        f"etf-candlestick-{symbol}-{start_date:%Y%m%d}-{end_date:%Y%m%d}",
+    )
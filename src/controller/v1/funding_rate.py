@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
 from src.service.funding_rate_service import (
     FundingRateService,
     get_funding_rate_service,
@@ -9,6 +10,12 @@ from src.dto.funding_rate_dto import (
     RealtimeFundingRateRequest,
     RealtimeFundingRateResponse,
 )
+from src.config.variable_config import PAGINATION_CONFIG
+from src.dto.columnar_dto import ColumnarResponse
+from src.utils.fast_json import json_response
+from src.utils.pagination import InvalidCursorError, decode_cursor
+from src.utils.streaming import STREAM_FORMAT_PATTERN, stream_rows
+from src.utils.time_fields import parse_time_value
 
 
 # Historical Funding Rate Router
@@ -17,24 +24,60 @@ funding_rate_router = APIRouter(
 )
 
 
-@funding_rate_router.get("/", response_model=FundingRateResponse)
+@funding_rate_router.get(
+    "/", response_model=Union[FundingRateResponse, ColumnarResponse]
+)
 async def get_funding_rate_controller(
     symbols: str = "BTCUSDT",
     days: int = 1,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINATION_CONFIG["max_page_size"]),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern=STREAM_FORMAT_PATTERN),
+    layout: str = Query("rows", pattern="^(rows|columns)$"),
     service: FundingRateService = Depends(get_funding_rate_service),
-) -> FundingRateResponse:
+) -> Union[FundingRateResponse, ColumnarResponse]:
     """
     Lấy dữ liệu lịch sử funding rate
 
     Tham số:
     - symbols: Lấy nhiều hơn 2 mã giao dịch cách nhau bởi dấu phẩy (ví dụ: "BTCUSDT,ETHUSDT")
     - days: Số ngày cần lấy
+    - format: json (mặc định), ndjson hoặc csv. ndjson/csv stream toàn bộ kết quả theo batch
+    - layout: rows (mặc định) hoặc columns : JSON dạng cột, một mảng cho mỗi field (chỉ với format=json)
+    - limit, cursor: Phân trang keyset, truyền next_cursor của response vào tham số cursor để lấy trang tiếp theo
 
     Ví dụ: /crypto/funding_rate_historical/?symbols=BTCUSDT,ETHUSDT&days=7
     """
-    request = FundingRateRequest(symbols=symbols, days=days)
-    response = await service.get_funding_rate_data(request)
-    return response
+
+    # Cursor phải là giá trị next_cursor của trang trước
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    request = FundingRateRequest(
+        symbols=symbols, days=days, limit=limit, cursor=cursor
+    )
+    if output_format != "json":
+        return stream_rows(
+            service.stream_funding_rate_data(request),
+            output_format,
+            service.COLUMNS,
+            "funding-rate-historical",
+        )
+
+    # Cursor hợp lệ nhưng của route/thứ tự sort khác: service raise lại khi đọc trang
+    try:
+        response = await service.get_funding_rate_data(request)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Dữ liệu đã được chuẩn hóa ở service: encode thẳng bằng orjson, không validate lại
+    if layout == "columns":
+        return json_response(
+            ColumnarResponse.from_rows(response.data, service.COLUMNS, response.next_cursor)
+        )
+    return json_response(response)
 
 
 # Realtime Funding Rate Router
@@ -46,6 +89,7 @@ realtime_funding_rate_router = APIRouter(
 @realtime_funding_rate_router.get("/", response_model=RealtimeFundingRateResponse)
 async def get_realtime_funding_rate_controller(
     symbols: str = "BTCUSDT",
+    since: Optional[str] = None,
     service: FundingRateService = Depends(get_funding_rate_service),
 ) -> RealtimeFundingRateResponse:
     """
@@ -54,9 +98,20 @@ async def get_realtime_funding_rate_controller(
     Tham số:
     - symbols: Lấy nhiều hơn 2 mã giao dịch thì viết cách nhau bởi dấu phẩy (ví dụ: "BTCUSDT,ETHUSDT")
 
+    - since: epoch milliseconds hoặc ISO 8601, chỉ trả các symbol cập nhật sau since, kèm watermark mới để dùng làm since lần sau
+
     Ví dụ: /crypto/funding_rate_realtime/?symbols=BTCUSDT,ETHUSDT
     """
-    request = RealtimeFundingRateRequest(symbols=symbols)
+    since_dt = None
+    if since is not None:
+        since_dt = parse_time_value(since)
+        if since_dt is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid since. Use epoch milliseconds or ISO 8601",
+            )
+
+    request = RealtimeFundingRateRequest(symbols=symbols, since=since_dt)
     response = await service.get_realtime_funding_rate_data(request)
     return response
 
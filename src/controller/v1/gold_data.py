@@ -1,32 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional, Union
 from datetime import datetime, timedelta
 from src.service.gold_data_service import (
     GoldDataService,
     get_gold_data_service,
 )
 from src.dto.gold_data_dto import GoldDataRequest, GoldDataResponse
+from src.service.push_hub import PushHub, get_push_hub
+from src.config.variable_config import PAGINATION_CONFIG
+from src.dto.columnar_dto import ColumnarResponse
+from src.utils.fast_json import json_response
+from src.utils.pagination import InvalidCursorError, decode_cursor
+from src.utils.resample import INTERVAL_PATTERN
+from src.utils.downsample import downsample_rows
+from src.utils.streaming import (
+    STREAM_FORMAT_PATTERN,
+    iterate_rows,
+    stream_rows,
+    watermark_headers,
+)
+from src.utils.time_fields import local_ms, parse_time_value
 
 
 # Create router instance
 router = APIRouter(prefix="/crypto/gold-data", tags=["gold-data"])
 
 
-@router.get("/", response_model=GoldDataResponse)
+@router.get(
+    "/", response_model=Union[GoldDataResponse, ColumnarResponse]
+)
 async def get_gold_data(
     day: Optional[int] = None,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=PAGINATION_CONFIG["max_page_size"]),
+    cursor: Optional[str] = None,
+    interval: Optional[str] = Query(None, pattern=INTERVAL_PATTERN),
+    max_points: Optional[int] = Query(None, ge=3),
+    since: Optional[str] = None,
+    output_format: str = Query("json", alias="format", pattern=STREAM_FORMAT_PATTERN),
+    layout: str = Query("rows", pattern="^(rows|columns)$"),
     service: GoldDataService = Depends(get_gold_data_service),
-) -> GoldDataResponse:
+) -> Union[GoldDataResponse, ColumnarResponse]:
     """
     GOLD DATA
     - /crypto/gold-data/?day=7 : Parameter day : Number of recent days (day = 0 : realtime)
     - /crypto/gold-data/?from_date=10092025&to_date=12092025 : Parameters from_date , to_date format DDMMYYYY. from_date < to_date
 
+    - /crypto/gold-data/?day=90&format=csv : Stream the whole range as ndjson or csv (format=json by default)
+    - /crypto/gold-data/?day=7&layout=columns : Columnar JSON, one array per field (json format only)
+    - /crypto/gold-data/?day=30&limit=1000 : Keyset pagination, pass next_cursor of the response as cursor to get the next page
+    - /crypto/gold-data/?day=30&interval=1h : OHLC bars of 5m, 15m, 1h, 4h, 1d or 1w (datetime = bucket start, ignored for day=0)
+    - /crypto/gold-data/?day=30&max_points=2000 : Downsample to at most max_points rows with LTTB on close (chart-sized responses)
+    - /crypto/gold-data/?since=1757462400000 : Only rows newer than since (epoch ms or ISO 8601), with the new watermark to pass as the next since
+
     Can use day or from_date & to_date or all 3 parameters.
+
+    Gold datetimes are the server's local wall-clock time. since and the watermark
+    are real epoch ms; an ISO 8601 since with an offset is converted to local time,
+    one without an offset is taken as local time.
     """
 
+    # Cursor phải là giá trị next_cursor của trang trước
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # Bar đã được gộp nên nhỏ, không phân trang
+    if interval is not None and (limit is not None or cursor is not None):
+        raise HTTPException(
+            status_code=400, detail="interval cannot be combined with limit or cursor"
+        )
+
+    # LTTB cần cả chuỗi nên không áp dụng trên một trang
+    if max_points is not None and (limit is not None or cursor is not None):
+        raise HTTPException(
+            status_code=400, detail="max_points cannot be combined with limit or cursor"
+        )
+
+    # since: epoch milliseconds or ISO 8601, only rows newer than it
+    since_dt = None
+    if since is not None:
+        since_dt = parse_time_value(since, local=True)
+        if since_dt is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid since. Use epoch milliseconds or ISO 8601",
+            )
+        if limit is not None or cursor is not None or interval is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="since cannot be combined with limit, cursor or interval",
+            )
+
     # Validation logic
     if from_date is not None or to_date is not None:
         # Nếu có from_date hoặc to_date thì phải có đủ cả hai
@@ -64,6 +133,86 @@ async def get_gold_data(
         # Nếu không có tham số nào, mặc định day=1
         day = 1
 
-    request = GoldDataRequest(day=day, from_date=from_date, to_date=to_date)
-    result = await service.get_gold_data(request)
-    return result
+    request = GoldDataRequest(
+        day=day,
+        from_date=from_date,
+        to_date=to_date,
+        limit=limit,
+        cursor=cursor,
+        interval=interval,
+        since=since_dt,
+    )
+    if output_format != "json" and max_points is None and since_dt is None:
+        return stream_rows(
+            service.stream_gold_data(request),
+            output_format,
+            service.COLUMNS,
+            "gold-data",
+        )
+
+    # Cursor hợp lệ nhưng của route/thứ tự sort khác: service raise lại khi đọc trang
+    try:
+        result = await service.get_gold_data(request)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if max_points is not None:
+        # Response dùng chung qua single-flight: tạo mới, không sửa tại chỗ
+        result = GoldDataResponse.model_construct(
+            data=downsample_rows(result.data, max_points, "datetime"),
+            watermark=result.watermark,
+        )
+
+    if output_format != "json":
+        # Result is already in memory (since/max_points): watermark goes in a header
+        return stream_rows(
+            iterate_rows(result.data),
+            output_format,
+            service.COLUMNS,
+            "gold-data",
+            watermark_headers(result.watermark),
+        )
+
+    # Rows are already normalized by the service: encode with orjson, no re-validation
+    if layout == "columns":
+        return json_response(
+            ColumnarResponse.from_rows(
+                result.data, service.COLUMNS, result.next_cursor, result.watermark
+            )
+        )
+    return json_response(result)
+
+
+@router.get("/stream")
+async def stream_gold_bars(
+    request: Request,
+    since: Optional[str] = None,
+    hub: PushHub = Depends(get_push_hub),
+) -> StreamingResponse:
+    """
+    GOLD BARS (Server-Sent Events)
+    - /crypto/gold-data/stream : Each new gold minute bar exactly once, event "bar", id = ts in epoch ms
+    - /crypto/gold-data/stream?since=1757462400000 : Replay bars newer than since (epoch ms or ISO 8601) first
+
+    On reconnect the browser sends Last-Event-ID, which takes precedence over since,
+    so no bar is missed or repeated. Consumers that fall too far behind are disconnected.
+
+    Event ids are real epoch ms of the bar's local wall-clock datetime; since follows
+    the same rules as on /crypto/gold-data/.
+    """
+    last_event_id = request.headers.get("last-event-id") or since
+    resume_from = None
+    if last_event_id is not None:
+        parsed = parse_time_value(last_event_id, local=True)
+        if parsed is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid since. Use epoch milliseconds or ISO 8601",
+            )
+        resume_from = local_ms(parsed)
+
+    return StreamingResponse(
+        hub.gold_event_stream(resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from typing import Dict, Any
-from src.service.monitoring_services import (
-    FundingRateMonitoringService,
-    BTCDominanceMonitoringService,
-    ETFCandlestickMonitoringService,
-    get_funding_rate_monitoring_service,
-    get_btc_dominance_monitoring_service,
-    get_etf_candlestick_monitoring_service,
+from src.service.monitoring_scheduler import (
+    BTC_DOMINANCE_CHECK,
+    ETF_CANDLESTICK_CHECK,
+    FUNDING_RATE_CHECK,
+    GOLD_DATA_CHECK,
+    MonitoringScheduler,
+    get_monitoring_scheduler,
 )
 
 
@@ -16,42 +16,71 @@ router = APIRouter(prefix="/crypto/check-data", tags=["crypto-monitoring"])
 
 @router.get("/funding-rate", response_model=Dict[str, Any])
 async def check_funding_rate(
-    service: FundingRateMonitoringService = Depends(
-        get_funding_rate_monitoring_service
-    ),
+    refresh: bool = Query(False, description="Chạy check trực tiếp thay vì đọc cache"),
+    scheduler: MonitoringScheduler = Depends(get_monitoring_scheduler),
 ) -> Dict[str, Any]:
     """
     Kiểm tra dữ liệu funding rate theo chu kỳ 8h, 4h, 1h
     - 8h: Kiểm tra theo mốc thời gian 00:00, 08:00, 16:00
     - 4h: Kiểm tra theo mốc thời gian 00:00, 04:00, 08:00, 12:00, 16:00, 20:00
     - 1h: Kiểm tra mỗi giờ
+
+    Trả kết quả mới nhất của scheduler; `refresh=true` để chạy check ngay.
     """
-    result = await service.check_funding_rate()
+    result = await scheduler.get_result(FUNDING_RATE_CHECK, refresh)
     return result
 
 
 @router.get("/btc-dominance", response_model=Dict[str, Any])
 async def check_btc_dominance(
-    service: BTCDominanceMonitoringService = Depends(
-        get_btc_dominance_monitoring_service
-    ),
+    refresh: bool = Query(False, description="Chạy check trực tiếp thay vì đọc cache"),
+    scheduler: MonitoringScheduler = Depends(get_monitoring_scheduler),
 ) -> Dict[str, Any]:
     """
     Check BTC Dominance có được cập nhật gần đây không
+    - Trả kết quả mới nhất của scheduler; `refresh=true` để chạy check ngay
     """
-    result = await service.check_btc_dominance()
+    result = await scheduler.get_result(BTC_DOMINANCE_CHECK, refresh)
     return result
 
 
 @router.get("/etf-candlestick", response_model=Dict[str, Any])
 async def check_etf_candlestick(
-    service: ETFCandlestickMonitoringService = Depends(
-        get_etf_candlestick_monitoring_service
-    ),
+    refresh: bool = Query(False, description="Chạy check trực tiếp thay vì đọc cache"),
+    scheduler: MonitoringScheduler = Depends(get_monitoring_scheduler),
 ) -> Dict[str, Any]:
     """
     Check ETF candle stick có được cập nhật gần đây không
     - Kiểm tra tất cả symbols ETF có dữ liệu gần đây không
+    - Trả kết quả mới nhất của scheduler; `refresh=true` để chạy check ngay
+    """
+    result = await scheduler.get_result(ETF_CANDLESTICK_CHECK, refresh)
+    return result
+
+
+@router.get("/gold-data", response_model=Dict[str, Any])
+async def check_gold_data(
+    refresh: bool = Query(False, description="Chạy check trực tiếp thay vì đọc cache"),
+    scheduler: MonitoringScheduler = Depends(get_monitoring_scheduler),
+) -> Dict[str, Any]:
+    """
+    Check gold minute data có được cập nhật gần đây không
+    - Trả kết quả mới nhất của scheduler; `refresh=true` để chạy check ngay
+    """
+    result = await scheduler.get_result(GOLD_DATA_CHECK, refresh)
+    return result
+
+
+@router.get("/all", response_model=Dict[str, Any])
+async def check_all(
+    refresh: bool = Query(False, description="Chạy check trực tiếp thay vì đọc cache"),
+    scheduler: MonitoringScheduler = Depends(get_monitoring_scheduler),
+) -> Dict[str, Any]:
+    """
+    Check funding rate, BTC dominance, ETF candlestick và gold data cùng lúc
+    - Các check chạy song song, mỗi check có timeout riêng
+      (MONITORING_CHECK_TIMEOUT_SECONDS); check quá hạn có status TIMEOUT
+    - overall_status là status nặng nhất (OK < WARNING < ERROR)
     """
-    result = await service.check_etf_candlestick()
+    result = await scheduler.check_all(refresh)
     return result
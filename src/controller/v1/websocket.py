@@ -0,0 +1,95 @@
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+
+from src.service.push_hub import PushHub, Subscriber, get_push_hub
+from src.utils.fast_json import encode_json
+
+
+# Create router instance
+router = APIRouter(prefix="/crypto/ws", tags=["websocket"])
+
+
+def _parse_channels(value) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    return [str(channel).strip() for channel in value if str(channel).strip()]
+
+
+def _subscribe(hub: PushHub, subscriber: Subscriber, channels: List[str]) -> None:
+    invalid = hub.subscribe(subscriber, channels)
+    reply = {"subscribed": sorted(subscriber.channels)}
+    if invalid:
+        reply["invalid"] = invalid
+    subscriber.push(encode_json(reply).decode())
+
+
+async def _receive(websocket: WebSocket, hub: PushHub, subscriber: Subscriber):
+    """Đọc lệnh subscribe/unsubscribe của client"""
+    while True:
+        try:
+            message = await websocket.receive_json()
+        except (ValueError, KeyError):
+            subscriber.push(encode_json({"error": "Invalid JSON message"}).decode())
+            continue
+        if not isinstance(message, dict):
+            message = {}
+
+        action = message.get("action")
+        channels = _parse_channels(message.get("channels"))
+        if action == "subscribe":
+            _subscribe(hub, subscriber, channels)
+        elif action == "unsubscribe":
+            hub.unsubscribe(subscriber, channels)
+            reply = {"subscribed": sorted(subscriber.channels)}
+            subscriber.push(encode_json(reply).decode())
+        else:
+            error = {"error": "action must be subscribe or unsubscribe"}
+            subscriber.push(encode_json(error).decode())
+
+
+async def _send(websocket: WebSocket, subscriber: Subscriber):
+    """Chuyển message từ hàng đợi của subscriber xuống socket"""
+    while True:
+        message = await subscriber.queue.get()
+        await websocket.send_text(message)
+
+
+@router.websocket("/")
+async def push_channel(
+    websocket: WebSocket,
+    channels: Optional[str] = None,
+    hub: PushHub = Depends(get_push_hub),
+):
+    """
+    Kênh push realtime thay cho polling
+    - /crypto/ws/?channels=funding:BTCUSDT,gold : subscribe ngay khi kết nối
+    - Channel: funding:<SYMBOL> (funding rate realtime), gold (bar phút mới của gold)
+    - Gửi {"action": "subscribe" | "unsubscribe", "channels": ["funding:ETHUSDT"]} để đổi channel
+    - Message: {"channel": ..., "data": ...}; gold kèm watermark (epoch ms)
+    - Channel funding nhận ngay bản ghi mới nhất khi subscribe
+    """
+    await websocket.accept()
+    subscriber = hub.connect()
+    try:
+        if channels:
+            _subscribe(hub, subscriber, _parse_channels(channels))
+
+        tasks = {
+            asyncio.create_task(_receive(websocket, hub, subscriber)),
+            asyncio.create_task(_send(websocket, subscriber)),
+        }
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            # Client ngắt kết nối là kết thúc bình thường
+            if not task.cancelled() and not isinstance(
+                task.exception(), WebSocketDisconnect
+            ):
+                task.result()
+    finally:
+        hub.disconnect(subscriber)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
@@ -8,10 +9,16 @@ class BTCDominanceRequest(BaseModel):
     days: Optional[int] = None
     from_date: Optional[str] = None
     to_date: Optional[str] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    interval: Optional[str] = None
+    since: Optional[datetime] = None
 
 
 class BTCDominanceResponse(BaseModel):
     data: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    watermark: Optional[int] = None
 
 
 class RealtimeBTCDominanceRequest(BaseModel):
@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class ColumnarResponse(BaseModel):
+    """Response dạng cột (layout=columns): một mảng cho mỗi field, cùng thứ tự row"""
+
+    columns: Dict[str, List[Any]]
+    count: int
+    next_cursor: Optional[str] = None
+    watermark: Optional[int] = None
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Any],
+        fields: List[str],
+        next_cursor: Optional[str] = None,
+        watermark: Optional[int] = None,
+    ) -> "ColumnarResponse":
+        """Chuyển các row (dict hoặc model) thành các cột theo thứ tự `fields`"""
+        columns: Dict[str, List[Any]] = {field: [] for field in fields}
+        count = 0
+        for row in rows:
+            if isinstance(row, dict):
+                for field in fields:
+                    columns[field].append(row.get(field))
+            else:
+                for field in fields:
+                    columns[field].append(getattr(row, field, None))
+            count += 1
+        return cls.model_construct(
+            columns=columns, count=count, next_cursor=next_cursor, watermark=watermark
+        )
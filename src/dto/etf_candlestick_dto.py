@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import List, Optional
 from src.model.etf_candlestick import ETFCandlestickModel, RealtimeETFCandlestickModel
@@ -10,6 +11,10 @@ class ETFCandlestickRequest(BaseModel):
     symbol: str = "SPY"  # Default symbol
     from_date: Optional[str] = None
     to_date: Optional[str] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    interval: Optional[str] = None
+    since: Optional[datetime] = None
 
     class Config:
         json_schema_extra = {
@@ -26,6 +31,8 @@ class ETFCandlestickResponse(BaseModel):
     """Response model for historical ETF candlestick data"""
 
     data: List[ETFCandlestickModel]
+    next_cursor: Optional[str] = None
+    watermark: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -1,20 +1,26 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from src.model.funding_rate import RealtimeFundingRate
 
 
 class FundingRateRequest(BaseModel):
     symbols: str
     days: int
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
 
 
 class FundingRateResponse(BaseModel):
     data: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
 
 
 class RealtimeFundingRateRequest(BaseModel):
     symbols: str
+    since: Optional[datetime] = None
 
 
 class RealtimeFundingRateResponse(BaseModel):
     data: List[RealtimeFundingRate]
+    watermark: Optional[int] = None
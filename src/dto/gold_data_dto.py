@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import List, Optional
 from src.model.gold_data import GoldDataModel
@@ -9,6 +10,10 @@ class GoldDataRequest(BaseModel):
     day: Optional[int] = None
     from_date: Optional[str] = None
     to_date: Optional[str] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    interval: Optional[str] = None
+    since: Optional[datetime] = None
 
     class Config:
         json_schema_extra = {
@@ -20,6 +25,8 @@ class GoldDataResponse(BaseModel):
     """Response model for gold data"""
 
     data: List[GoldDataModel]
+    next_cursor: Optional[str] = None
+    watermark: Optional[int] = None
 
     class Config:
         from_attributes = True
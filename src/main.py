@@ -10,7 +10,17 @@ from src.controller.v1.funding_rate import (
     RealtimeFundingRateController,
 )
 from src.controller.v1.monitoring import router as monitoring_router
+from src.controller.v1.admin import router as admin_router
+from src.controller.v1.export import router as export_router
+from src.controller.v1.websocket import router as websocket_router
 from src.config.logger_config import logger
+from src.config.mongo_config import MongoDBConfig
+from src.service.btc_dominance_service import get_btc_dominance_service
+from src.service.gold_rollup_worker import get_gold_rollup_worker
+from src.service.index_manager import get_index_manager
+from src.service.monitoring_scheduler import get_monitoring_scheduler
+from src.service.push_hub import get_push_hub
+from src.service.realtime_funding_rate_cache import get_realtime_funding_rate_cache
 import sys
 import os
 
@@ -23,12 +33,35 @@ async def lifespan(app: FastAPI):
     """Quản lý lifecycle của ứng dụng"""
     # Startup
     logger.info("Starting application...")
+    mongo_config = MongoDBConfig()
+    mongo_config.get_async_client()
+    # Build index có thể mất nhiều phút: chạy nền, không chặn việc phục vụ request
+    index_manager = get_index_manager()
+    index_manager.start()
+    realtime_funding_rate_cache = get_realtime_funding_rate_cache()
+    realtime_funding_rate_cache.start()
+    gold_rollup_worker = get_gold_rollup_worker()
+    gold_rollup_worker.start()
+    push_hub = get_push_hub()
+    push_hub.start()
+    monitoring_scheduler = get_monitoring_scheduler()
+    monitoring_scheduler.start()
+    try:
+        await get_btc_dominance_service().probe_schema()
+    except Exception as e:
+        logger.error(f"BTC dominance schema probe failed: {str(e)}")
     logger.info("Application started successfully")
 
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    await index_manager.stop()
+    await realtime_funding_rate_cache.stop()
+    await gold_rollup_worker.stop()
+    await push_hub.stop()
+    await monitoring_scheduler.stop()
+    mongo_config.close()
     logger.info("Application stopped successfully")
 
 
@@ -46,6 +79,9 @@ app.include_router(etf_router)
 app.include_router(gold_router)
 app.include_router(RealtimeFundingRateController.router)
 app.include_router(monitoring_router)
+app.include_router(export_router)
+app.include_router(websocket_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
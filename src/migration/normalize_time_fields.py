@@ -0,0 +1,181 @@
+"""
+Migration: thêm field thời gian chuẩn `ts` (BSON date) cho các collection time-series.
+
+Các collection raw_btc_dominance, gold_minute_data, etf_candlestick_historical lưu
+thời gian lẫn lộn (chuỗi "%Y-%m-%d %H:%M:%S", ISO, "YYYY-MM-DD", timestamp_ms dạng
+số hoặc chuỗi), buộc service phải dùng $substr/$toLong/$dateFromString. Tool này
+ghi `ts` theo batch để service chỉ cần query `ts`. Index trên `ts` được khai báo
+cạnh mỗi service (`INDEXES`) và chỉ được tạo bởi IndexManager khi app khởi động.
+
+Đây là nơi duy nhất ghi `ts`: API chỉ đọc. Collector không ghi `ts` nên service
+gold/ETF đọc thêm các document chưa có `ts` qua field gốc (`src.utils.pending_ts`);
+chạy tool định kỳ (cron) để tập document đó luôn nhỏ.
+
+- Resumable: checkpoint `_id` cuối cùng được lưu trong collection `_migrations`
+  của mỗi database; chạy lại sẽ tiếp tục từ checkpoint và chỉ xử lý các document
+  mới (`--reset` để quét lại từ đầu).
+- Document không parse được thời gian được bỏ qua và đếm trong log.
+
+Sử dụng:
+    python -m src.migration.normalize_time_fields
+    python -m src.migration.normalize_time_fields --collections gold --batch-size 5000
+    python -m src.migration.normalize_time_fields --reset   # quét lại từ đầu
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from src.config.logger_config import logger
+from src.config.mongo_config import MongoDBConfig
+from src.config.variable_config import (
+    DB_BTC_DOMINANCE,
+    DB_ETF_CANDLESTICK,
+    DB_GOLD_DATA,
+)
+from src.utils.time_fields import TS_FIELD, parse_time_value, raw_ts
+
+MIGRATION_NAME = "normalize_time_fields"
+STATE_COLLECTION = "_migrations"
+
+
+def _btc_dominance_ts(doc: Dict[str, Any]) -> Optional[datetime]:
+    # timestamp_ms chính xác hơn chuỗi datetime (vốn có thể chỉ có ngày)
+    return parse_time_value(doc.get("timestamp_ms")) or parse_time_value(
+        doc.get("datetime")
+    )
+
+
+MIGRATIONS: Dict[str, Dict[str, Any]] = {
+    "btc_dominance": {
+        "database_name": DB_BTC_DOMINANCE["database_name"],
+        "collection_name": DB_BTC_DOMINANCE["collection_history_name"],
+        "parse": _btc_dominance_ts,
+    },
+    "gold": {
+        "database_name": DB_GOLD_DATA["database_name"],
+        "collection_name": DB_GOLD_DATA["collection_history_name"],
+        "parse": raw_ts,
+    },
+    "etf": {
+        "database_name": DB_ETF_CANDLESTICK["database_name"],
+        "collection_name": DB_ETF_CANDLESTICK["collection_history_name"],
+        "parse": raw_ts,
+    },
+}
+
+
+def build_updates(
+    batch: List[Dict[str, Any]],
+    parse: Callable[[Dict[str, Any]], Optional[datetime]],
+) -> List[UpdateOne]:
+    """Các lệnh ghi `ts` cho một batch; document không parse được bị bỏ qua"""
+    ops = []
+    for doc in batch:
+        ts = parse(doc)
+        if ts is not None:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {TS_FIELD: ts}}))
+    return ops
+
+
+def migrate_collection(
+    client,
+    database_name: str,
+    collection_name: str,
+    parse: Callable[[Dict[str, Any]], Optional[datetime]],
+    batch_size: int = 1000,
+    reset: bool = False,
+) -> Dict[str, int]:
+    """Ghi `ts` cho các document chưa có, theo thứ tự `_id`, từ checkpoint trước đó"""
+    db = client[database_name]
+    coll = db[collection_name]
+    state_coll = db[STATE_COLLECTION]
+    state_id = f"{MIGRATION_NAME}:{collection_name}"
+
+    if reset:
+        state_coll.delete_one({"_id": state_id})
+
+    state = state_coll.find_one({"_id": state_id}) or {}
+    last_id = state.get("last_id")
+
+    stats = {"scanned": 0, "updated": 0, "skipped": 0}
+    while True:
+        query: Dict[str, Any] = {TS_FIELD: {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = list(
+            coll.find(query, {"_id": 1, "datetime": 1, "timestamp_ms": 1})
+            .sort("_id", ASCENDING)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+
+        ops = build_updates(batch, parse)
+        stats["skipped"] += len(batch) - len(ops)
+
+        if ops:
+            result = coll.bulk_write(ops, ordered=False)
+            stats["updated"] += result.modified_count
+
+        stats["scanned"] += len(batch)
+        last_id = batch[-1]["_id"]
+        state_coll.update_one(
+            {"_id": state_id},
+            {
+                "$set": {"last_id": last_id, "updated_at": datetime.utcnow()},
+                "$inc": {
+                    "updated": len(ops),
+                    "skipped": len(batch) - len(ops),
+                },
+            },
+            upsert=True,
+        )
+        logger.info(
+            f"[{collection_name}] scanned={stats['scanned']} updated={stats['updated']} skipped={stats['skipped']}"
+        )
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--collections",
+        default=",".join(MIGRATIONS),
+        help=f"Danh sách cách nhau bởi dấu phẩy: {', '.join(MIGRATIONS)}",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--reset", action="store_true", help="Bỏ checkpoint và quét lại từ đầu"
+    )
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.collections.split(",") if n.strip()]
+    unknown = [n for n in names if n not in MIGRATIONS]
+    if unknown:
+        parser.error(f"Unknown collections: {', '.join(unknown)}")
+
+    client = MongoDBConfig().get_client()
+    try:
+        for name in names:
+            spec = MIGRATIONS[name]
+            stats = migrate_collection(
+                client,
+                spec["database_name"],
+                spec["collection_name"],
+                spec["parse"],
+                batch_size=args.batch_size,
+                reset=args.reset,
+            )
+            logger.info(f"[{spec['collection_name']}] migration finished: {stats}")
+    finally:
+        MongoDBConfig().close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
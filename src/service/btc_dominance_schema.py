@@ -0,0 +1,185 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.logger_config import logger
+from src.utils.time_fields import TS_FIELD, utc_ms
+
+# Các dạng lưu thời gian đã gặp trong raw_btc_dominance, theo thứ tự ưu tiên
+SHAPE_TS = "ts"  # field chuẩn do src.migration.normalize_time_fields ghi
+SHAPE_TIMESTAMP_MS = "timestamp_ms"  # timestamp_ms kiểu số
+SHAPE_DATETIME = "datetime"  # datetime kiểu BSON date
+SHAPE_TIMESTAMP_MS_STRING = "timestamp_ms_string"  # timestamp_ms là chuỗi 13 chữ số
+SHAPE_DATETIME_STRING = "datetime_string"  # "%Y-%m-%d %H:%M:%S"
+SHAPE_DATETIME_ISO = "datetime_iso"  # "%Y-%m-%dT%H:%M:%S..."
+
+# Field gốc do collector ghi đứng trước `ts`: `ts` chỉ có sau khi migration chạy
+# tới nên document mới chưa có. `ts` chỉ được chọn khi không dạng gốc nào dùng
+# chung được cho mọi document mẫu (dữ liệu cũ lẫn lộn nhiều dạng)
+SHAPE_PRIORITY = [
+    SHAPE_TIMESTAMP_MS,
+    SHAPE_DATETIME,
+    SHAPE_TIMESTAMP_MS_STRING,
+    SHAPE_DATETIME_STRING,
+    SHAPE_DATETIME_ISO,
+    SHAPE_TS,
+]
+
+
+def detect_shapes(doc: Dict[str, Any]) -> List[str]:
+    """Các dạng query có thể dùng được cho một document mẫu"""
+    shapes = []
+    if isinstance(doc.get(TS_FIELD), datetime):
+        shapes.append(SHAPE_TS)
+
+    ts = doc.get("timestamp_ms")
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        shapes.append(SHAPE_TIMESTAMP_MS)
+    elif isinstance(ts, str) and ts.isdigit() and len(ts) == 13:
+        shapes.append(SHAPE_TIMESTAMP_MS_STRING)
+
+    value = doc.get("datetime")
+    if isinstance(value, datetime):
+        shapes.append(SHAPE_DATETIME)
+    elif isinstance(value, str) and len(value) >= 19:
+        shapes.append(SHAPE_DATETIME_ISO if value[10] == "T" else SHAPE_DATETIME_STRING)
+    return shapes
+
+
+def shape_field(shape: str) -> str:
+    """Field chứa thời gian (và dùng để sort) của một dạng dữ liệu"""
+    if shape == SHAPE_TS:
+        return TS_FIELD
+    if shape in (SHAPE_TIMESTAMP_MS, SHAPE_TIMESTAMP_MS_STRING):
+        return "timestamp_ms"
+    return "datetime"
+
+
+def shape_time_expr(shape: str) -> Any:
+    """Biểu thức BSON date (dùng trong aggregation) của field thời gian một dạng dữ liệu"""
+    if shape == SHAPE_TS:
+        return f"${TS_FIELD}"
+    if shape == SHAPE_TIMESTAMP_MS:
+        return {"$toDate": "$timestamp_ms"}
+    if shape == SHAPE_TIMESTAMP_MS_STRING:
+        return {"$toDate": {"$toLong": "$timestamp_ms"}}
+    if shape == SHAPE_DATETIME:
+        return "$datetime"
+    if shape == SHAPE_DATETIME_ISO:
+        return {"$dateFromString": {"dateString": "$datetime"}}
+    return {
+        "$dateFromString": {"dateString": "$datetime", "format": "%Y-%m-%d %H:%M:%S"}
+    }
+
+
+def build_range_query(
+    shape: str, start: datetime, end: datetime
+) -> Tuple[Dict[str, Any], str]:
+    """Filter range và field sort (đều dùng được index) cho một dạng dữ liệu.
+
+    `start`/`end` là datetime naive UTC.
+    """
+    if shape == SHAPE_TS:
+        return {TS_FIELD: {"$gte": start, "$lte": end}}, shape_field(shape)
+    if shape == SHAPE_TIMESTAMP_MS:
+        bounds = {"$gte": utc_ms(start), "$lte": utc_ms(end)}
+        return {"timestamp_ms": bounds}, shape_field(shape)
+    if shape == SHAPE_TIMESTAMP_MS_STRING:
+        bounds = {"$gte": str(utc_ms(start)), "$lte": str(utc_ms(end))}
+        return {"timestamp_ms": bounds}, shape_field(shape)
+    if shape == SHAPE_DATETIME:
+        return {"datetime": {"$gte": start, "$lte": end}}, shape_field(shape)
+    if shape == SHAPE_DATETIME_ISO:
+        bounds = {
+            "$gte": start.strftime("%Y-%m-%dT%H:%M:%S"),
+            "$lte": end.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+        }
+        return {"datetime": bounds}, shape_field(shape)
+    bounds = {
+        "$gte": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "$lte": end.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return {"datetime": bounds}, shape_field(shape)
+
+
+class BTCDominanceSchemaProbe:
+    """Phát hiện một lần dạng lưu thời gian của collection BTC dominance.
+
+    Lấy mẫu các document mới nhất, chọn dạng query dùng được index theo
+    `SHAPE_PRIORITY` và cache lại. Khi một query trả về rỗng ngoài dự kiến,
+    service gọi `reprobe()` (tối đa một lần mỗi `reprobe_seconds`).
+    """
+
+    def __init__(self, sample_size: int = 20, reprobe_seconds: int = 60):
+        self._sample_size = sample_size
+        self._reprobe_seconds = reprobe_seconds
+        self._shape: Optional[str] = None
+        self._probed_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    @property
+    def shape(self) -> Optional[str]:
+        return self._shape
+
+    async def probe(self, col) -> Optional[str]:
+        """Lấy mẫu collection và chọn dạng query"""
+        async with self._lock:
+            docs = (
+                await col.find({}, {TS_FIELD: 1, "timestamp_ms": 1, "datetime": 1})
+                .sort("_id", -1)
+                .limit(self._sample_size)
+                .to_list(length=None)
+            )
+            counts: Dict[str, int] = {}
+            for doc in docs:
+                for shape in detect_shapes(doc):
+                    counts[shape] = counts.get(shape, 0) + 1
+
+            # Chỉ chọn dạng mà mọi document mẫu đều thỏa mãn
+            shape = next(
+                (s for s in SHAPE_PRIORITY if docs and counts.get(s) == len(docs)),
+                None,
+            )
+            # Không có dạng chung: dạng gốc phổ biến nhất. `ts` bị loại vì document
+            # thiếu `ts` là document mới nhất, chưa được migration xử lý
+            partial = {s: n for s, n in counts.items() if s != SHAPE_TS}
+            if shape is None and partial:
+                shape = max(
+                    partial, key=lambda s: (partial[s], -SHAPE_PRIORITY.index(s))
+                )
+
+            self._probed_at = time.monotonic()
+            if shape != self._shape:
+                logger.info(
+                    f"BTC dominance schema probe: {len(docs)} docs sampled, query shape {self._shape} -> {shape}"
+                )
+            self._shape = shape
+            return shape
+
+    async def get_shape(self, col) -> Optional[str]:
+        if (
+            self._shape is None
+            and time.monotonic() - self._probed_at >= self._reprobe_seconds
+        ):
+            await self.probe(col)
+        return self._shape
+
+    async def reprobe(self, col) -> bool:
+        """Probe lại sau một lần miss; True nếu dạng query đã thay đổi"""
+        if time.monotonic() - self._probed_at < self._reprobe_seconds:
+            return False
+        previous = self._shape
+        return await self.probe(col) != previous
+
+
+# Global probe instance
+_btc_dominance_schema_probe = None
+
+
+def get_btc_dominance_schema_probe() -> BTCDominanceSchemaProbe:
+    """Singleton for BTCDominanceSchemaProbe"""
+    global _btc_dominance_schema_probe
+    if _btc_dominance_schema_probe is None:
+        _btc_dominance_schema_probe = BTCDominanceSchemaProbe()
+    return _btc_dominance_schema_probe
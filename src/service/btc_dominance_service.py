@@ -1,9 +1,13 @@
-import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import logging
 from src.config.logger_config import logger
 from src.config.mongo_config import MongoDBConfig, get_db_and_collections_btcdominance
+from src.config.variable_config import (
+    CACHE_CONFIG,
+    PAGINATION_CONFIG,
+    STREAMING_CONFIG,
+)
 from src.dto.btc_dominance_dto import (
     BTCDominanceRequest,
     BTCDominanceResponse,
@@ -11,29 +15,128 @@ from src.dto.btc_dominance_dto import (
     RealtimeBTCDominanceResponse,
 )
 from src.model.btc_dominance import BTCDominanceModel, RealtimeBTCDominanceModel
+from src.service.btc_dominance_schema import (
+    build_range_query,
+    get_btc_dominance_schema_probe,
+    shape_field,
+    shape_time_expr,
+)
+from src.service.index_manager import IndexSpec, QueryPlan
+from src.utils.batch_normalizer import BatchNormalizer, date_part
+from src.utils.day_range_cache import get_history_cache
+from src.utils.fast_json import RowSchema
+from src.utils.pagination import InvalidCursorError, fetch_page, page_size
+from src.utils.resample import ohlc_pipeline
+from src.utils.single_flight import get_single_flight, request_key
+from src.utils.streaming import cursor_batches
+from src.utils.time_fields import TS_FIELD, from_utc_ms, parse_time_value, utc_ms
+
+
+_DB_NAME, _, _HISTORY_COL = get_db_and_collections_btcdominance()
+
+# Index mà các query của service cần (tạo idempotent trong lifespan)
+# (_id đi kèm để phân trang keyset cũng dùng được index)
+INDEXES = [
+    IndexSpec(
+        database_name=_DB_NAME,
+        collection_name=_HISTORY_COL,
+        keys=[(field, 1), ("_id", 1)],
+    )
+    for field in (TS_FIELD, "timestamp_ms", "datetime")
+]
+
+# Query mẫu để kiểm tra plan bằng explain (một query cho mỗi dạng của schema probe)
+QUERY_PLANS = [
+    QueryPlan(
+        name=f"btc_dominance_history_{field}",
+        database_name=_DB_NAME,
+        collection_name=_HISTORY_COL,
+        filter={field: {"$gte": lower, "$lte": upper}},
+        sort=[(field, -1), ("_id", -1)],
+    )
+    for field, lower, upper in (
+        (TS_FIELD, datetime(2025, 1, 1), datetime(2025, 1, 2)),
+        ("timestamp_ms", 1735689600000, 1735776000000),
+        ("datetime", "2025-01-01 00:00:00", "2025-01-02 00:00:00"),
+    )
+]
 
 
 class BTCDominanceService:
+    _PROJECTION = {
+        "_id": 1,
+        TS_FIELD: 1,
+        "timestamp_ms": 1,
+        "open": 1,
+        "high": 1,
+        "low": 1,
+        "close": 1,
+        "volume": 1,
+        "datetime": 1,
+    }
+
+    # Cột của response CSV và layout=columns
+    COLUMNS = list(BTCDominanceModel.model_fields)
+
+    # Nến ngày được ghi sau nửa đêm: ngày trước chỉ được cache sau khoảng này
+    _DAILY_GRACE = timedelta(seconds=CACHE_CONFIG["daily_candle_grace_seconds"])
+
+    # Chuẩn hóa row theo BTCDominanceModel, kiểm tra schema một lần cho mỗi tập field
+    _ROW_SCHEMA = RowSchema(BTCDominanceModel)
+
+    # Chuẩn hóa theo cột: datetime về YYYY-MM-DD (chuỗi được parse memoized),
+    # giá về float và timestamp_ms về int (giá trị lỗi thành None)
+    _NORMALIZER = BatchNormalizer(
+        datetime_unit="D",
+        parse_string=date_part,
+        float_fields=("open", "high", "low", "close", "volume"),
+        int_fields=("timestamp_ms",),
+    )
+
     def __init__(self, db_client=None):
         self._client = (
-            db_client or MongoDBConfig().get_client()
+            db_client or MongoDBConfig().get_async_client()
         )  # Đảm bảo có () để tạo instance
         self._db_name, self._realtime_col, self._history_col = (
             get_db_and_collections_btcdominance()
         )
         self._logger = logging.getLogger(__name__)
+        self._history_cache = get_history_cache()
+        self._schema_probe = get_btc_dominance_schema_probe()
+        self._single_flight = get_single_flight()
+
+    async def probe_schema(self) -> Optional[str]:
+        """Chạy schema probe (gọi một lần khi startup)"""
+        if not self._db_name or not self._history_col:
+            return None
+        col = self._client[self._db_name][self._history_col]
+        return await self._schema_probe.probe(col)
 
     async def get_btc_dominance_data(
         self, request: BTCDominanceRequest
+    ) -> BTCDominanceResponse:
+        """Request giống hệt nhau đang chạy đồng thời dùng chung một lần query"""
+        return await self._single_flight.do(
+            request_key(request), lambda: self._get_btc_dominance_data(request)
+        )
+
+    async def _get_btc_dominance_data(
+        self, request: BTCDominanceRequest
     ) -> BTCDominanceResponse:
         """Get BTC dominance data - historical or latest records"""
         days = request.days
         from_date = request.from_date
         to_date = request.to_date
 
+        # Delta cho client polling: chỉ các row mới hơn watermark
+        if request.since is not None:
+            return await self._get_since(request.since)
+
         # Nếu có from_date và to_date, sử dụng date range query
         if from_date and to_date:
-            return await self._get_data_by_date_range(from_date, to_date, days)
+            return await self._get_data_by_date_range(
+                from_date, to_date, days, request.limit, request.cursor, request.interval
+            )
 
         # Nếu chỉ có days hoặc không có gì cả
         if days is None:
@@ -46,283 +149,227 @@ class BTCDominanceService:
             return BTCDominanceResponse(data=[])
 
         # Historical data query
-        return await self._get_historical_data(days)
+        return await self._get_historical_data(
+            days, request.limit, request.cursor, request.interval
+        )
 
-    async def _get_historical_data(self, days: int) -> BTCDominanceResponse:
+    async def _get_historical_data(
+        self,
+        days: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        interval: Optional[str] = None,
+    ) -> BTCDominanceResponse:
         """Get historical BTC dominance data"""
         if not self._db_name or not self._history_col:
             logger.error("Database or collection name not configured")
             return BTCDominanceResponse(data=[])
 
-        db = self._client[self._db_name]
-        # history collection is the same raw collection
-        col = db[self._history_col]
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
-        # Prefer querying by actual datetime objects for efficiency and index use
-        start_date_dt = start_date
-        end_date_dt = end_date
 
-        loop = asyncio.get_running_loop()
+        return await self._get_range_response(
+            start_date, end_date, limit, cursor, interval
+        )
 
-        # First try: query by timestamp_ms range (most robust when data stores ms)
-        start_ms = int(start_date_dt.timestamp() * 1000)
-        end_ms = int(end_date_dt.timestamp() * 1000)
-        # Debug: log db/collection and computed ranges
-        try:
-            self._logger.debug(
-                "Querying DB=%s Collection=%s start=%s end=%s start_ms=%d end_ms=%d",
-                self._db_name,
-                self._history_col,
-                start_date_dt.isoformat(),
-                end_date_dt.isoformat(),
-                start_ms,
-                end_ms,
+    async def _get_range_response(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        interval: Optional[str] = None,
+    ) -> BTCDominanceResponse:
+        """Response cho một khoảng thời gian: bar theo interval, một trang nếu có
+        limit/cursor, còn lại đọc qua history cache"""
+        if interval:
+            try:
+                data = await self._get_bars(start_date, end_date, interval)
+            except Exception as e:
+                logger.error(f"Error in BTC {interval} bars query: {str(e)}")
+                return BTCDominanceResponse(data=[])
+            logger.info(f"Found {len(data)} BTC {interval} bars")
+            return BTCDominanceResponse.model_construct(data=data)
+
+        size = page_size(limit, cursor)
+        if size is None:
+            return BTCDominanceResponse.model_construct(
+                data=await self._get_rows(start_date, end_date)
             )
-        except Exception:
-            pass
 
-        def _query_by_timestamp_ms():
-            # Prefer aggregation that converts timestamp_ms to long (handles numeric or string stored values)
-            try:
-                pipeline = [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    {"$gte": [{"$toLong": "$timestamp_ms"}, start_ms]},
-                                    {"$lte": [{"$toLong": "$timestamp_ms"}, end_ms]},
-                                ]
-                            }
-                        }
-                    },
-                    {"$sort": {"timestamp_ms": -1}},
-                    {
-                        "$project": {
-                            "_id": 1,
-                            "timestamp_ms": 1,
-                            "open": 1,
-                            "high": 1,
-                            "low": 1,
-                            "close": 1,
-                            "volume": 1,
-                            "datetime": 1,
-                        }
-                    },
-                ]
-                return list(col.aggregate(pipeline))
-            except Exception:
-                # Fallback to numeric find (works when timestamp_ms stored as number)
-                projection = {
-                    "_id": 1,
-                    "timestamp_ms": 1,
-                    "open": 1,
-                    "high": 1,
-                    "low": 1,
-                    "close": 1,
-                    "volume": 1,
-                    "datetime": 1,
-                }
-                cursor = col.find(
-                    {"timestamp_ms": {"$gte": start_ms, "$lte": end_ms}}, projection
-                ).sort([("timestamp_ms", -1)])
-                return list(cursor)
-
-        # Second try: use $dateFromString to parse `datetime` strings with format "%Y-%m-%d %H:%M:%S"
-        def _query_by_datefromstring():
-            pipeline = [
-                {
-                    "$match": {
-                        "$expr": {
-                            "$and": [
-                                {
-                                    "$gte": [
-                                        {
-                                            "$dateFromString": {
-                                                "dateString": "$datetime",
-                                                "format": "%Y-%m-%d %H:%M:%S",
-                                            }
-                                        },
-                                        start_date_dt,
-                                    ]
-                                },
-                                {
-                                    "$lte": [
-                                        {
-                                            "$dateFromString": {
-                                                "dateString": "$datetime",
-                                                "format": "%Y-%m-%d %H:%M:%S",
-                                            }
-                                        },
-                                        end_date_dt,
-                                    ]
-                                },
-                            ]
-                        }
-                    }
-                },
-                {"$sort": {"timestamp_ms": -1, "datetime": -1}},
-                {
-                    "$project": {
-                        "_id": 1,
-                        "timestamp_ms": 1,
-                        "open": 1,
-                        "high": 1,
-                        "low": 1,
-                        "close": 1,
-                        "volume": 1,
-                        "datetime": 1,
-                    }
-                },
-            ]
-            return list(col.aggregate(pipeline))
-
-        # Third fallback: try original $toDate approach (may work for ISO strings)
-        def _fallback_query():
-            pipeline2 = [
-                {"$match": {"datetime": {"$gte": start_date_dt, "$lte": end_date_dt}}},
-                {"$sort": {"datetime": -1}},
-                {
-                    "$project": {
-                        "_id": 1,
-                        "timestamp_ms": 1,
-                        "open": 1,
-                        "high": 1,
-                        "low": 1,
-                        "close": 1,
-                        "volume": 1,
-                        "datetime": 1,
-                    }
-                },
-            ]
-            return list(col.aggregate(pipeline2))
-
-        # Try queries in order: timestamp_ms -> dateFromString -> fallback
-        docs = await loop.run_in_executor(None, _query_by_timestamp_ms)
-        if not docs:
-            docs = await loop.run_in_executor(None, _query_by_datefromstring)
-
-        # If still empty, try matching datetime stored as plain string range
-        if not docs:
-
-            def _query_by_datetime_string():
-                start_str = start_date_dt.strftime("%Y-%m-%d %H:%M:%S")
-                end_str = end_date_dt.strftime("%Y-%m-%d %H:%M:%S")
-                projection = {
-                    "_id": 1,
-                    "timestamp_ms": 1,
-                    "open": 1,
-                    "high": 1,
-                    "low": 1,
-                    "close": 1,
-                    "volume": 1,
-                    "datetime": 1,
-                }
-                cursor = col.find(
-                    {"datetime": {"$gte": start_str, "$lte": end_str}}, projection
-                ).sort([("datetime", -1)])
-                return list(cursor)
-
-            docs = await loop.run_in_executor(None, _query_by_datetime_string)
-
-        if not docs:
-            docs = await loop.run_in_executor(None, _fallback_query)
-
-        # Ghi log để debug vì user báo không có dữ liệu
         try:
-            self._logger.info(
-                "BTC dominance historical query returned %d documents", len(docs)
+            data, next_cursor = await self._get_page(start_date, end_date, size, cursor)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in BTC paginated query: {str(e)}")
+            return BTCDominanceResponse(data=[])
+        logger.info(f"Found {len(data)} BTC records in page (limit {size})")
+        return BTCDominanceResponse.model_construct(data=data, next_cursor=next_cursor)
+
+    async def _get_page(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Đọc một trang theo keyset (field thời gian của schema probe, _id).
+
+        Không qua history cache. Cursor ghi tên field sort nên một cursor cũ
+        không dùng được nếu schema probe đã đổi dạng query giữa hai trang.
+        """
+        col = self._client[self._db_name][self._history_col]
+        shape = await self._schema_probe.get_shape(col)
+        if shape is None:
+            return [], None
+
+        query, sort_field = build_range_query(shape, start_date, end_date)
+        docs, next_cursor = await fetch_page(
+            col,
+            query,
+            [(sort_field, -1), ("_id", -1)],
+            limit,
+            cursor,
+            self._PROJECTION,
+        )
+
+        return self._normalize_docs(docs), next_cursor
+
+    async def _get_bars(
+        self, start_date: datetime, end_date: datetime, interval: str
+    ) -> List[Dict[str, Any]]:
+        """Bar OHLC theo interval, gộp trên Mongo theo dạng dữ liệu của schema probe.
+
+        Range vẫn là `build_range_query` (dùng index); `$dateTrunc` chạy trên
+        biểu thức BSON date của dạng đó. timestamp_ms/datetime của bar là thời
+        điểm bắt đầu bucket.
+        """
+        col = self._client[self._db_name][self._history_col]
+        shape = await self._schema_probe.get_shape(col)
+        if shape is None:
+            return []
+
+        query, sort_field = build_range_query(shape, start_date, end_date)
+        pipeline = ohlc_pipeline(
+            query,
+            shape_time_expr(shape),
+            sort_field,
+            interval,
+            {
+                "timestamp_ms": {"$toLong": "$_id"},
+                "open": 1,
+                "high": 1,
+                "low": 1,
+                "close": 1,
+                "volume": 1,
+                "datetime": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id"}},
+            },
+        )
+        rows = await col.aggregate(pipeline).to_list(length=None)
+        return self._ROW_SCHEMA.project_all(rows)
+
+    @staticmethod
+    def _row_day(row: Dict[str, Any]) -> Optional[date]:
+        """Ngày của một row, dùng để chia chunk trong history cache"""
+        if row.get("timestamp_ms") is not None:
+            return from_utc_ms(row["timestamp_ms"]).date()
+        try:
+            return date.fromisoformat(str(row.get("datetime"))[:10])
+        except ValueError:
+            return None
+
+    async def _get_rows(
+        self, start_date: datetime, end_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """Lấy các row trong khoảng thời gian, ngày đã đóng đọc từ history cache"""
+        db = self._client[self._db_name]
+        # history collection is the same raw collection
+        col = db[self._history_col]
+
+        async def _fetch(from_day: date, to_day: date) -> List[Dict[str, Any]]:
+            docs = await self._query_history_docs(
+                col,
+                datetime.combine(from_day, time.min),
+                datetime.combine(to_day, time.max),
             )
-            if len(docs) > 0:
-                sample = docs[0]
-                # Log small sample of fields to help debugging
-                sample_preview = {
-                    k: sample.get(k)
-                    for k in ("_id", "timestamp_ms", "datetime", "close")
-                }
-                self._logger.debug("Sample doc preview: %s", sample_preview)
-        except Exception:
-            pass
-        # If still empty, log collection count and one sample doc to help debugging
-        if not docs:
-            try:
-                total = col.count_documents({})
-                sample_doc = col.find_one()
-                self._logger.debug(
-                    "Collection %s total documents=%d", self._history_col, total
-                )
-                if sample_doc:
-                    preview = {
-                        k: sample_doc.get(k)
-                        for k in ("_id", "timestamp_ms", "datetime", "close")
-                    }
-                    self._logger.debug("Collection sample doc preview: %s", preview)
-            except Exception as e:
-                self._logger.debug("Could not get collection stats/sample: %s", str(e))
+            return self._normalize_docs(docs)
+
+        rows = await self._history_cache.get_range(
+            ("btc_dominance",),
+            start_date.date(),
+            end_date.date(),
+            _fetch,
+            self._row_day,
+            grace=self._DAILY_GRACE,
+        )
 
-        # Chuyển đổi thành các model BTCDominanceModel
-        data: List[Dict[str, Any]] = []
-        for doc in docs:
-            # Keep _id if present; map timestamp_ms and parse datetime if needed
-            # Do not remove _id; Pydantic model accepts optional _id
-            if isinstance(doc.get("datetime"), str):
-                try:
-                    # Parse datetime and convert to date only (YYYY-MM-DD)
-                    dt_obj = datetime.strptime(doc["datetime"], "%Y-%m-%d %H:%M:%S")
-                    doc["datetime"] = dt_obj.strftime("%Y-%m-%d")
-                except Exception:
-                    try:
-                        dt_obj = datetime.fromisoformat(
-                            doc["datetime"].replace("Z", "+00:00")
-                        )
-                        doc["datetime"] = dt_obj.strftime("%Y-%m-%d")
-                    except Exception:
-                        # If can't parse, try to extract YYYY-MM-DD part
-                        if len(doc["datetime"]) >= 10:
-                            doc["datetime"] = doc["datetime"][:10]
-                        else:
-                            doc.pop("datetime", None)
-
-            # Ensure numeric fields exist and convert if necessary
-            for fld in ("open", "high", "low", "close"):
-                if fld in doc:
-                    try:
-                        doc[fld] = float(doc[fld])
-                    except Exception:
-                        doc[fld] = None
-
-            # timestamp_ms may be int or string in DB
-            if "timestamp_ms" in doc:
-                try:
-                    doc["timestamp_ms"] = int(doc["timestamp_ms"])
-                except Exception:
-                    doc["timestamp_ms"] = None
-
-            btc_dominance = BTCDominanceModel(**doc)
-            data.append(btc_dominance.model_dump())
-
-        return BTCDominanceResponse(data=data)
+        # Cắt phần đầu/cuối của chunk ngày theo đúng mốc thời gian yêu cầu
+        start_ms = utc_ms(start_date)
+        end_ms = utc_ms(end_date)
+        return [
+            row
+            for row in rows
+            if row.get("timestamp_ms") is None
+            or start_ms <= row["timestamp_ms"] <= end_ms
+        ]
+
+    async def _query_history_docs(
+        self, col, start_date_dt: datetime, end_date_dt: datetime
+    ) -> List[Dict[str, Any]]:
+        """Query raw BTC dominance documents between two datetimes.
+
+        Dạng query (field và kiểu dữ liệu) được chọn một lần bởi schema probe nên
+        mỗi request chỉ là một range scan trên index; chỉ khi kết quả rỗng mới
+        probe lại và thử lại nếu dạng dữ liệu đã thay đổi.
+        """
+        shape = await self._schema_probe.get_shape(col)
+        if shape is None:
+            self._logger.info("BTC dominance collection is empty, nothing to query")
+            return []
+
+        docs = await self._find_range(col, shape, start_date_dt, end_date_dt)
+        if not docs and await self._schema_probe.reprobe(col):
+            docs = await self._find_range(
+                col, self._schema_probe.shape, start_date_dt, end_date_dt
+            )
+
+        self._logger.info(
+            "BTC dominance historical query (%s) returned %d documents",
+            self._schema_probe.shape,
+            len(docs),
+        )
+        return docs
+
+    async def _find_range(
+        self, col, shape: Optional[str], start_date_dt: datetime, end_date_dt: datetime
+    ) -> List[Dict[str, Any]]:
+        if shape is None:
+            return []
+        query, sort_field = build_range_query(shape, start_date_dt, end_date_dt)
+        cursor = col.find(query, self._PROJECTION).sort(sort_field, -1)
+        return await cursor.to_list(length=None)
+
+    def _normalize_docs(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chuẩn hóa cả batch document thành row theo BTCDominanceModel (dict).
+
+        Thời gian và các field số được chuyển theo cột bởi `_NORMALIZER`; row
+        không hợp lệ với model bị bỏ qua (và log) bởi `_ROW_SCHEMA`.
+        """
+        return self._ROW_SCHEMA.project_all(self._NORMALIZER.normalize(docs))
 
     async def _get_data_by_date_range(
-        self, from_date: str, to_date: str, days: Optional[int] = None
+        self,
+        from_date: str,
+        to_date: str,
+        days: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        interval: Optional[str] = None,
     ) -> BTCDominanceResponse:
         """Get BTC dominance data by date range"""
-        from datetime import datetime, timedelta
-
         try:
-            # Parse dates from DDMMYYYY format
-            from_dt = datetime.strptime(from_date, "%d%m%Y")
-            to_dt = datetime.strptime(to_date, "%d%m%Y")
-
-            # Nếu có days, tính toán lại from_date dựa trên to_date
-            if days is not None:
-                calculated_from = to_dt - timedelta(days=days)
-                # Sử dụng ngày muộn hơn giữa from_dt và calculated_from
-                from_dt = max(from_dt, calculated_from)
-
-            # Set thời gian bắt đầu và kết thúc cho ngày
-            start_date = from_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_date = to_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+            start_date, end_date = self._date_range_bounds(from_date, to_date, days)
 
             logger.info(f"BTC date range query: {start_date} to {end_date}")
 
@@ -330,62 +377,134 @@ class BTCDominanceService:
                 logger.error("Database or collection name not configured")
                 return BTCDominanceResponse(data=[])
 
-            db = self._client[self._db_name]
-            col = db[self._history_col]
-
-            # Query by date range
-            loop = asyncio.get_running_loop()
-
-            def _query():
-                try:
-                    # Try datetime field first
-                    cursor = col.find(
-                        {"datetime": {"$gte": start_date, "$lte": end_date}}
-                    ).sort("datetime", -1)
-
-                    results = list(cursor)
-                    if results:
-                        return results
-
-                    # Try timestamp_ms if datetime fails
-                    start_ms = int(start_date.timestamp() * 1000)
-                    end_ms = int(end_date.timestamp() * 1000)
+            response = await self._get_range_response(
+                start_date, end_date, limit, cursor, interval
+            )
+            logger.info(f"Found {len(response.data)} BTC records in date range")
 
-                    cursor = col.find(
-                        {"timestamp_ms": {"$gte": start_ms, "$lte": end_ms}}
-                    ).sort("timestamp_ms", -1)
+            return response
 
-                    return list(cursor)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in BTC date range query: {str(e)}")
+            return BTCDominanceResponse(data=[])
 
-                except Exception as e:
-                    logger.error(f"BTC date range query error: {str(e)}")
-                    return []
+    @staticmethod
+    def _date_range_bounds(
+        from_date: str, to_date: str, days: Optional[int] = None
+    ) -> Tuple[datetime, datetime]:
+        """Mốc đầu/cuối của khoảng from_date/to_date (DDMMYYYY), thu hẹp bởi days"""
+        # Parse dates from DDMMYYYY format
+        from_dt = datetime.strptime(from_date, "%d%m%Y")
+        to_dt = datetime.strptime(to_date, "%d%m%Y")
+
+        # Nếu có days, tính toán lại from_date dựa trên to_date
+        if days is not None:
+            calculated_from = to_dt - timedelta(days=days)
+            # Sử dụng ngày muộn hơn giữa from_dt và calculated_from
+            from_dt = max(from_dt, calculated_from)
+
+        # Set thời gian bắt đầu và kết thúc cho ngày
+        start_date = from_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = to_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+        return start_date, end_date
+
+    async def stream_btc_dominance_data(
+        self, request: BTCDominanceRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream các row của request theo batch từ cursor Mongo.
+
+        Không qua history cache và không giữ kết quả trong bộ nhớ: mỗi row được
+        chuẩn hóa và trả về ngay khi driver nhận được batch chứa nó.
+        """
+        days = request.days if request.days is not None else 1
+        if not (request.from_date and request.to_date):
+            if days == 0:
+                for row in (await self._get_latest_records()).data:
+                    yield row
+                return
+            if days < 0:
+                return
 
-            raw_data = await loop.run_in_executor(None, _query)
-            logger.info(f"Found {len(raw_data)} BTC records in date range")
+        if not self._db_name or not self._history_col:
+            logger.error("Database or collection name not configured")
+            return
 
-            # Convert to response format
-            data = []
-            for doc in raw_data:
-                try:
-                    if "_id" in doc:
-                        doc["_id"] = str(doc["_id"])
+        if request.from_date and request.to_date:
+            start_date, end_date = self._date_range_bounds(
+                request.from_date, request.to_date, request.days
+            )
+        else:
+            end_date = datetime.utcnow()
+            start_date = end_date - timedelta(days=days)
+
+        if request.interval:
+            # Bar đã được gộp trên Mongo nên ít: trả trực tiếp
+            for row in await self._get_bars(start_date, end_date, request.interval):
+                yield row
+            return
+
+        col = self._client[self._db_name][self._history_col]
+        shape = await self._schema_probe.get_shape(col)
+        if shape is None:
+            return
+
+        query, sort_field = build_range_query(shape, start_date, end_date)
+        logger.info(f"BTC stream ({shape}): {start_date} to {end_date}")
+        cursor = (
+            col.find(query, self._PROJECTION)
+            .sort([(sort_field, -1), ("_id", -1)])
+            .batch_size(STREAMING_CONFIG["batch_size"])
+        )
+        async for batch in cursor_batches(cursor, STREAMING_CONFIG["batch_size"]):
+            for row in self._normalize_docs(batch):
+                yield row
 
-                    # Convert datetime to string format if needed
-                    if "datetime" in doc and isinstance(doc["datetime"], datetime):
-                        doc["datetime"] = doc["datetime"].strftime("%Y-%m-%d")
+    async def _get_since(self, since: datetime) -> BTCDominanceResponse:
+        """Các row mới hơn since (tail read trên field thời gian của schema probe).
 
-                    btc_dominance = BTCDominanceModel(**doc)
-                    data.append(btc_dominance.model_dump())
-                except Exception as e:
-                    logger.warning(f"Error parsing BTC item in date range: {str(e)}")
-                    continue
+        Đọc tăng dần, tối đa `max_page_size` row. Dạng chuỗi chỉ chính xác đến
+        giây nên các document không mới hơn since được lọc lại sau khi đọc.
+        Watermark là thời điểm của row mới nhất (giữ nguyên since nếu không có).
+        """
+        if not self._db_name or not self._history_col:
+            logger.error("Database or collection name not configured")
+            return BTCDominanceResponse(data=[], watermark=utc_ms(since))
 
-            return BTCDominanceResponse(data=data)
+        try:
+            col = self._client[self._db_name][self._history_col]
+            shape = await self._schema_probe.get_shape(col)
+            if shape is None:
+                return BTCDominanceResponse(data=[], watermark=utc_ms(since))
 
+            query, sort_field = build_range_query(
+                shape, since + timedelta(milliseconds=1), datetime.max
+            )
+            cursor = (
+                col.find(query, self._PROJECTION)
+                .sort(sort_field, 1)
+                .limit(PAGINATION_CONFIG["max_page_size"])
+            )
+            docs = await cursor.to_list(length=None)
         except Exception as e:
-            logger.error(f"Error in BTC date range query: {str(e)}")
-            return BTCDominanceResponse(data=[])
+            logger.error(f"Error in BTC since query: {str(e)}")
+            return BTCDominanceResponse(data=[], watermark=utc_ms(since))
+
+        watermark = since
+        newer = []
+        for doc in docs:
+            value = parse_time_value(doc.get(sort_field))
+            if value is not None and value > since:
+                newer.append(doc)
+                watermark = max(watermark, value)
+        logger.info(f"Found {len(newer)} BTC records since {since}")
+
+        # Mới nhất trước như các query lịch sử
+        newer.reverse()
+        return BTCDominanceResponse.model_construct(
+            data=self._normalize_docs(newer), watermark=utc_ms(watermark)
+        )
 
     async def _get_latest_records(self) -> BTCDominanceResponse:
         """Get latest records for realtime data (day=0)"""
@@ -401,74 +520,24 @@ class BTCDominanceService:
                 self._history_col
             ]  # Same collection for both historical and latest
 
-            loop = asyncio.get_running_loop()
-
-            def _query_latest():
-                # Get latest record sorted by datetime or timestamp_ms
-                cursor = (
-                    col.find().sort([("datetime", -1), ("timestamp_ms", -1)]).limit(1)
-                )
-                return list(cursor)
+            async def _query_latest():
+                # Get latest record sorted by the probed time field (indexed)
+                shape = await self._schema_probe.get_shape(col)
+                if shape is None:
+                    return []
+                cursor = col.find().sort(shape_field(shape), -1).limit(1)
+                return await cursor.to_list(length=None)
 
-            raw_data = await loop.run_in_executor(None, _query_latest)
+            raw_data = await _query_latest()
 
             self._logger.info(f"Found {len(raw_data)} latest BTC records")
             if raw_data:
                 self._logger.info(f"Sample latest BTC record: {raw_data[0]}")
 
-            # Convert to model objects
-            data = []
-            for item in raw_data:
-                try:
-                    # Convert ObjectId to string if present
-                    if "_id" in item:
-                        item["_id"] = str(item["_id"])
-
-                    # Handle datetime parsing - convert to YYYY-MM-DD format
-                    if isinstance(item.get("datetime"), str):
-                        try:
-                            # Parse datetime and convert to date only (YYYY-MM-DD)
-                            dt_obj = datetime.strptime(
-                                item["datetime"], "%Y-%m-%d %H:%M:%S"
-                            )
-                            item["datetime"] = dt_obj.strftime("%Y-%m-%d")
-                        except Exception:
-                            try:
-                                dt_obj = datetime.fromisoformat(
-                                    item["datetime"].replace("Z", "+00:00")
-                                )
-                                item["datetime"] = dt_obj.strftime("%Y-%m-%d")
-                            except Exception:
-                                # If can't parse, try to extract YYYY-MM-DD part
-                                if len(item["datetime"]) >= 10:
-                                    item["datetime"] = item["datetime"][:10]
-                                else:
-                                    item.pop("datetime", None)
-
-                    # Handle numeric fields
-                    for fld in ("open", "high", "low", "close", "volume"):
-                        if fld in item:
-                            try:
-                                item[fld] = float(item[fld])
-                            except Exception:
-                                item[fld] = None
-
-                    if "timestamp_ms" in item:
-                        try:
-                            item["timestamp_ms"] = int(item["timestamp_ms"])
-                        except Exception:
-                            item["timestamp_ms"] = None
-
-                    btc_model = BTCDominanceModel(**item)
-                    data.append(btc_model.model_dump())
-                    self._logger.info(f"Successfully parsed latest BTC item")
-                except Exception as e:
-                    self._logger.error(
-                        f"Error parsing latest BTC item: {str(e)}, item: {item}"
-                    )
-                    continue
-
-            return BTCDominanceResponse(data=data)
+            # Chuẩn hóa giống dữ liệu lịch sử (datetime, field số, schema)
+            data = self._normalize_docs(raw_data)
+
+            return BTCDominanceResponse.model_construct(data=data)
 
         except Exception as e:
             self._logger.error(f"Error getting latest BTC records: {str(e)}")
@@ -1,8 +1,12 @@
-import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from src.config.mongo_config import MongoDBConfig
-from src.config.variable_config import DB_ETF_CANDLESTICK
+from src.config.variable_config import (
+    CACHE_CONFIG,
+    DB_ETF_CANDLESTICK,
+    PAGINATION_CONFIG,
+    STREAMING_CONFIG,
+)
 from src.config.logger_config import logger
 from src.dto.etf_candlestick_dto import (
     ETFCandlestickRequest,
@@ -11,65 +15,149 @@ from src.dto.etf_candlestick_dto import (
     RealtimeETFCandlestickResponse,
 )
 from src.model.etf_candlestick import ETFCandlestickModel, RealtimeETFCandlestickModel
+from src.service.index_manager import IndexSpec, QueryPlan
+from src.utils.batch_normalizer import BatchNormalizer
+from src.utils.day_range_cache import get_history_cache
+from src.utils.fast_json import RowSchema
+from src.utils.pagination import InvalidCursorError, fetch_page, page_size
+from src.utils.pending_ts import (
+    PENDING_FILTER,
+    find_pending,
+    latest_pending,
+    merge_pending,
+    merge_pending_batches,
+    newest,
+)
+from src.utils.resample import bucket_start, ohlc_pipeline, ohlc_rows
+from src.utils.single_flight import get_single_flight, request_key
+from src.utils.streaming import cursor_batches
+from src.utils.time_fields import TS_FIELD, raw_ts, utc_ms
+
+
+# Indexes required by the service queries (created idempotently during lifespan)
+INDEXES = [
+    IndexSpec(
+        database_name=DB_ETF_CANDLESTICK["database_name"],
+        collection_name=DB_ETF_CANDLESTICK["collection_history_name"],
+        keys=[("symbol", 1), (TS_FIELD, 1), ("_id", 1)],
+    ),
+    IndexSpec(
+        database_name=DB_ETF_CANDLESTICK["database_name"],
+        collection_name=DB_ETF_CANDLESTICK["collection_history_name"],
+        keys=[("symbol", 1), ("datetime", 1)],
+    ),
+]
+
+# Sample queries whose plans are checked with explain
+QUERY_PLANS = [
+    QueryPlan(
+        name="etf_candlestick_history",
+        database_name=DB_ETF_CANDLESTICK["database_name"],
+        collection_name=DB_ETF_CANDLESTICK["collection_history_name"],
+        filter={
+            "symbol": "FUEVN100",
+            TS_FIELD: {"$gte": datetime(2025, 1, 1), "$lte": datetime(2025, 1, 8)},
+        },
+        sort=[(TS_FIELD, -1), ("_id", -1)],
+    ),
+    QueryPlan(
+        name="etf_candlestick_latest",
+        database_name=DB_ETF_CANDLESTICK["database_name"],
+        collection_name=DB_ETF_CANDLESTICK["collection_history_name"],
+        filter={"symbol": "FUEVN100"},
+        sort=[(TS_FIELD, -1)],
+    ),
+    QueryPlan(
+        name="etf_candlestick_latest_by_symbol",
+        database_name=DB_ETF_CANDLESTICK["database_name"],
+        collection_name=DB_ETF_CANDLESTICK["collection_history_name"],
+        filter={"symbol": {"$in": ["E1VFVN30", "FUEVN100"]}},
+        sort=[("symbol", -1), (TS_FIELD, -1)],
+    ),
+]
+
+
+# Fields read to aggregate bars in Python (buckets with documents lacking `ts`)
+_BAR_FIELDS = ("open", "high", "low", "close", "volume")
+_BAR_PROJECTION = {"symbol": 1, TS_FIELD: 1, **{name: 1 for name in _BAR_FIELDS}}
 
 
 class ETFCandlestickService:
     """Service for ETF candlestick data operations"""
 
+    # Keyset order of pages (ts descending, _id makes the order unique)
+    _PAGE_SORT = [(TS_FIELD, -1), ("_id", -1)]
+
+    # Columns of the CSV and layout=columns responses
+    COLUMNS = list(ETFCandlestickModel.model_fields)
+
+    # Daily candles are written after midnight: a day is cached only after this
+    _DAILY_GRACE = timedelta(seconds=CACHE_CONFIG["daily_candle_grace_seconds"])
+
+    # Normalizes rows against ETFCandlestickModel, validated once per field set
+    _ROW_SCHEMA = RowSchema(ETFCandlestickModel)
+
+    # Column-wise normalization of the price fields; datetime is already stored
+    # as a string. Invalid values are kept so RowSchema drops the row as before.
+    _NORMALIZER = BatchNormalizer(
+        datetime_field=None,
+        float_fields=("open", "high", "low", "close", "volume"),
+        invalid_as_none=False,
+    )
+
     def __init__(self):
         self.mongo_config = MongoDBConfig()
         self.db_config = DB_ETF_CANDLESTICK
+        self._history_cache = get_history_cache()
+        self._single_flight = get_single_flight()
 
     def _get_collection(self):
         """Get MongoDB collection (both historical and latest use same collection)"""
-        client = self.mongo_config.get_client()
+        client = self.mongo_config.get_async_client()
         db = client[self.db_config["database_name"]]
         collection_name = self.db_config["collection_history_name"]
         return db[collection_name]
 
     async def _query_by_date_range(self, collection, symbol: str, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
-        """Query ETF data using datetime field with YYYY-MM-DD format"""
-        
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
-        
-        strategies = [
-            # Strategy 1: Direct string comparison with symbol filter
-            {
-                "symbol": symbol,
-                "datetime": {
-                    "$gte": start_date_str,
-                    "$lte": end_date_str
-                }
-            },
-            
-            # Strategy 2: Symbol filter only (if date range fails)
-            {
-                "symbol": symbol
+        """Query ETF data by symbol and range on the canonical `ts` field (index {symbol, ts}),
+        plus documents not migrated yet (read by their raw datetime)"""
+        query = {
+            "symbol": symbol,
+            TS_FIELD: {
+                "$gte": start_date,
+                "$lte": end_date
             }
-        ]
+        }
 
-        for i, strategy in enumerate(strategies, 1):
-            try:
-                logger.info(f"ETF Strategy {i} for symbol {symbol}: {strategy}")
-                cursor = collection.find(strategy).sort("datetime", -1)
-                results = list(cursor)
-                
-                if results:
-                    logger.info(f"ETF Strategy {i} found {len(results)} records for {symbol}")
-                    return results
-                else:
-                    logger.warning(f"ETF Strategy {i} returned no results for {symbol}")
-                    
-            except Exception as e:
-                logger.error(f"ETF Strategy {i} failed for {symbol}: {str(e)}")
-                continue
-
-        return []
+        try:
+            logger.info(f"ETF query for symbol {symbol}: {query}")
+            cursor = collection.find(query).sort(TS_FIELD, -1)
+            results = await cursor.to_list(length=None)
+            pending = await find_pending(
+                collection, {"symbol": symbol}, start=start_date, end=end_date
+            )
+            logger.info(
+                f"ETF query found {len(results)} records for {symbol} ({len(pending)} without ts)"
+            )
+            return merge_pending(results, pending)
+
+        except Exception as e:
+            logger.error(f"ETF query failed for {symbol}: {str(e)}")
+            return []
 
     async def get_etf_candlestick_data(self, request: ETFCandlestickRequest) -> ETFCandlestickResponse:
+        """Identical in-flight requests share a single query and response"""
+        return await self._single_flight.do(
+            request_key(request), lambda: self._get_etf_candlestick_data(request)
+        )
+
+    async def _get_etf_candlestick_data(self, request: ETFCandlestickRequest) -> ETFCandlestickResponse:
         """Get historical ETF candlestick data"""
         logger.info(f"Getting ETF candlestick data for {request.day} days, symbol: {request.symbol}")
+
+        # Delta for polling clients: only rows newer than the watermark
+        if request.since is not None:
+            return await self._get_since(request.symbol, request.since)
         
         if request.day == 0:
             # day=0 means realtime (latest records)
@@ -83,38 +171,277 @@ class ETFCandlestickService:
             start_date = end_date - timedelta(days=request.day)
             
             logger.info(f"ETF Date range for {request.symbol}: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+
+            if request.interval:
+                # Bars are aggregated in Mongo and bypass the history cache
+                rows = await self._get_bars(
+                    collection,
+                    request.symbol,
+                    datetime.combine(start_date.date(), time.min),
+                    datetime.combine(end_date.date(), time.max),
+                    request.interval,
+                )
+                logger.info(f"Found {len(rows)} ETF {request.interval} bars for {request.symbol}")
+                return ETFCandlestickResponse.model_construct(data=self._to_models(rows))
+
+            size = page_size(request.limit, request.cursor)
+            if size is not None:
+                # Paginated reads bypass the history cache: one bounded page per request
+                # Same whole-day bounds as the cached path
+                rows, next_cursor = await self._get_page(
+                    collection,
+                    request.symbol,
+                    datetime.combine(start_date.date(), time.min),
+                    datetime.combine(end_date.date(), time.max),
+                    size,
+                    request.cursor,
+                )
+                logger.info(f"Found {len(rows)} ETF records in page for {request.symbol} (limit {size})")
+                return ETFCandlestickResponse.model_construct(
+                    data=self._to_models(rows), next_cursor=next_cursor
+                )
+
+            async def _fetch(from_day: date, to_day: date) -> List[Dict[str, Any]]:
+                raw_data = await self._query_by_date_range(
+                    collection,
+                    request.symbol,
+                    datetime.combine(from_day, time.min),
+                    datetime.combine(to_day, time.max),
+                )
+                return self._to_rows(raw_data)
+
+            # Query data using date range strategy, closed days come from history cache
+            rows = await self._history_cache.get_range(
+                ("etf", request.symbol),
+                start_date.date(),
+                end_date.date(),
+                _fetch,
+                self._row_day,
+                grace=self._DAILY_GRACE,
+            )
             
-            # Query data using date range strategy
-            raw_data = await self._query_by_date_range(collection, request.symbol, start_date, end_date)
-            
-            logger.info(f"Found {len(raw_data)} ETF records for {request.symbol}")
+            logger.info(f"Found {len(rows)} ETF records for {request.symbol}")
             
-            # Convert to model objects
-            data = []
-            for item in raw_data:
-                try:
-                    # Convert ObjectId to string if present
-                    if "_id" in item:
-                        item["_id"] = str(item["_id"])
-                    
-                    etf_model = ETFCandlestickModel(**item)
-                    data.append(etf_model)
-                except Exception as e:
-                    logger.warning(f"Error parsing ETF item: {str(e)}, item: {item}")
-                    continue
+            data = self._to_models(rows)
             
             logger.info(f"Successfully processed {len(data)} ETF records")
             
-            return ETFCandlestickResponse(
+            return ETFCandlestickResponse.model_construct(
                 data=data
             )
             
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Error getting ETF candlestick data: {str(e)}")
             return ETFCandlestickResponse(
                 data=[]
             )
 
+    async def _get_page(
+        self,
+        collection,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Read one keyset page on (ts, _id) for a symbol (index {symbol, ts, _id})"""
+        documents, next_cursor = await fetch_page(
+            collection,
+            {"symbol": symbol, TS_FIELD: {"$gte": start_date, "$lte": end_date}},
+            self._PAGE_SORT,
+            limit,
+            cursor,
+            extra=await find_pending(
+                collection, {"symbol": symbol}, start=start_date, end=end_date
+            ),
+        )
+        return self._to_rows(documents), next_cursor
+
+    async def _get_bars(
+        self,
+        collection,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        interval: str,
+    ) -> List[Dict[str, Any]]:
+        """OHLC bars of a symbol for an interval, aggregated in Mongo ($dateTrunc + $group).
+
+        From the bucket of the earliest document without `ts` onwards, bars are
+        aggregated in Python (`ohlc_rows`) from both migrated and pending documents.
+        """
+        pending = await find_pending(
+            collection,
+            {"symbol": symbol},
+            start=start_date,
+            end=end_date,
+            projection=_BAR_PROJECTION,
+        )
+        if not pending:
+            return await self._aggregate_ts_bars(
+                collection, symbol, {"$gte": start_date, "$lte": end_date}, interval
+            )
+
+        cutoff = max(start_date, bucket_start(pending[0][TS_FIELD], interval))
+        docs = (
+            await collection.find(
+                {"symbol": symbol, TS_FIELD: {"$gte": cutoff, "$lte": end_date}},
+                _BAR_PROJECTION,
+            )
+            .sort(TS_FIELD, 1)
+            .to_list(length=None)
+        )
+        rows = [
+            {
+                "symbol": symbol,
+                **{name: bar[name] for name in _BAR_FIELDS},
+                "datetime": bar["_id"].strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            for bar in ohlc_rows(
+                merge_pending(docs, pending, descending=False), TS_FIELD, interval
+            )
+        ]
+        if start_date < cutoff:
+            rows.extend(
+                await self._aggregate_ts_bars(
+                    collection, symbol, {"$gte": start_date, "$lt": cutoff}, interval
+                )
+            )
+        return rows
+
+    async def _aggregate_ts_bars(
+        self, collection, symbol: str, bounds: Dict[str, Any], interval: str
+    ) -> List[Dict[str, Any]]:
+        """OHLC bars of a symbol's documents with `ts` in `bounds`, in Mongo"""
+        pipeline = ohlc_pipeline(
+            {"symbol": symbol, TS_FIELD: bounds},
+            f"${TS_FIELD}",
+            TS_FIELD,
+            interval,
+            {
+                "symbol": 1,
+                "open": 1,
+                "high": 1,
+                "low": 1,
+                "close": 1,
+                "volume": 1,
+                "datetime": {
+                    "$dateToString": {"format": "%Y-%m-%d %H:%M:%S", "date": "$_id"}
+                },
+            },
+            group_extra={"symbol": {"$first": "$symbol"}},
+        )
+        return await collection.aggregate(pipeline).to_list(length=None)
+
+    async def stream_etf_candlestick_data(
+        self, request: ETFCandlestickRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the rows of a request batch by batch from the Mongo cursor.
+
+        Bypasses the history cache and never materializes the result: each row
+        is normalized and yielded as soon as the driver receives its batch.
+        """
+        collection = self._get_collection()
+
+        if request.day == 0:
+            for row in (await self._get_latest_records(request.symbol)).data:
+                yield row
+            return
+        else:
+            # Same whole-day bounds as the cached path
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=request.day)
+            if request.interval:
+                # Aggregated bars are few: yield them directly
+                bars = await self._get_bars(
+                    collection,
+                    request.symbol,
+                    datetime.combine(start_date.date(), time.min),
+                    datetime.combine(end_date.date(), time.max),
+                    request.interval,
+                )
+                for row in self._to_models(bars):
+                    yield row
+                return
+
+            query = {
+                "symbol": request.symbol,
+                TS_FIELD: {
+                    "$gte": datetime.combine(start_date.date(), time.min),
+                    "$lte": datetime.combine(end_date.date(), time.max),
+                },
+            }
+            logger.info(f"ETF stream for symbol {request.symbol}: {query}")
+            cursor = (
+                collection.find(query)
+                .sort(self._PAGE_SORT)
+                .batch_size(STREAMING_CONFIG["batch_size"])
+            )
+            pending = await find_pending(
+                collection,
+                {"symbol": request.symbol},
+                start=query[TS_FIELD]["$gte"],
+                end=query[TS_FIELD]["$lte"],
+            )
+
+        async for batch in merge_pending_batches(
+            cursor_batches(cursor, STREAMING_CONFIG["batch_size"]), pending
+        ):
+            for item in self._to_rows(batch):
+                row = self._ROW_SCHEMA.project(item)
+                if row is None:
+                    logger.warning(f"Error parsing ETF item: {item}")
+                    continue
+                yield row
+
+    def _to_rows(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize a batch of ETF documents into rows"""
+        return self._NORMALIZER.normalize(items)
+
+    @staticmethod
+    def _row_day(row: Dict[str, Any]) -> Optional[date]:
+        """Day of a row (from ts), used to chunk the history cache"""
+        ts = row.get(TS_FIELD)
+        return ts.date() if isinstance(ts, datetime) else None
+
+    def _to_models(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize rows against ETFCandlestickModel (dicts, no per-row model)"""
+        return self._ROW_SCHEMA.project_all(rows)
+
+    async def _get_since(self, symbol: str, since: datetime) -> ETFCandlestickResponse:
+        """Rows of a symbol with ts > since (tail read on index {symbol, ts}).
+
+        Reads ascending, at most `max_page_size` rows; the watermark is the ts of
+        the newest returned row (since itself when nothing is new) so the client
+        polls again with since=watermark.
+        """
+        limit = PAGINATION_CONFIG["max_page_size"]
+        try:
+            collection = self._get_collection()
+            cursor = (
+                collection.find({"symbol": symbol, TS_FIELD: {"$gt": since}})
+                .sort(TS_FIELD, 1)
+                .limit(limit)
+            )
+            docs = await cursor.to_list(length=None)
+            pending = await find_pending(collection, {"symbol": symbol}, after=since)
+            docs = merge_pending(docs, pending, descending=False)[:limit]
+        except Exception as e:
+            logger.error(f"Error in ETF since query for {symbol}: {str(e)}")
+            return ETFCandlestickResponse(data=[], watermark=utc_ms(since))
+
+        watermark = docs[-1][TS_FIELD] if docs else since
+        logger.info(f"Found {len(docs)} ETF records for {symbol} since {since}")
+
+        # Newest first like the history queries
+        docs.reverse()
+        return ETFCandlestickResponse.model_construct(
+            data=self._to_models(self._to_rows(docs)), watermark=utc_ms(watermark)
+        )
+
     async def _get_latest_records(self, symbol: str) -> ETFCandlestickResponse:
         """Get latest records for realtime data (day=0)"""
         logger.info(f"Getting latest ETF candlestick records for symbol: {symbol}")
@@ -122,27 +449,25 @@ class ETFCandlestickService:
         try:
             collection = self._get_collection()
             
-            # Get latest record for specific symbol sorted by datetime
-            cursor = collection.find({"symbol": symbol}).sort("datetime", -1).limit(1)
-            raw_data = list(cursor)
+            # Get latest record for specific symbol sorted by ts (index {symbol, ts}),
+            # or a newer one without ts yet
+            match = {"symbol": symbol}
+            cursor = (
+                collection.find({**match, TS_FIELD: {"$ne": None}})
+                .sort(TS_FIELD, -1)
+                .limit(1)
+            )
+            docs = await cursor.to_list(length=None)
+            latest = newest(
+                docs[0] if docs else None, await latest_pending(collection, match)
+            )
+            raw_data = [latest] if latest else []
             
             logger.info(f"Found {len(raw_data)} latest ETF records for {symbol}")
             
-            # Convert to model objects
-            data = []
-            for item in raw_data:
-                try:
-                    # Convert ObjectId to string if present
-                    if "_id" in item:
-                        item["_id"] = str(item["_id"])
-                    
-                    etf_model = ETFCandlestickModel(**item)
-                    data.append(etf_model)
-                except Exception as e:
-                    logger.warning(f"Error parsing latest ETF item: {str(e)}, item: {item}")
-                    continue
+            data = self._to_models(self._to_rows(raw_data))
             
-            return ETFCandlestickResponse(
+            return ETFCandlestickResponse.model_construct(
                 data=data
             )
             
@@ -152,6 +477,45 @@ class ETFCandlestickService:
                 data=[]
             )
 
+    async def get_latest_by_symbols(
+        self, symbols: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Latest row of each symbol in one aggregation, keyed by symbol.
+
+        `$sort` on (symbol, ts) descending walks the {symbol, ts} index backwards
+        so `$group` + `$first` reads one document per symbol (DISTINCT_SCAN)
+        instead of one sorted query per symbol. Symbols without data are absent
+        from the result; query errors are raised to the caller.
+
+        The same aggregation over documents without `ts` (the null end of the
+        index, newest `_id` first) picks up rows not migrated yet.
+        """
+        collection = self._get_collection()
+        latest: Dict[str, Dict[str, Any]] = {}
+        for match, sort in (
+            ({TS_FIELD: {"$ne": None}}, {"symbol": -1, TS_FIELD: -1}),
+            (PENDING_FILTER, {"symbol": -1, TS_FIELD: -1, "_id": -1}),
+        ):
+            pipeline = [
+                {"$match": {"symbol": {"$in": symbols}, **match}},
+                {"$sort": sort},
+                {"$group": {"_id": "$symbol", "latest": {"$first": "$$ROOT"}}},
+            ]
+            groups = await collection.aggregate(pipeline).to_list(length=None)
+            for group in groups:
+                doc = group["latest"]
+                if doc.get(TS_FIELD) is None:
+                    doc[TS_FIELD] = raw_ts(doc)
+                    if doc[TS_FIELD] is None:
+                        continue
+                latest[group["_id"]] = newest(latest.get(group["_id"]), doc)
+        logger.info(
+            f"Found latest ETF records for {len(latest)}/{len(symbols)} symbols"
+        )
+
+        rows = self._to_models(self._to_rows(list(latest.values())))
+        return {row["symbol"]: row for row in rows}
+
 
 # Global service instance
 _etf_candlestick_service = None
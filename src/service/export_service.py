@@ -0,0 +1,208 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.config.logger_config import logger
+from src.config.mongo_config import MongoDBConfig
+from src.config.variable_config import (
+    DB_ETF_CANDLESTICK,
+    DB_GOLD_DATA,
+    STREAMING_CONFIG,
+)
+from src.utils.pending_ts import find_pending, merge_pending_batches
+from src.utils.streaming import cursor_batches
+from src.utils.time_fields import TS_FIELD
+
+# pyarrow có trong requirements.txt; import vẫn được bọc để phần còn lại của API
+# chạy được khi thiếu (các route export khi đó trả 501)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - phụ thuộc môi trường
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ("arrow", "parquet")
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Các cột giá/khối lượng (cùng tên với field trong Mongo)
+_PRICE_FIELDS = ["open", "high", "low", "close", "volume"]
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _ChunkSink:
+    """File-like chỉ ghi: giữ các byte đã ghi cho đến khi được `drain()`.
+
+    `tell()` trả về tổng số byte đã ghi nên Parquet writer vẫn ghi đúng offset
+    của các row group vào footer dù buffer được xả sau mỗi batch.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """Export dữ liệu gold/ETF dạng Arrow IPC stream hoặc Parquet.
+
+    Đọc cursor Mongo theo batch, dựng trực tiếp các cột Arrow từ document (không
+    qua model Pydantic cho từng row) và gửi từng record batch / row group ngay
+    khi được ghi, nên bộ nhớ chỉ phụ thuộc `export_batch_size`.
+    """
+
+    def __init__(self):
+        self.mongo_config = MongoDBConfig()
+
+    @staticmethod
+    def available() -> bool:
+        return pa is not None
+
+    def _get_collection(self, db_config: Dict[str, str]):
+        client = self.mongo_config.get_async_client()
+        return client[db_config["database_name"]][db_config["collection_history_name"]]
+
+    @staticmethod
+    def _schema(with_symbol: bool):
+        fields = [("symbol", pa.string())] if with_symbol else []
+        fields.append(("datetime", pa.timestamp("ms")))
+        fields.extend((name, pa.float64()) for name in _PRICE_FIELDS)
+        return pa.schema(fields)
+
+    async def _export(
+        self,
+        collection,
+        match: Dict[str, Any],
+        start_date: datetime,
+        end_date: datetime,
+        fmt: str,
+        with_symbol: bool,
+    ) -> AsyncIterator[bytes]:
+        batch_size = STREAMING_CONFIG["export_batch_size"]
+        schema = self._schema(with_symbol)
+        sink = _ChunkSink()
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(sink, schema)
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+
+        projection = {"_id": 0, TS_FIELD: 1, **{name: 1 for name in _PRICE_FIELDS}}
+        if with_symbol:
+            projection["symbol"] = 1
+        read_size = min(batch_size, STREAMING_CONFIG["batch_size"])
+        cursor = (
+            collection.find(
+                {**match, TS_FIELD: {"$gte": start_date, "$lte": end_date}},
+                projection,
+            )
+            .sort(TS_FIELD, 1)
+            .batch_size(read_size)
+        )
+
+        columns: Dict[str, list] = {name: [] for name in schema.names}
+        rows = 0
+        total = 0
+
+        def _write_batch() -> None:
+            writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+            for values in columns.values():
+                values.clear()
+
+        try:
+            # Document chưa có `ts` (migration chưa chạy tới) được chèn đúng thứ tự
+            pending = await find_pending(
+                collection, match, start=start_date, end=end_date, projection=projection
+            )
+            async for batch in merge_pending_batches(
+                cursor_batches(cursor, read_size), pending, descending=False
+            ):
+                for doc in batch:
+                    if with_symbol:
+                        columns["symbol"].append(doc.get("symbol"))
+                    columns["datetime"].append(doc.get(TS_FIELD))
+                    for name in _PRICE_FIELDS:
+                        columns[name].append(_to_float(doc.get(name)))
+                    rows += 1
+                    if rows == batch_size:
+                        _write_batch()
+                        total += rows
+                        rows = 0
+                        yield sink.drain()
+
+            if rows:
+                _write_batch()
+                total += rows
+        except Exception as e:
+            # Header HTTP đã gửi nên không đổi được status code. Không đóng writer
+            # (footer Parquet / end-of-stream Arrow sẽ làm file bị cắt trông như
+            # hoàn chỉnh): raise lại để server hủy response
+            logger.error(f"Error while exporting {fmt} after {total} rows: {str(e)}")
+            raise
+
+        writer.close()
+        logger.info(f"Exported {total} rows as {fmt}")
+        yield sink.drain()
+
+    def export_gold_data(
+        self, start_date: datetime, end_date: datetime, fmt: str
+    ) -> AsyncIterator[bytes]:
+        """Export gold_minute_data trong khoảng [start_date, end_date] theo ts tăng dần"""
+        collection = self._get_collection(DB_GOLD_DATA)
+        return self._export(
+            collection, {}, start_date, end_date, fmt, with_symbol=False
+        )
+
+    def export_etf_candlestick_data(
+        self, symbol: str, start_date: datetime, end_date: datetime, fmt: str
+    ) -> AsyncIterator[bytes]:
+        """Export etf_candlestick_historical của một symbol theo ts tăng dần"""
+        collection = self._get_collection(DB_ETF_CANDLESTICK)
+        return self._export(
+            collection, {"symbol": symbol}, start_date, end_date, fmt, with_symbol=True
+        )
+
+
+# Global service instance
+_export_service = None
+
+
+def get_export_service() -> ExportService:
+    """Singleton for ExportService"""
+    global _export_service
+    if _export_service is None:
+        _export_service = ExportService()
+    return _export_service
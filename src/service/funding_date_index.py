@@ -0,0 +1,94 @@
+import asyncio
+import bisect
+import time
+from typing import Dict, List, Optional
+
+from src.config.logger_config import logger
+
+
+class FundingDateIndex:
+    """Index in-memory: symbol -> danh sách `funding_date` (YYYY-MM-DD) đã sắp xếp.
+
+    Chuỗi YYYY-MM-DD sắp xếp theo thứ tự từ điển trùng với thứ tự thời gian nên
+    không cần `$dateFromString`. Lần đầu gặp một symbol sẽ đọc toàn bộ các ngày
+    của symbol đó (một lần, qua index `{symbol, funding_date}`); các lần sau chỉ
+    đọc những ngày >= ngày mới nhất đã biết.
+    """
+
+    def __init__(self, refresh_seconds: int = 60):
+        self._refresh_seconds = refresh_seconds
+        self._dates: Dict[str, List[str]] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def _stale_symbols(self, symbols: List[str]) -> List[str]:
+        now = time.monotonic()
+        return [
+            s
+            for s in symbols
+            if now - self._refreshed_at.get(s, float("-inf")) >= self._refresh_seconds
+        ]
+
+    async def refresh(self, coll, symbols: List[str]) -> None:
+        """Cập nhật incremental các ngày mới cho những symbol đã quá hạn refresh"""
+        if not self._stale_symbols(symbols):
+            return
+
+        async with self._lock:
+            stale = self._stale_symbols(symbols)
+            if not stale:
+                return
+
+            conditions = []
+            new_symbols = [s for s in stale if not self._dates.get(s)]
+            if new_symbols:
+                conditions.append({"symbol": {"$in": new_symbols}})
+            for symbol in stale:
+                known = self._dates.get(symbol)
+                if known:
+                    conditions.append(
+                        {"symbol": symbol, "funding_date": {"$gte": known[-1]}}
+                    )
+
+            pipeline = [
+                {"$match": {"$or": conditions}},
+                {"$project": {"_id": 0, "symbol": 1, "funding_date": 1}},
+                {
+                    "$group": {
+                        "_id": {"symbol": "$symbol", "funding_date": "$funding_date"}
+                    }
+                },
+            ]
+
+            added = 0
+            async for doc in coll.aggregate(pipeline):
+                symbol = doc["_id"].get("symbol")
+                funding_date = doc["_id"].get("funding_date")
+                if not isinstance(funding_date, str):
+                    continue
+                dates = self._dates.setdefault(symbol, [])
+                pos = bisect.bisect_left(dates, funding_date)
+                if pos == len(dates) or dates[pos] != funding_date:
+                    dates.insert(pos, funding_date)
+                    added += 1
+
+            refreshed_at = time.monotonic()
+            for symbol in stale:
+                self._refreshed_at[symbol] = refreshed_at
+
+            logger.info(
+                f"Funding date index refreshed for {len(stale)} symbols, {added} new dates"
+            )
+
+    def cutoff_date(self, symbols: List[str], days: int) -> Optional[str]:
+        """Ngày cũ nhất trong N ngày gần nhất (hợp của các symbol), None nếu chưa có dữ liệu"""
+        if days <= 0:
+            return None
+
+        recent = set()
+        for symbol in symbols:
+            recent.update(self._dates.get(symbol, [])[-days:])
+        if not recent:
+            return None
+
+        return sorted(recent, reverse=True)[:days][-1]
@@ -1,6 +1,8 @@
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+import asyncio
+from typing import AsyncIterator, List, Dict, Any, Optional
+from datetime import date, datetime
 from src.config.mongo_config import MongoDBConfig, get_db_and_collections_funding_rate
+from src.config.variable_config import CACHE_CONFIG, STREAMING_CONFIG
 from src.dto.funding_rate_dto import (
     FundingRateRequest,
     FundingRateResponse,
@@ -8,18 +10,99 @@ from src.dto.funding_rate_dto import (
     RealtimeFundingRateResponse,
 )
 from src.model.funding_rate import RealtimeFundingRate
-import asyncio
+from src.service.funding_date_index import FundingDateIndex
+from src.service.index_manager import IndexSpec, QueryPlan
+from src.service.realtime_funding_rate_cache import (
+    RealtimeFundingRateCache,
+    build_realtime_funding_rate,
+    funding_update_time,
+    get_realtime_funding_rate_cache,
+)
+from src.utils.day_range_cache import get_history_cache
+from src.utils.pagination import fetch_page, page_size
+from src.utils.single_flight import get_single_flight, request_key
+from src.utils.time_fields import utc_ms
+
+
+_DB_NAME, _REALTIME_COL, _HISTORY_COL = get_db_and_collections_funding_rate()
+
+# Index mà các query của service cần (tạo idempotent trong lifespan)
+INDEXES = [
+    IndexSpec(
+        database_name=_DB_NAME,
+        collection_name=_HISTORY_COL,
+        keys=[("symbol", 1), ("funding_date", -1), ("funding_time", -1), ("_id", -1)],
+    ),
+    IndexSpec(
+        database_name=_DB_NAME,
+        collection_name=_REALTIME_COL,
+        keys=[("symbol", 1), ("update_date", -1), ("update_time", -1)],
+    ),
+    # Refresher của RealtimeFundingRateCache poll theo watermark, không theo symbol
+    IndexSpec(
+        database_name=_DB_NAME,
+        collection_name=_REALTIME_COL,
+        keys=[("update_date", 1), ("update_time", 1)],
+    ),
+]
+
+# Query mẫu để kiểm tra plan bằng explain
+QUERY_PLANS = [
+    QueryPlan(
+        name="funding_rate_history",
+        database_name=_DB_NAME,
+        collection_name=_HISTORY_COL,
+        filter={"symbol": {"$in": ["BTCUSDT"]}, "funding_date": {"$gte": "2025-01-01"}},
+        sort=[("funding_date", -1), ("funding_time", -1), ("_id", -1)],
+    ),
+    QueryPlan(
+        name="funding_rate_realtime_watermark",
+        database_name=_DB_NAME,
+        collection_name=_REALTIME_COL,
+        filter={
+            "$or": [
+                {"update_date": {"$gt": "2025-01-01"}},
+                {"update_date": "2025-01-01", "update_time": {"$gte": "00:00:00"}},
+            ]
+        },
+        sort=[("update_date", 1), ("update_time", 1)],
+    ),
+]
 
 
 class FundingRateService:
-    def __init__(self, db_client=None):
-        self._client = db_client or MongoDBConfig().get_client()
+    # Thứ tự keyset của các trang lịch sử (_id để thứ tự là duy nhất)
+    _PAGE_SORT = [("funding_date", -1), ("funding_time", -1), ("_id", -1)]
+
+    # Cột của response CSV và layout=columns (các trường của `_to_row`)
+    COLUMNS = ["funding_time", "symbol", "funding_date", "fundingRate", "markPrice"]
+
+    def __init__(
+        self,
+        db_client=None,
+        realtime_cache: Optional[RealtimeFundingRateCache] = None,
+    ):
+        self._client = db_client or MongoDBConfig().get_async_client()
         self._db_name, self._realtime_col, self._history_col = (
             get_db_and_collections_funding_rate()
         )
+        self._date_index = FundingDateIndex(
+            CACHE_CONFIG.get("funding_date_index_refresh_seconds", 60)
+        )
+        self._realtime_cache = realtime_cache or get_realtime_funding_rate_cache()
+        self._history_cache = get_history_cache()
+        self._single_flight = get_single_flight()
 
     async def get_funding_rate_data(
         self, request: FundingRateRequest
+    ) -> FundingRateResponse:
+        """Request giống hệt nhau đang chạy đồng thời dùng chung một lần query"""
+        return await self._single_flight.do(
+            request_key(request), lambda: self._get_funding_rate_data(request)
+        )
+
+    async def _get_funding_rate_data(
+        self, request: FundingRateRequest
     ) -> FundingRateResponse:
         """Lấy dữ liệu lịch sử funding rate cho các symbol và số ngày được cung cấp.
 
@@ -32,93 +115,123 @@ class FundingRateService:
 
         - `symbols` là chuỗi các symbol cách nhau bởi dấu phẩy.
         - `days` chỉ ra số ngày gần nhất để trả về dữ liệu.
-        - Query sử dụng các trường `funding_date` và `symbol`.
+        - Query sử dụng các trường `funding_date` và `symbol`: danh sách ngày được
+          lấy từ `FundingDateIndex`, sau đó chỉ đọc các document từ ngày cũ nhất
+          trong N ngày đó trở đi (ngày đã đóng đọc từ history cache).
+        - Có `limit`/`cursor` thì đọc một trang keyset trên toàn bộ các symbol,
+          không qua history cache.
         """
         symbols = [s.strip() for s in request.symbols.split(",") if s.strip()]
 
-        loop = asyncio.get_running_loop()
+        if not self._db_name or not self._history_col:
+            return FundingRateResponse(data=[])
+        db = self._client[self._db_name]
+        coll = db[self._history_col]
 
-        def _query():
-            if not self._db_name or not self._history_col:
-                return []
-            db = self._client[self._db_name]
-            coll = db[self._history_col]
+        # N ngày gần nhất lấy từ index in-memory thay vì aggregate toàn bộ lịch sử
+        await self._date_index.refresh(coll, symbols)
+        cutoff = self._date_index.cutoff_date(symbols, request.days)
+        if cutoff is None:
+            return FundingRateResponse(data=[])
 
-            date_pipeline = [
-                {"$match": {"symbol": {"$in": symbols}}},
-                {
-                    "$addFields": {
-                        "_funding_date_obj": {
-                            "$dateFromString": {
-                                "dateString": "$funding_date",
-                                "format": "%Y-%m-%d",
-                            }
-                        }
-                    }
-                },
-                {"$sort": {"_funding_date_obj": -1}},
-                {
-                    "$group": {
-                        "_id": "$funding_date",
-                        "date_obj": {"$first": "$_funding_date_obj"},
-                    }
-                },
-                {"$sort": {"date_obj": -1}},
-                {"$limit": request.days},
-                {"$project": {"_id": 1}},
-            ]
+        size = page_size(request.limit, request.cursor)
+        if size is not None:
+            docs, next_cursor = await fetch_page(
+                coll,
+                {"symbol": {"$in": symbols}, "funding_date": {"$gte": cutoff}},
+                self._PAGE_SORT,
+                size,
+                request.cursor,
+            )
+            return FundingRateResponse.model_construct(
+                data=[self._to_row(doc) for doc in docs], next_cursor=next_cursor
+            )
 
-            recent_dates = [doc["_id"] for doc in coll.aggregate(date_pipeline)]
+        start_day = date.fromisoformat(cutoff)
+        end_day = max(date.today(), datetime.utcnow().date())
 
-            main_pipeline = [
-                {
-                    "$match": {
-                        "symbol": {"$in": symbols},
-                        "funding_date": {"$in": recent_dates},
-                    }
-                },
-                {
-                    "$addFields": {
-                        "_funding_date_obj": {
-                            "$dateFromString": {
-                                "dateString": "$funding_date",
-                                "format": "%Y-%m-%d",
-                            }
-                        }
+        async def _query_symbol(symbol: str) -> List[Dict[str, Any]]:
+            async def _fetch(from_day: date, to_day: date) -> List[Dict[str, Any]]:
+                # Range scan trên index {symbol, funding_date}
+                cursor = coll.find(
+                    {
+                        "symbol": symbol,
+                        "funding_date": {
+                            "$gte": from_day.isoformat(),
+                            "$lte": to_day.isoformat(),
+                        },
                     }
-                },
-                {"$sort": {"_funding_date_obj": -1, "funding_time": -1}},
-            ]
+                ).sort([("funding_date", -1), ("funding_time", -1)])
+                return [self._to_row(doc) async for doc in cursor]
 
-            # Chạy aggregation
-            docs = list(coll.aggregate(main_pipeline))
-            return docs
+            return await self._history_cache.get_range(
+                ("funding_rate", symbol), start_day, end_day, _fetch, self._row_day
+            )
+
+        # Mỗi symbol là một dãy chunk ngày riêng trong history cache
+        results = await asyncio.gather(*(_query_symbol(s) for s in symbols))
+
+        data: List[Dict[str, Any]] = [row for rows in results for row in rows]
+        data.sort(
+            key=lambda row: (row.get("funding_date") or "", row.get("funding_time") or ""),
+            reverse=True,
+        )
 
-        docs = await loop.run_in_executor(None, _query)
+        return FundingRateResponse.model_construct(data=data)
 
-        # Trả về docs với các trường gốc (funding_time, symbol, funding_date, fundingRate, markPrice)
-        data: List[Dict[str, Any]] = []
-        for doc in docs:
-            # Tạo dict sạch với các trường gốc
-            clean_doc = {
-                "funding_time": doc.get("funding_time"),
-                "symbol": doc.get("symbol"),
-                "funding_date": doc.get("funding_date"),
-                "fundingRate": doc.get("fundingRate"),
-                "markPrice": doc.get("markPrice"),
-            }
-            data.append(clean_doc)
+    async def stream_funding_rate_data(
+        self, request: FundingRateRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream lịch sử funding rate theo batch từ cursor Mongo (không qua history cache)"""
+        symbols = [s.strip() for s in request.symbols.split(",") if s.strip()]
+        if not self._db_name or not self._history_col:
+            return
+        coll = self._client[self._db_name][self._history_col]
 
-        return FundingRateResponse(data=data)
+        await self._date_index.refresh(coll, symbols)
+        cutoff = self._date_index.cutoff_date(symbols, request.days)
+        if cutoff is None:
+            return
+
+        cursor = (
+            coll.find({"symbol": {"$in": symbols}, "funding_date": {"$gte": cutoff}})
+            .sort(self._PAGE_SORT)
+            .batch_size(STREAMING_CONFIG["batch_size"])
+        )
+        async for doc in cursor:
+            yield self._to_row(doc)
+
+    @staticmethod
+    def _to_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Giữ các trường gốc (funding_time, symbol, funding_date, fundingRate, markPrice)"""
+        return {
+            "funding_time": doc.get("funding_time"),
+            "symbol": doc.get("symbol"),
+            "funding_date": doc.get("funding_date"),
+            "fundingRate": doc.get("fundingRate"),
+            "markPrice": doc.get("markPrice"),
+        }
+
+    @staticmethod
+    def _row_day(row: Dict[str, Any]) -> Optional[date]:
+        """Ngày funding của một row, dùng để chia chunk trong history cache"""
+        try:
+            return date.fromisoformat(str(row.get("funding_date")))
+        except ValueError:
+            return None
 
     async def get_realtime_funding_rate_data(
         self, request: RealtimeFundingRateRequest
     ) -> RealtimeFundingRateResponse:
         symbols = [s.strip() for s in request.symbols.split(",") if s.strip()]
 
-        loop = asyncio.get_running_loop()
+        # Trả lời từ bảng snapshot in-memory khi refresher nền đã chạy
+        if self._realtime_cache.ready:
+            return self._since_response(
+                self._realtime_cache.get(symbols), request.since
+            )
 
-        def _query():
+        async def _query():
             if not self._db_name or not self._realtime_col:
                 return []
             db = self._client[self._db_name]
@@ -134,31 +247,43 @@ class FundingRateService:
                 {"$replaceRoot": {"newRoot": "$doc"}},
             ]
 
-            docs = list(coll.aggregate(pipeline))
+            docs = await coll.aggregate(pipeline).to_list(length=None)
             return docs
 
-        docs = await loop.run_in_executor(None, _query)
+        docs = await _query()
 
         # Chuyển đổi thành các model RealtimeFundingRate
-        data: List[RealtimeFundingRate] = []
-        for doc in docs:
-            realtime_rate = RealtimeFundingRate(
-                symbol=doc.get("symbol"),
-                funding_cap=doc.get("funding_cap"),
-                funding_floor=doc.get("funding_floor"),
-                funding_hour=doc.get("funding_hour"),
-                funding_rate=doc.get("funding_rate"),
-                index_price=doc.get("index_price"),
-                interest_rate=doc.get("interest_rate"),
-                interval=doc.get("interval"),
-                mark_price=doc.get("mark_price"),
-                update_date=doc.get("update_date"),
-                update_time=doc.get("update_time"),
-            )
-            data.append(realtime_rate)
+        data: List[RealtimeFundingRate] = [
+            build_realtime_funding_rate(doc) for doc in docs
+        ]
+
+        return self._since_response(data, request.since)
+
+    @staticmethod
+    def _since_response(
+        data: List[RealtimeFundingRate], since: Optional[datetime]
+    ) -> RealtimeFundingRateResponse:
+        """Chỉ giữ các symbol cập nhật sau since, kèm watermark mới (nếu có since)"""
+        if since is None:
+            return RealtimeFundingRateResponse(data=data)
+
+        watermark = since
+        newer = []
+        for item in data:
+            updated = funding_update_time(item)
+            if updated is not None and updated > since:
+                newer.append(item)
+                watermark = max(watermark, updated)
+        return RealtimeFundingRateResponse(data=newer, watermark=utc_ms(watermark))
+
 
-        return RealtimeFundingRateResponse(data=data)
+# Global service instance
+_funding_rate_service = None
 
 
-def get_funding_rate_service():
-    return FundingRateService()
+def get_funding_rate_service() -> FundingRateService:
+    """Singleton for FundingRateService (giữ index ngày funding giữa các request)"""
+    global _funding_rate_service
+    if _funding_rate_service is None:
+        _funding_rate_service = FundingRateService()
+    return _funding_rate_service
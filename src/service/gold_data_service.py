@@ -1,21 +1,96 @@
-from typing import List, Optional
-from datetime import datetime, timedelta
-import pymongo
-from pymongo import MongoClient
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
 
 from src.config.mongo_config import MongoDBConfig
-from src.config.variable_config import DB_GOLD_DATA
+from src.config.variable_config import (
+    DB_GOLD_DATA,
+    PAGINATION_CONFIG,
+    STREAMING_CONFIG,
+)
 from src.dto.gold_data_dto import GoldDataRequest, GoldDataResponse
 from src.model.gold_data import GoldDataModel
+from src.service.gold_rollup_worker import (
+    ROLLUP_PROJECTION,
+    get_gold_rollup_worker,
+    rollup_collection_name,
+)
+from src.service.index_manager import IndexSpec, QueryPlan
 from src.config.logger_config import logger
+from src.utils.batch_normalizer import BatchNormalizer
+from src.utils.day_range_cache import get_history_cache
+from src.utils.fast_json import RowSchema
+from src.utils.pagination import InvalidCursorError, fetch_page, page_size
+from src.utils.pending_ts import (
+    find_pending,
+    latest_pending,
+    merge_pending,
+    merge_pending_batches,
+    newest,
+)
+from src.utils.resample import bucket_start, ohlc_pipeline, ohlc_rows
+from src.utils.single_flight import get_single_flight, request_key
+from src.utils.streaming import cursor_batches
+from src.utils.time_fields import RAW_TIME_FIELD, TS_FIELD, local_ms
+
+
+# Index mà các query của service cần (tạo idempotent trong lifespan)
+INDEXES = [
+    IndexSpec(
+        database_name=DB_GOLD_DATA["database_name"],
+        collection_name=DB_GOLD_DATA["collection_history_name"],
+        keys=[(TS_FIELD, 1), ("_id", 1)],
+    ),
+    # Document chưa có `ts` được đọc theo field gốc (src.utils.pending_ts)
+    IndexSpec(
+        database_name=DB_GOLD_DATA["database_name"],
+        collection_name=DB_GOLD_DATA["collection_history_name"],
+        keys=[(RAW_TIME_FIELD, 1)],
+    ),
+]
+
+# Query mẫu để kiểm tra plan bằng explain
+QUERY_PLANS = [
+    QueryPlan(
+        name="gold_history",
+        database_name=DB_GOLD_DATA["database_name"],
+        collection_name=DB_GOLD_DATA["collection_history_name"],
+        filter={TS_FIELD: {"$gte": datetime(2025, 1, 1), "$lte": datetime(2025, 1, 2)}},
+        sort=[(TS_FIELD, -1), ("_id", -1)],
+    ),
+]
+
+
+# Field đọc để gộp bar trong Python (bucket có document chưa có `ts`)
+_BAR_FIELDS = ("open", "high", "low", "close", "volume")
+_BAR_PROJECTION = {TS_FIELD: 1, **{name: 1 for name in _BAR_FIELDS}}
 
 
 class GoldDataService:
+    # Thứ tự keyset của các trang (ts giảm dần, _id để thứ tự là duy nhất)
+    _PAGE_SORT = [(TS_FIELD, -1), ("_id", -1)]
+
+    # Cột của response CSV và layout=columns
+    COLUMNS = list(GoldDataModel.model_fields)
+
+    # Chuẩn hóa row theo GoldDataModel, kiểm tra schema một lần cho mỗi tập field
+    _ROW_SCHEMA = RowSchema(GoldDataModel)
+
+    # Chuẩn hóa theo cột: datetime dạng chuỗi có phút, các field giá ép kiểu float
+    # (giá trị lỗi giữ nguyên để RowSchema loại row như trước)
+    _NORMALIZER = BatchNormalizer(
+        datetime_unit="s",
+        float_fields=("open", "high", "low", "close", "volume"),
+        invalid_as_none=False,
+    )
+
     def __init__(self):
         mongo_config = MongoDBConfig()
-        self._client = mongo_config.get_client()
+        self._client = mongo_config.get_async_client()
         self._db_name = DB_GOLD_DATA.get("database_name")
         self._history_col = DB_GOLD_DATA.get("collection_history_name")
+        self._history_cache = get_history_cache()
+        self._single_flight = get_single_flight()
+        self._rollup_worker = get_gold_rollup_worker()
 
     def _get_collection(self):
         """Get MongoDB collection for gold data"""
@@ -28,46 +103,24 @@ class GoldDataService:
     async def _query_by_date_range(
         self, collection, start_date: datetime, end_date: datetime
     ) -> List:
-        """Query gold data by date range"""
+        """Query gold data by date range on the canonical `ts` field (indexed),
+        plus documents not migrated yet (read by their raw datetime)"""
         try:
-            # Strategy 1: Query by datetime range
-            logger.info(
-                f"Gold Strategy 1: Querying by datetime range {start_date} to {end_date}"
-            )
+            logger.info(f"Gold query: ts range {start_date} to {end_date}")
 
             cursor = collection.find(
-                {"datetime": {"$gte": start_date, "$lte": end_date}}
+                {TS_FIELD: {"$gte": start_date, "$lte": end_date}}
             ).sort(
-                "datetime", -1
+                TS_FIELD, -1
             )  # Latest first
 
-            results = list(cursor)
-            logger.info(f"Gold Strategy 1: Found {len(results)} records")
-
-            if results:
-                return results
-
-            # Strategy 2: Try string-based date comparison if datetime fails
-            logger.info(f"Gold Strategy 2: Trying string-based date comparison")
-
-            start_str = start_date.strftime("%Y-%m-%d")
-            end_str = end_date.strftime("%Y-%m-%d")
-
-            cursor = collection.find(
-                {
-                    "$expr": {
-                        "$and": [
-                            {"$gte": [{"$substr": ["$datetime", 0, 10]}, start_str]},
-                            {"$lte": [{"$substr": ["$datetime", 0, 10]}, end_str]},
-                        ]
-                    }
-                }
-            ).sort("datetime", -1)
-
-            results = list(cursor)
-            logger.info(f"Gold Strategy 2: Found {len(results)} records")
+            results = await cursor.to_list(length=None)
+            pending = await find_pending(collection, start=start_date, end=end_date)
+            logger.info(
+                f"Gold query: Found {len(results)} records ({len(pending)} without ts)"
+            )
 
-            return results
+            return merge_pending(results, pending)
 
         except Exception as e:
             logger.error(f"Error in Gold date range query: {str(e)}")
@@ -87,16 +140,205 @@ class GoldDataService:
                 f"Invalid date format: {date_str}. Expected DDMMYYYY format."
             )
 
+    def _to_rows(self, items: List[dict]) -> List[dict]:
+        """Chuẩn hóa các document gold thành row theo batch (datetime dạng chuỗi có phút)"""
+        return self._NORMALIZER.normalize(items)
+
+    @staticmethod
+    def _row_day(row: dict) -> Optional[date]:
+        """Ngày của một row, dùng để chia chunk trong history cache"""
+        ts = row.get(TS_FIELD)
+        return ts.date() if isinstance(ts, datetime) else None
+
+    async def _get_rows(self, start_date: datetime, end_date: datetime) -> List[dict]:
+        """Lấy các row trong khoảng thời gian, ngày đã đóng đọc từ history cache"""
+        collection = self._get_collection()
+
+        async def _fetch(from_day: date, to_day: date) -> List[dict]:
+            raw_data = await self._query_by_date_range(
+                collection,
+                datetime.combine(from_day, time.min),
+                datetime.combine(to_day, time.max),
+            )
+            return self._to_rows(raw_data)
+
+        rows = await self._history_cache.get_range(
+            ("gold",), start_date.date(), end_date.date(), _fetch, self._row_day
+        )
+
+        # Cắt phần đầu/cuối của chunk ngày theo đúng mốc thời gian yêu cầu
+        return [row for row in rows if start_date <= row[TS_FIELD] <= end_date]
+
+    async def _get_page(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Đọc một trang theo keyset (ts, _id), không qua history cache"""
+        collection = self._get_collection()
+        documents, next_cursor = await fetch_page(
+            collection,
+            {TS_FIELD: {"$gte": start_date, "$lte": end_date}},
+            self._PAGE_SORT,
+            limit,
+            cursor,
+            extra=await find_pending(collection, start=start_date, end=end_date),
+        )
+        return self._to_rows(documents), next_cursor
+
+    async def _get_range_response(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        interval: Optional[str] = None,
+    ) -> GoldDataResponse:
+        """Response cho một khoảng thời gian: bar theo interval, một trang nếu có
+        limit/cursor, còn lại đọc qua history cache"""
+        if interval:
+            rows = await self._get_bars(start_date, end_date, interval)
+            logger.info(f"Found {len(rows)} gold {interval} bars")
+            return GoldDataResponse.model_construct(data=self._to_models(rows))
+
+        size = page_size(limit, cursor)
+        if size is None:
+            rows = await self._get_rows(start_date, end_date)
+            logger.info(f"Found {len(rows)} gold records")
+            return GoldDataResponse.model_construct(data=self._to_models(rows))
+
+        rows, next_cursor = await self._get_page(start_date, end_date, size, cursor)
+        logger.info(f"Found {len(rows)} gold records in page (limit {size})")
+        return GoldDataResponse.model_construct(
+            data=self._to_models(rows), next_cursor=next_cursor
+        )
+
+    async def _get_bars(
+        self, start_date: datetime, end_date: datetime, interval: str
+    ) -> List[dict]:
+        """Bar OHLC theo interval (không qua history cache).
+
+        Với khung đã gộp sẵn, các bucket đã đóng đọc từ collection nến tương ứng
+        và chỉ các bucket còn mở (từ watermark của rollup worker) được gộp trực
+        tiếp; khung khác hoặc khi worker chưa chạy thì gộp toàn bộ khoảng.
+        """
+        cutoff = self._rollup_worker.open_bucket(interval)
+        if cutoff is None:
+            return await self._aggregate_bars(start_date, end_date, interval)
+
+        rows: List[dict] = []
+        if end_date >= cutoff:
+            rows = await self._aggregate_bars(
+                max(start_date, cutoff), end_date, interval
+            )
+        if start_date < cutoff:
+            bounds = {"$gte": bucket_start(start_date, interval), "$lt": cutoff}
+            if end_date < cutoff:
+                bounds["$lte"] = end_date
+            db = self._client[self._db_name]
+            cursor = (
+                db[rollup_collection_name(interval)]
+                .find({"_id": bounds}, ROLLUP_PROJECTION)
+                .sort("_id", -1)
+            )
+            rows.extend(await cursor.to_list(length=None))
+        return rows
+
+    async def _aggregate_bars(
+        self, start_date: datetime, end_date: datetime, interval: str
+    ) -> List[dict]:
+        """Bar OHLC theo interval, gộp trực tiếp trên gold_minute_data.
+
+        Từ bucket của document chưa có `ts` sớm nhất trở đi, bar được gộp trong
+        Python (`ohlc_rows`) từ cả document đã có `ts` và document pending.
+        """
+        collection = self._get_collection()
+        pending = await find_pending(
+            collection, start=start_date, end=end_date, projection=_BAR_PROJECTION
+        )
+        if not pending:
+            return await self._aggregate_ts_bars(
+                {"$gte": start_date, "$lte": end_date}, interval
+            )
+
+        cutoff = max(start_date, bucket_start(pending[0][TS_FIELD], interval))
+        docs = (
+            await collection.find(
+                {TS_FIELD: {"$gte": cutoff, "$lte": end_date}}, _BAR_PROJECTION
+            )
+            .sort(TS_FIELD, 1)
+            .to_list(length=None)
+        )
+        rows = [
+            {
+                "datetime": bar["_id"].strftime("%Y-%m-%d %H:%M:%S"),
+                **{name: bar[name] for name in _BAR_FIELDS},
+            }
+            for bar in ohlc_rows(
+                merge_pending(docs, pending, descending=False), TS_FIELD, interval
+            )
+        ]
+        if start_date < cutoff:
+            rows.extend(
+                await self._aggregate_ts_bars(
+                    {"$gte": start_date, "$lt": cutoff}, interval
+                )
+            )
+        return rows
+
+    async def _aggregate_ts_bars(
+        self, bounds: Dict[str, Any], interval: str
+    ) -> List[dict]:
+        """Bar OHLC của các document có `ts` trong `bounds`, gộp trên Mongo"""
+        pipeline = ohlc_pipeline(
+            {TS_FIELD: bounds},
+            f"${TS_FIELD}",
+            TS_FIELD,
+            interval,
+            {
+                "datetime": {
+                    "$dateToString": {"format": "%Y-%m-%d %H:%M:%S", "date": "$_id"}
+                },
+                "open": 1,
+                "high": 1,
+                "low": 1,
+                "close": 1,
+                "volume": 1,
+            },
+        )
+        return await self._get_collection().aggregate(pipeline).to_list(length=None)
+
+    def _to_models(self, rows: List[dict]) -> List[Dict[str, Any]]:
+        """Chuẩn hóa rows theo GoldDataModel (dict, không dựng model cho từng row)"""
+        return self._ROW_SCHEMA.project_all(rows)
+
     async def get_gold_data(self, request: GoldDataRequest) -> GoldDataResponse:
+        """Identical in-flight requests share a single query and response"""
+        return await self._single_flight.do(
+            request_key(request), lambda: self._get_gold_data(request)
+        )
+
+    async def _get_gold_data(self, request: GoldDataRequest) -> GoldDataResponse:
         """Get historical gold data"""
         logger.info(
             f"Getting gold data - day: {request.day}, from_date: {request.from_date}, to_date: {request.to_date}"
         )
 
+        # Delta cho client polling: chỉ các row mới hơn watermark
+        if request.since is not None:
+            return await self._get_since(request.since)
+
         # Handle different parameter combinations
         if request.from_date and request.to_date:
             return await self._get_data_by_date_range(
-                request.from_date, request.to_date, request.day
+                request.from_date,
+                request.to_date,
+                request.day,
+                request.limit,
+                request.cursor,
+                request.interval,
             )
 
         # Handle day parameter
@@ -107,8 +349,6 @@ class GoldDataService:
             return await self._get_latest_records()
 
         try:
-            collection = self._get_collection()
-
             # Calculate date range (day-based)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=day)
@@ -117,129 +357,177 @@ class GoldDataService:
                 f"Gold date range: {start_date.strftime('%Y-%m-%d %H:%M:%S')} to {end_date.strftime('%Y-%m-%d %H:%M:%S')}"
             )
 
-            # Query data using date range strategy
-            raw_data = await self._query_by_date_range(collection, start_date, end_date)
-
-            logger.info(f"Found {len(raw_data)} gold records")
-
-            # Convert to model objects
-            data = []
-            for item in raw_data:
-                try:
-                    # Convert ObjectId to string if present
-                    if "_id" in item:
-                        item["_id"] = str(item["_id"])
-
-                    # Convert datetime to string format with minutes
-                    if "datetime" in item and isinstance(item["datetime"], datetime):
-                        item["datetime"] = item["datetime"].strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        )
-
-                    gold_model = GoldDataModel(**item)
-                    data.append(gold_model)
-                except Exception as e:
-                    logger.warning(f"Error parsing gold item: {str(e)}, item: {item}")
-                    continue
+            response = await self._get_range_response(
+                start_date, end_date, request.limit, request.cursor, request.interval
+            )
 
-            logger.info(f"Successfully processed {len(data)} gold records")
+            logger.info(f"Successfully processed {len(response.data)} gold records")
 
-            return GoldDataResponse(data=data)
+            return response
 
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Error getting gold data: {str(e)}")
             return GoldDataResponse(data=[])
 
     async def _get_data_by_date_range(
-        self, from_date: str, to_date: str, day: Optional[int] = None
+        self,
+        from_date: str,
+        to_date: str,
+        day: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        interval: Optional[str] = None,
     ) -> GoldDataResponse:
         """Get gold data by date range"""
         try:
-            # Parse dates from DDMMYYYY format
-            from_dt = self._parse_date_string(from_date)
-            to_dt = self._parse_date_string(to_date)
+            start_date, end_date = self._date_range_bounds(from_date, to_date, day)
 
-            # Nếu có day, tính toán lại from_date dựa trên to_date
-            if day is not None:
-                calculated_from = to_dt - timedelta(days=day)
-                # Sử dụng ngày muộn hơn giữa from_dt và calculated_from
-                from_dt = max(from_dt, calculated_from)
+            logger.info(f"Gold date range query: {start_date} to {end_date}")
 
-            # Set thời gian bắt đầu và kết thúc cho ngày
-            start_date = from_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_date = to_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+            return await self._get_range_response(
+                start_date, end_date, limit, cursor, interval
+            )
 
-            logger.info(f"Gold date range query: {start_date} to {end_date}")
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in gold date range query: {str(e)}")
+            return GoldDataResponse(data=[])
 
-            collection = self._get_collection()
+    def _date_range_bounds(
+        self, from_date: str, to_date: str, day: Optional[int] = None
+    ) -> Tuple[datetime, datetime]:
+        """Mốc đầu/cuối của khoảng from_date/to_date (DDMMYYYY), thu hẹp bởi day"""
+        # Parse dates from DDMMYYYY format
+        from_dt = self._parse_date_string(from_date)
+        to_dt = self._parse_date_string(to_date)
+
+        # Nếu có day, tính toán lại from_date dựa trên to_date
+        if day is not None:
+            calculated_from = to_dt - timedelta(days=day)
+            # Sử dụng ngày muộn hơn giữa from_dt và calculated_from
+            from_dt = max(from_dt, calculated_from)
+
+        # Set thời gian bắt đầu và kết thúc cho ngày
+        start_date = from_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = to_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+        return start_date, end_date
+
+    async def stream_gold_data(
+        self, request: GoldDataRequest
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream các row của request theo batch từ cursor Mongo.
+
+        Không qua history cache và không giữ kết quả trong bộ nhớ: mỗi row được
+        chuẩn hóa và trả về ngay khi driver nhận được batch chứa nó.
+        """
+        collection = self._get_collection()
+        day = request.day if request.day is not None else 1
 
-            # Query by date range using existing method
-            raw_data = await self._query_by_date_range(collection, start_date, end_date)
-
-            logger.info(f"Found {len(raw_data)} gold records in date range")
-
-            # Convert to model objects
-            data = []
-            for item in raw_data:
-                try:
-                    # Convert ObjectId to string if present
-                    if "_id" in item:
-                        item["_id"] = str(item["_id"])
-
-                    # Convert datetime to string format with minutes
-                    if "datetime" in item and isinstance(item["datetime"], datetime):
-                        item["datetime"] = item["datetime"].strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        )
-
-                    gold_model = GoldDataModel(**item)
-                    data.append(gold_model)
-                except Exception as e:
-                    logger.warning(f"Error parsing gold item in date range: {str(e)}")
+        if request.from_date and request.to_date:
+            start_date, end_date = self._date_range_bounds(
+                request.from_date, request.to_date, request.day
+            )
+        elif day == 0:
+            start_date, end_date = None, None
+        else:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=day)
+
+        if start_date is not None and request.interval:
+            # Số bar đã được gộp trên Mongo nên nhỏ: trả trực tiếp
+            bars = await self._get_bars(start_date, end_date, request.interval)
+            for row in self._to_models(bars):
+                yield row
+            return
+
+        if start_date is None:
+            for row in (await self._get_latest_records()).data:
+                yield row
+            return
+
+        logger.info(f"Gold stream: ts range {start_date} to {end_date}")
+        cursor = (
+            collection.find({TS_FIELD: {"$gte": start_date, "$lte": end_date}})
+            .sort(self._PAGE_SORT)
+            .batch_size(STREAMING_CONFIG["batch_size"])
+        )
+        pending = await find_pending(collection, start=start_date, end=end_date)
+
+        async for batch in merge_pending_batches(
+            cursor_batches(cursor, STREAMING_CONFIG["batch_size"]), pending
+        ):
+            for item in self._to_rows(batch):
+                row = self._ROW_SCHEMA.project(item)
+                if row is None:
+                    logger.warning(f"Error parsing gold item: {item}")
                     continue
+                yield row
+
+    async def _latest_document(self) -> Optional[dict]:
+        """Document mới nhất, kể cả document chưa có `ts`"""
+        collection = self._get_collection()
+        docs = (
+            await collection.find({TS_FIELD: {"$ne": None}})
+            .sort(TS_FIELD, -1)
+            .limit(1)
+            .to_list(length=None)
+        )
+        return newest(docs[0] if docs else None, await latest_pending(collection))
+
+    async def latest_ts(self) -> Optional[datetime]:
+        """ts của row mới nhất (watermark ban đầu cho client theo dõi dữ liệu mới)"""
+        doc = await self._latest_document()
+        return doc[TS_FIELD] if doc else None
+
+    async def _get_since(self, since: datetime) -> GoldDataResponse:
+        """Các row có ts > since (tail read trên index ts).
+
+        Đọc tăng dần và tối đa `max_page_size` row; watermark là ts của row mới
+        nhất được trả về (giữ nguyên since nếu không có row mới) để client gọi
+        tiếp với since=watermark. `ts` gold là giờ local của server nên `since`
+        là giờ local và watermark là epoch ms của giờ local đó (`local_ms`).
+        """
+        limit = PAGINATION_CONFIG["max_page_size"]
+        try:
+            collection = self._get_collection()
+            cursor = (
+                collection.find({TS_FIELD: {"$gt": since}})
+                .sort(TS_FIELD, 1)
+                .limit(limit)
+            )
+            docs = await cursor.to_list(length=None)
+            pending = await find_pending(collection, after=since)
+            docs = merge_pending(docs, pending, descending=False)[:limit]
+        except Exception as e:
+            logger.error(f"Error in gold since query: {str(e)}")
+            return GoldDataResponse(data=[], watermark=local_ms(since))
 
-            return GoldDataResponse(data=data)
+        watermark = docs[-1][TS_FIELD] if docs else since
+        logger.info(f"Found {len(docs)} gold records since {since}")
 
-        except Exception as e:
-            logger.error(f"Error in gold date range query: {str(e)}")
-            return GoldDataResponse(data=[])
+        # Mới nhất trước như các query lịch sử
+        docs.reverse()
+        return GoldDataResponse.model_construct(
+            data=self._to_models(self._to_rows(docs)), watermark=local_ms(watermark)
+        )
 
     async def _get_latest_records(self) -> GoldDataResponse:
         """Get latest records for realtime data (day=0)"""
         logger.info(f"Getting latest gold records")
 
         try:
-            collection = self._get_collection()
-
-            # Get latest record sorted by datetime
-            cursor = collection.find().sort("datetime", -1).limit(1)
-            raw_data = list(cursor)
+            # Latest record by ts (indexed), or a newer one without ts yet
+            latest = await self._latest_document()
+            raw_data = [latest] if latest else []
 
             logger.info(f"Found {len(raw_data)} latest gold records")
 
-            # Convert to model objects
-            data = []
-            for item in raw_data:
-                try:
-                    # Convert ObjectId to string if present
-                    if "_id" in item:
-                        item["_id"] = str(item["_id"])
-
-                    # Convert datetime to string format with minutes
-                    if "datetime" in item and isinstance(item["datetime"], datetime):
-                        item["datetime"] = item["datetime"].strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        )
-
-                    gold_model = GoldDataModel(**item)
-                    data.append(gold_model)
-                except Exception as e:
-                    logger.warning(
-                        f"Error parsing latest gold item: {str(e)}, item: {item}"
-                    )
-                    continue
+            data = self._to_models(self._to_rows(raw_data))
 
-            return GoldDataResponse(data=data)
+            return GoldDataResponse.model_construct(data=data)
 
         except Exception as e:
             logger.error(f"Error getting latest gold records: {str(e)}")
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.config.logger_config import logger
+from src.config.mongo_config import MongoDBConfig
+from src.config.variable_config import DB_GOLD_DATA, ROLLUP_CONFIG
+from src.utils.pending_ts import PENDING_FILTER
+from src.utils.resample import bucket_start, ohlc_pipeline
+from src.utils.time_fields import TS_FIELD, raw_ts
+
+# Các khung được gộp sẵn; interval khác (4h, 1w) vẫn gộp trực tiếp khi request
+ROLLUP_INTERVALS = ("5m", "15m", "1h", "1d")
+
+_STATE_ID = "gold_minute_data"
+
+# Field của document nến: _id là thời điểm bắt đầu bucket
+ROLLUP_PROJECTION = {
+    "_id": 0,
+    "datetime": 1,
+    "open": 1,
+    "high": 1,
+    "low": 1,
+    "close": 1,
+    "volume": 1,
+}
+
+
+def rollup_collection_name(interval: str) -> str:
+    return f"{DB_GOLD_DATA['collection_rollup_prefix']}{interval}"
+
+
+class GoldRollupWorker:
+    """Duy trì incremental các collection nến gold (5m/15m/1h/1d) từ gold_minute_data.
+
+    Watermark là `ts` mới nhất đã được gộp (lưu trong collection state để
+    process khởi động lại không phải build lại từ đầu). Mỗi lần chạy chỉ gộp lại
+    các bucket từ bucket chứa watermark trở đi — tức các bucket còn mở — và ghi
+    đè bằng `$merge` theo `_id`. Lần chạy đầu tiên build toàn bộ lịch sử.
+
+    Watermark không vượt quá document chưa có `ts` (collector mới ghi, migration
+    chưa chạy tới) cũ nhất: bucket chứa nó vẫn mở và được service gộp trực tiếp
+    cho tới khi migration ghi `ts`. Dữ liệu ghi muộn với `ts` thuộc một bucket
+    đã đóng không được gộp lại.
+    """
+
+    def __init__(self, db_client=None, refresh_seconds: Optional[float] = None):
+        self._client = db_client
+        self._refresh_seconds = refresh_seconds or ROLLUP_CONFIG.get(
+            "gold_refresh_seconds", 60
+        )
+        self._watermark: Optional[datetime] = None
+        self._state_loaded = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        return self._watermark
+
+    def _get_db(self):
+        client = self._client or MongoDBConfig().get_async_client()
+        return client[DB_GOLD_DATA["database_name"]]
+
+    def open_bucket(self, interval: str) -> Optional[datetime]:
+        """Bucket đầu tiên còn mở của một khung đã gộp sẵn.
+
+        Các bucket trước mốc này đã đầy đủ trong collection nến; None nếu khung
+        không được gộp sẵn hoặc worker chưa chạy xong lần nào.
+        """
+        if interval not in ROLLUP_INTERVALS or self._watermark is None:
+            return None
+        return bucket_start(self._watermark, interval)
+
+    async def _load_state(self, db) -> None:
+        state = await db[DB_GOLD_DATA["collection_rollup_state_name"]].find_one(
+            {"_id": _STATE_ID}
+        )
+        self._watermark = (state or {}).get("watermark")
+        self._state_loaded = True
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Gộp các bucket còn mở của mọi khung và đẩy watermark lên `ts` mới nhất"""
+        db = self._get_db()
+        if not self._state_loaded:
+            await self._load_state(db)
+
+        source = db[DB_GOLD_DATA["collection_history_name"]]
+        latest = (
+            await source.find({TS_FIELD: {"$ne": None}}, {TS_FIELD: 1})
+            .sort(TS_FIELD, -1)
+            .limit(1)
+            .to_list(length=None)
+        )
+        if not latest:
+            return {"watermark": self._watermark, "intervals": []}
+        latest_ts = latest[0][TS_FIELD]
+        pending_ts = await self._earliest_pending_ts(source)
+        watermark = latest_ts if pending_ts is None else min(latest_ts, pending_ts)
+
+        for interval in ROLLUP_INTERVALS:
+            bounds: Dict[str, Any] = {"$lte": latest_ts}
+            if self._watermark is not None:
+                bounds["$gte"] = bucket_start(self._watermark, interval)
+            else:
+                bounds["$ne"] = None
+
+            pipeline = ohlc_pipeline(
+                {TS_FIELD: bounds},
+                f"${TS_FIELD}",
+                TS_FIELD,
+                interval,
+                {
+                    "_id": 1,
+                    "datetime": {
+                        "$dateToString": {
+                            "format": "%Y-%m-%d %H:%M:%S",
+                            "date": "$_id",
+                        }
+                    },
+                    "open": 1,
+                    "high": 1,
+                    "low": 1,
+                    "close": 1,
+                    "volume": 1,
+                },
+            )
+            pipeline.append(
+                {
+                    "$merge": {
+                        "into": rollup_collection_name(interval),
+                        "on": "_id",
+                        "whenMatched": "replace",
+                        "whenNotMatched": "insert",
+                    }
+                }
+            )
+            await source.aggregate(pipeline).to_list(length=None)
+
+        await db[DB_GOLD_DATA["collection_rollup_state_name"]].update_one(
+            {"_id": _STATE_ID},
+            {"$set": {"watermark": watermark, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        if self._watermark is None:
+            logger.info(f"Gold rollups built up to {watermark}")
+        self._watermark = watermark
+        return {"watermark": watermark, "intervals": list(ROLLUP_INTERVALS)}
+
+    @staticmethod
+    async def _earliest_pending_ts(source) -> Optional[datetime]:
+        """ts (parse từ field gốc) nhỏ nhất của các document chưa có `ts`"""
+        docs = await source.find(PENDING_FILTER, {"datetime": 1}).to_list(length=None)
+        values = [ts for ts in map(raw_ts, docs) if ts is not None]
+        return min(values, default=None)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error running gold rollup worker: {str(e)}")
+            await asyncio.sleep(self._refresh_seconds)
+
+    def start(self):
+        """Khởi động task gộp nến nền (gọi trong lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Gold rollup worker started (every {self._refresh_seconds}s)")
+
+    async def stop(self):
+        """Dừng task gộp nến nền"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global worker instance
+_gold_rollup_worker = None
+
+
+def get_gold_rollup_worker() -> GoldRollupWorker:
+    """Singleton for GoldRollupWorker"""
+    global _gold_rollup_worker
+    if _gold_rollup_worker is None:
+        _gold_rollup_worker = GoldRollupWorker()
+    return _gold_rollup_worker
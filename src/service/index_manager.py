@@ -0,0 +1,191 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from pymongo import IndexModel
+
+from src.config.logger_config import logger
+from src.config.mongo_config import MongoDBConfig
+
+
+class IndexSpec(BaseModel):
+    """Một index mà query của service cần"""
+
+    database_name: str
+    collection_name: str
+    keys: List[Tuple[str, int]]
+
+
+class QueryPlan(BaseModel):
+    """Một query mẫu của service, dùng để kiểm tra plan bằng explain"""
+
+    name: str
+    database_name: str
+    collection_name: str
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, int]]] = None
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Liệt kê tất cả stage trong cây winning plan"""
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("inputStage", "queryPlan"):
+            stages.extend(_plan_stages(plan.get(key)))
+        for child in plan.get("inputStages", []) or []:
+            stages.extend(_plan_stages(child))
+    return stages
+
+
+class IndexManager:
+    """Áp dụng idempotent các index khai báo cạnh mỗi service và kiểm tra plan.
+
+    Mỗi service khai báo `INDEXES` (các `IndexSpec`) và `QUERY_PLANS` (các
+    `QueryPlan`). `ensure_indexes()` chạy trong lifespan; `verify_plans()` chạy
+    explain cho từng query mẫu và đánh dấu các query có winning plan là COLLSCAN.
+    Đây là nơi duy nhất tạo index của các collection này.
+
+    Trong lifespan cả hai chạy trong một task nền (`start()`) để app phục vụ
+    request ngay cả khi index đang được build.
+    """
+
+    def __init__(
+        self,
+        indexes: List[IndexSpec],
+        plans: List[QueryPlan],
+        db_client=None,
+    ):
+        self._client = db_client
+        self._indexes = indexes
+        self._plans = plans
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_collection(self, database_name: str, collection_name: str):
+        client = self._client or MongoDBConfig().get_async_client()
+        return client[database_name][collection_name]
+
+    async def ensure_indexes(self) -> List[Dict[str, Any]]:
+        """Tạo các index còn thiếu (create_indexes bỏ qua index đã tồn tại)"""
+        grouped: Dict[Tuple[str, str], List[IndexSpec]] = {}
+        for spec in self._indexes:
+            grouped.setdefault((spec.database_name, spec.collection_name), []).append(
+                spec
+            )
+
+        results = []
+        for (database_name, collection_name), specs in grouped.items():
+            coll = self._get_collection(database_name, collection_name)
+            try:
+                names = await coll.create_indexes(
+                    [IndexModel(spec.keys) for spec in specs]
+                )
+                for name in names:
+                    results.append(
+                        {
+                            "collection": f"{database_name}.{collection_name}",
+                            "index": name,
+                            "status": "OK",
+                        }
+                    )
+                logger.info(
+                    f"Indexes ready on {database_name}.{collection_name}: {', '.join(names)}"
+                )
+            except Exception as e:
+                logger.error(
+                    f"Error creating indexes on {database_name}.{collection_name}: {str(e)}"
+                )
+                results.append(
+                    {
+                        "collection": f"{database_name}.{collection_name}",
+                        "index": None,
+                        "status": "ERROR",
+                        "error": str(e),
+                    }
+                )
+        return results
+
+    async def verify_plans(self) -> List[Dict[str, Any]]:
+        """Explain từng query mẫu, status COLLSCAN nếu winning plan quét toàn bộ collection"""
+        results = []
+        for plan in self._plans:
+            coll = self._get_collection(plan.database_name, plan.collection_name)
+            result: Dict[str, Any] = {
+                "name": plan.name,
+                "collection": f"{plan.database_name}.{plan.collection_name}",
+            }
+            try:
+                cursor = coll.find(plan.filter)
+                if plan.sort:
+                    cursor = cursor.sort(plan.sort)
+                explain = await cursor.explain()
+                winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+                stages = _plan_stages(winning)
+                result["stages"] = stages
+                if "COLLSCAN" in stages:
+                    result["status"] = "COLLSCAN"
+                    logger.warning(
+                        f"Query plan {plan.name} on {result['collection']} uses COLLSCAN: {stages}"
+                    )
+                else:
+                    result["status"] = "OK"
+            except Exception as e:
+                logger.error(f"Error explaining query plan {plan.name}: {str(e)}")
+                result["status"] = "ERROR"
+                result["error"] = str(e)
+            results.append(result)
+        return results
+
+    async def _setup(self):
+        try:
+            await self.ensure_indexes()
+            await self.verify_plans()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Index setup failed: {str(e)}")
+
+    def start(self):
+        """Tạo index và kiểm tra plan trong một task nền (gọi trong lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._setup())
+
+    async def stop(self):
+        """Hủy task tạo index nếu vẫn đang chạy"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global manager instance
+_index_manager = None
+
+
+def get_index_manager() -> IndexManager:
+    """Singleton for IndexManager, gom INDEXES/QUERY_PLANS của các service"""
+    global _index_manager
+    if _index_manager is None:
+        # Import tại đây vì các service import IndexSpec/QueryPlan từ module này
+        from src.service import (
+            btc_dominance_service,
+            etf_candlestick_service,
+            funding_rate_service,
+            gold_data_service,
+        )
+
+        modules = (
+            funding_rate_service,
+            btc_dominance_service,
+            etf_candlestick_service,
+            gold_data_service,
+        )
+        _index_manager = IndexManager(
+            indexes=[spec for m in modules for spec in m.INDEXES],
+            plans=[plan for m in modules for plan in m.QUERY_PLANS],
+        )
+    return _index_manager
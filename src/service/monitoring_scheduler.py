@@ -0,0 +1,177 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config.logger_config import logger
+from src.config.variable_config import MONITORING_CONFIG
+from src.service.monitoring_services import (
+    get_btc_dominance_monitoring_service,
+    get_etf_candlestick_monitoring_service,
+    get_funding_rate_monitoring_service,
+    get_gold_data_monitoring_service,
+)
+from src.utils.single_flight import SingleFlight
+
+FUNDING_RATE_CHECK = "funding-rate"
+BTC_DOMINANCE_CHECK = "btc-dominance"
+ETF_CANDLESTICK_CHECK = "etf-candlestick"
+GOLD_DATA_CHECK = "gold-data"
+
+# Mức độ nghiêm trọng của status để gộp thành một status chung
+_SEVERITY = {"OK": 0, "NO_CHECK_NEEDED": 0, "WARNING": 1, "ERROR": 2, "TIMEOUT": 2}
+_OVERALL_STATUS = {0: "OK", 1: "WARNING", 2: "ERROR"}
+
+Check = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class MonitoringScheduler:
+    """Chạy các check monitoring định kỳ và giữ kết quả mới nhất trong bộ nhớ.
+
+    Mỗi check có một task riêng với chu kỳ riêng. Endpoint đọc kết quả đã cache;
+    `refresh` (hoặc chưa có kết quả nào) thì chạy check trực tiếp. Các lần chạy
+    cùng một check đang diễn ra đồng thời được gộp qua SingleFlight.
+    """
+
+    def __init__(self, checks: Optional[Dict[str, Tuple[Check, float]]] = None):
+        if checks is None:
+            funding_monitor = get_funding_rate_monitoring_service()
+            # Cửa sổ funding chỉ mở `tolerance_minutes` sau mỗi mốc: chạy ít nhất
+            # một lần trong mỗi cửa sổ để kết quả cache không bỏ lỡ mốc nào
+            funding_interval = min(
+                MONITORING_CONFIG["funding_rate_check_interval"],
+                MONITORING_CONFIG["tolerance_minutes"] * 60,
+            )
+            checks = {
+                FUNDING_RATE_CHECK: (
+                    funding_monitor.check_funding_rate,
+                    funding_interval,
+                ),
+                BTC_DOMINANCE_CHECK: (
+                    get_btc_dominance_monitoring_service().check_btc_dominance,
+                    MONITORING_CONFIG["btc_dominance_check_interval"],
+                ),
+                ETF_CANDLESTICK_CHECK: (
+                    get_etf_candlestick_monitoring_service().check_etf_candlestick,
+                    MONITORING_CONFIG["etf_candlestick_check_interval"],
+                ),
+                GOLD_DATA_CHECK: (
+                    get_gold_data_monitoring_service().check_gold_data,
+                    MONITORING_CONFIG["gold_data_check_interval"],
+                ),
+            }
+        self._checks = checks
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._single_flight = SingleFlight()
+        self._tasks: List[asyncio.Task] = []
+
+    async def run_check(self, name: str) -> Dict[str, Any]:
+        """Chạy check ngay và cập nhật cache"""
+        check, _ = self._checks[name]
+
+        async def run() -> Dict[str, Any]:
+            result = await check()
+            self._results[name] = result
+            return result
+
+        return await self._single_flight.do(name, run)
+
+    async def get_result(self, name: str, refresh: bool = False) -> Dict[str, Any]:
+        """Kết quả cache của check, chạy trực tiếp nếu `refresh` hoặc chưa có"""
+        result = self._results.get(name)
+        if refresh or result is None:
+            result = await self.run_check(name)
+        return result
+
+    async def _bounded_result(
+        self, name: str, refresh: bool, timeout: float
+    ) -> Dict[str, Any]:
+        """get_result với timeout; check quá hạn vẫn chạy tiếp và cập nhật cache"""
+        try:
+            return await asyncio.wait_for(self.get_result(name, refresh), timeout)
+        except asyncio.TimeoutError:
+            status = "TIMEOUT"
+            message = f"{name} check did not finish within {timeout}s"
+        except Exception as e:
+            status = "ERROR"
+            message = f"Error running {name} check: {str(e)}"
+        logger.warning(message)
+        return {"status": status, "alert_message": message}
+
+    async def check_all(
+        self, refresh: bool = False, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Kết quả của mọi check cùng lúc (asyncio.gather) và một status chung.
+
+        Mỗi check bị giới hạn bởi `timeout` nên thời gian chờ bằng check chậm
+        nhất chứ không phải tổng; status chung là status nặng nhất.
+        """
+        timeout = timeout or MONITORING_CONFIG.get("check_timeout_seconds", 10)
+        names = list(self._checks)
+        results = await asyncio.gather(
+            *(self._bounded_result(name, refresh, timeout) for name in names)
+        )
+
+        checks = dict(zip(names, results))
+        statuses = {
+            name: result.get("overall_status") or result.get("status", "ERROR")
+            for name, result in checks.items()
+        }
+        severity = max(
+            (_SEVERITY.get(status, 2) for status in statuses.values()), default=0
+        )
+        return {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "overall_status": _OVERALL_STATUS[severity],
+            "failed_checks": [
+                name for name, status in statuses.items() if _SEVERITY.get(status, 2)
+            ],
+            "checks": checks,
+        }
+
+    async def _run(self, name: str, interval: float):
+        while True:
+            try:
+                await self.run_check(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error running {name} monitoring check: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def start(self):
+        """Khởi động một task cho mỗi check (gọi trong lifespan)"""
+        if self._tasks:
+            return
+        for name, (_, interval) in self._checks.items():
+            self._tasks.append(asyncio.create_task(self._run(name, interval)))
+        logger.info(
+            "Monitoring scheduler started ("
+            + ", ".join(
+                f"{name} every {interval}s"
+                for name, (_, interval) in self._checks.items()
+            )
+            + ")"
+        )
+
+    async def stop(self):
+        """Dừng các task check"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+
+# Global scheduler instance
+_monitoring_scheduler = None
+
+
+def get_monitoring_scheduler() -> MonitoringScheduler:
+    """Singleton for MonitoringScheduler"""
+    global _monitoring_scheduler
+    if _monitoring_scheduler is None:
+        _monitoring_scheduler = MonitoringScheduler()
+    return _monitoring_scheduler
@@ -1,4 +1,5 @@
 import asyncio
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple, Any
 from src.config.variable_config import MONITORING_CONFIG
@@ -15,9 +16,15 @@ from src.service.etf_candlestick_service import (
     ETFCandlestickService,
     get_etf_candlestick_service,
 )
+from src.service.gold_data_service import GoldDataService, get_gold_data_service
 from src.dto.funding_rate_dto import RealtimeFundingRateRequest
 from src.dto.btc_dominance_dto import BTCDominanceRequest
-from src.dto.etf_candlestick_dto import ETFCandlestickRequest
+
+
+def _seconds_of_day(time_str: str) -> int:
+    """"HH:MM:SS" -> số giây tính từ 00:00:00"""
+    hours, minutes, seconds = (int(part) for part in time_str.split(":"))
+    return hours * 3600 + minutes * 60 + seconds
 
 
 class FundingRateMonitoringService:
@@ -27,6 +34,7 @@ class FundingRateMonitoringService:
         self.funding_service = funding_service or get_funding_rate_service()
         self.expected_symbols = MONITORING_CONFIG.get("expected_symbols", [])
         self.tolerance_minutes = MONITORING_CONFIG.get("tolerance_minutes", 30)
+        self._schedules = self._build_schedules()
 
     def _get_funding_cycles(self) -> Dict[str, List[str]]:
         """Get funding rate cycles"""
@@ -43,108 +51,119 @@ class FundingRateMonitoringService:
             "1h": [f"{hour:02d}:00:00" for hour in range(24)],
         }
 
+    def _build_schedules(self) -> Dict[str, Tuple[List[int], List[str]]]:
+        """Mốc funding của mỗi chu kỳ: (giây trong ngày tăng dần, chuỗi HH:MM:SS)"""
+        schedules = {}
+        for cycle_type, funding_times in self._get_funding_cycles().items():
+            pairs = sorted((_seconds_of_day(t), t) for t in funding_times)
+            schedules[cycle_type] = (
+                [seconds for seconds, _ in pairs],
+                [time_str for _, time_str in pairs],
+            )
+        return schedules
+
     def _get_current_funding_schedule(
-        self, cycle_type: str
+        self, cycle_type: str, now: Optional[datetime] = None
     ) -> Tuple[str, str, bool, str]:
-        now = datetime.now()
-        funding_times = self._get_funding_cycles()[cycle_type]
+        now = now or datetime.now()
+        seconds, funding_times = self._schedules[cycle_type]
         today = now.strftime("%Y-%m-%d")
+        now_seconds = now.hour * 3600 + now.minute * 60 + now.second
+        tolerance = self.tolerance_minutes * 60
 
-        for time_str in funding_times:
-            expected_datetime = datetime.strptime(
-                f"{today} {time_str}", "%Y-%m-%d %H:%M:%S"
-            )
-
-            if (
-                expected_datetime
-                <= now
-                <= expected_datetime + timedelta(minutes=self.tolerance_minutes)
-            ):
-                return today, time_str, True, "current"
+        # Mốc sớm nhất có cửa sổ [mốc, mốc + tolerance] còn chứa thời điểm hiện tại
+        i = bisect_left(seconds, now_seconds - tolerance)
+        if i < len(seconds) and seconds[i] <= now_seconds:
+            return today, funding_times[i], True, "current"
 
-        for time_str in funding_times:
-            expected_datetime = datetime.strptime(
-                f"{today} {time_str}", "%Y-%m-%d %H:%M:%S"
-            )
-            if now < expected_datetime:
-                return today, time_str, False, "upcoming"
+        i = bisect_right(seconds, now_seconds)
+        if i < len(seconds):
+            return today, funding_times[i], False, "upcoming"
 
         tomorrow = (now + timedelta(days=1)).strftime("%Y-%m-%d")
         return tomorrow, funding_times[0], False, "next_day"
 
-    async def _check_funding_rate_data(
-        self, symbols: List[str], expected_date: str, expected_time: str
-    ) -> Dict[str, Any]:
-        result = {}
-
+    async def _get_realtime_snapshot(self, symbols: List[str]) -> List[Any]:
+        """Dữ liệu realtime của các symbol, đọc một lần cho cả lượt check"""
         try:
-            symbols_str = ",".join(symbols)
-            request = RealtimeFundingRateRequest(symbols=symbols_str)
+            request = RealtimeFundingRateRequest(symbols=",".join(symbols))
             response = await self.funding_service.get_realtime_funding_rate_data(
                 request
             )
+            return response.data
+        except Exception as e:
+            logger.error(f"Error checking funding rate data: {str(e)}")
+            return []
+
+    def _check_funding_rate_data(
+        self,
+        snapshot: List[Any],
+        symbols: List[str],
+        expected_date: str,
+        expected_time: str,
+    ) -> Dict[str, Any]:
+        result = {
+            symbol: {"has_data": False, "latest_record": None} for symbol in symbols
+        }
+        expected_datetime = datetime.strptime(
+            f"{expected_date} {expected_time}", "%Y-%m-%d %H:%M:%S"
+        )
+
+        for item in snapshot:
+            symbol = item.symbol
+            update_date = item.update_date
+            update_time = item.update_time
+
+            latest_record = {
+                "symbol": symbol,
+                "funding_rate": item.funding_rate,
+                "update_date": update_date,
+                "update_time": update_time,
+            }
+
+            if update_date == expected_date:
+                try:
+                    update_datetime = datetime.strptime(
+                        f"{update_date} {update_time}", "%Y-%m-%d %H:%M:%S"
+                    )
 
-            for symbol in symbols:
-                result[symbol] = {"has_data": False, "latest_record": None}
-
-            for item in response.data:
-                symbol = item.symbol
-                update_date = item.update_date
-                update_time = item.update_time
-
-                latest_record = {
-                    "symbol": symbol,
-                    "funding_rate": item.funding_rate,
-                    "update_date": update_date,
-                    "update_time": update_time,
-                }
-
-                if update_date == expected_date:
-                    try:
-                        update_datetime = datetime.strptime(
-                            f"{update_date} {update_time}", "%Y-%m-%d %H:%M:%S"
-                        )
-                        expected_datetime = datetime.strptime(
-                            f"{expected_date} {expected_time}", "%Y-%m-%d %H:%M:%S"
-                        )
-
-                        time_diff = abs(
-                            (update_datetime - expected_datetime).total_seconds()
-                        )
-                        if time_diff <= self.tolerance_minutes * 60:
-                            result[symbol] = {
-                                "has_data": True,
-                                "latest_record": latest_record,
-                            }
-                        else:
-                            result[symbol] = {
-                                "has_data": False,
-                                "latest_record": {
-                                    **latest_record,
-                                    "time_diff_minutes": round(time_diff / 60, 2),
-                                },
-                            }
-                    except ValueError:
-                        logger.warning(
-                            f"Cannot parse time for {symbol}: {update_date} {update_time}"
-                        )
+                    time_diff = abs(
+                        (update_datetime - expected_datetime).total_seconds()
+                    )
+                    if time_diff <= self.tolerance_minutes * 60:
                         result[symbol] = {
-                            "has_data": False,
+                            "has_data": True,
                             "latest_record": latest_record,
                         }
-                else:
-                    result[symbol] = {"has_data": False, "latest_record": latest_record}
-
-        except Exception as e:
-            logger.error(f"Error checking funding rate data: {str(e)}")
+                    else:
+                        result[symbol] = {
+                            "has_data": False,
+                            "latest_record": {
+                                **latest_record,
+                                "time_diff_minutes": round(time_diff / 60, 2),
+                            },
+                        }
+                except ValueError:
+                    logger.warning(
+                        f"Cannot parse time for {symbol}: {update_date} {update_time}"
+                    )
+                    result[symbol] = {
+                        "has_data": False,
+                        "latest_record": latest_record,
+                    }
+            else:
+                result[symbol] = {"has_data": False, "latest_record": latest_record}
 
         return result
 
     async def check_funding_rate(self) -> Dict[str, Any]:
         logger.info("Checking funding rate data for all cycles...")
 
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = datetime.now()
+        current_time = now.strftime("%Y-%m-%d %H:%M:%S")
         cycles = ["8h", "4h", "1h"]
+        # Snapshot realtime đọc một lần (khi có chu kỳ cần check) cho mọi chu kỳ
+        snapshot = None
 
         result = {
             "timestamp": current_time,
@@ -157,7 +176,7 @@ class FundingRateMonitoringService:
         try:
             for cycle in cycles:
                 expected_date, expected_time, should_check, schedule_status = (
-                    self._get_current_funding_schedule(cycle)
+                    self._get_current_funding_schedule(cycle, now)
                 )
 
                 cycle_result = {
@@ -173,8 +192,12 @@ class FundingRateMonitoringService:
                 }
 
                 if should_check:
-                    symbols_data = await self._check_funding_rate_data(
-                        self.expected_symbols, expected_date, expected_time
+                    if snapshot is None:
+                        snapshot = await self._get_realtime_snapshot(
+                            self.expected_symbols
+                        )
+                    symbols_data = self._check_funding_rate_data(
+                        snapshot, self.expected_symbols, expected_date, expected_time
                     )
                     cycle_result["symbols_details"] = symbols_data
 
@@ -393,41 +416,30 @@ class ETFCandlestickMonitoringService:
             symbols_details = {}
             stale_symbols = []
 
-            # Check each symbol
+            # Bản ghi mới nhất của mọi symbol trong một lần aggregate
+            latest_records = await self.etf_service.get_latest_by_symbols(
+                self.expected_symbols
+            )
+
             for symbol in self.expected_symbols:
                 try:
-                    # Get latest records (day=0) for this symbol
-                    request = ETFCandlestickRequest(day=0, symbol=symbol)
-                    response = await self.etf_service.get_etf_candlestick_data(request)
-
                     symbol_info = {"has_fresh_data": False, "latest_date": None}
+                    latest_record = latest_records.get(symbol)
 
-                    if response.data and len(response.data) > 0:
-                        latest_record = response.data[0]
-
-                        # Check how old the latest record is
-                        record_datetime = (
-                            latest_record.datetime
-                            if hasattr(latest_record, "datetime")
-                            else None
-                        )
-                        if record_datetime:
-                            record_date_str = record_datetime[
-                                :10
-                            ]  # Get YYYY-MM-DD part
-                            record_date = datetime.strptime(record_date_str, "%Y-%m-%d")
+                    # Check how old the latest record is
+                    record_datetime = (latest_record or {}).get("datetime")
+                    if record_datetime:
+                        record_date_str = record_datetime[:10]  # Get YYYY-MM-DD part
+                        record_date = datetime.strptime(record_date_str, "%Y-%m-%d")
 
-                            # Calculate days difference
-                            days_difference = (current_date - record_date).days
+                        # Calculate days difference
+                        days_difference = (current_date - record_date).days
 
-                            symbol_info["latest_date"] = record_date_str
+                        symbol_info["latest_date"] = record_date_str
 
-                            if days_difference <= self.max_days_old:
-                                symbol_info["has_fresh_data"] = True
-                                result["symbols_with_fresh_data"] += 1
-                            else:
-                                result["symbols_with_stale_data"] += 1
-                                stale_symbols.append(symbol)
+                        if days_difference <= self.max_days_old:
+                            symbol_info["has_fresh_data"] = True
+                            result["symbols_with_fresh_data"] += 1
                         else:
                             result["symbols_with_stale_data"] += 1
                             stale_symbols.append(symbol)
@@ -469,10 +481,70 @@ class ETFCandlestickMonitoringService:
         return result
 
 
+class GoldDataMonitoringService:
+    """Service để check gold minute data có được cập nhật gần đây không"""
+
+    def __init__(self, gold_service: Optional[GoldDataService] = None):
+        self.gold_service = gold_service or get_gold_data_service()
+        # Tolerance: thị trường vàng nghỉ cuối tuần (~48h) nên cho phép tới 72h
+        self.max_hours_old = 72
+
+    async def check_gold_data(self) -> Dict[str, Any]:
+        """Check ts của bar gold mới nhất (index ts, một document)"""
+        logger.info("Checking gold data freshness...")
+
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        result = {
+            "timestamp": current_time,
+            "has_fresh_data": False,
+            "latest_datetime": None,
+            "hours_old": None,
+            "alert_message": "",
+            "status": "OK",
+        }
+
+        try:
+            latest_ts = await self.gold_service.latest_ts()
+
+            if latest_ts is None:
+                result["status"] = "ERROR"
+                result["alert_message"] = "GOLD DATA ALERT: No data found in database"
+                logger.error(result["alert_message"])
+                return result
+
+            # ts gold là giờ wall-clock của chuỗi datetime gốc (cùng đồng hồ
+            # datetime.now() mà GoldDataService dùng để dựng khoảng thời gian)
+            hours_old = (datetime.now() - latest_ts).total_seconds() / 3600
+            result["latest_datetime"] = latest_ts.strftime("%Y-%m-%d %H:%M:%S")
+            result["hours_old"] = round(hours_old, 2)
+
+            if hours_old <= self.max_hours_old:
+                result["has_fresh_data"] = True
+                result["alert_message"] = (
+                    f"Gold data is fresh ({hours_old:.1f} hours old, within {self.max_hours_old} hours tolerance)"
+                )
+                logger.info(result["alert_message"])
+            else:
+                result["status"] = "WARNING"
+                result["alert_message"] = (
+                    f"GOLD DATA ALERT: Data is stale ({hours_old:.1f} hours old, exceeds {self.max_hours_old} hours tolerance)"
+                )
+                logger.warning(result["alert_message"])
+
+        except Exception as e:
+            logger.error(f"Error checking gold data: {str(e)}")
+            result["status"] = "ERROR"
+            result["alert_message"] = f"Error checking gold data: {str(e)}"
+
+        return result
+
+
 # Global service instances
 _funding_rate_monitor = None
 _btc_dominance_monitor = None
 _etf_candlestick_monitor = None
+_gold_data_monitor = None
 
 
 def get_funding_rate_monitoring_service() -> FundingRateMonitoringService:
@@ -497,3 +569,11 @@ def get_etf_candlestick_monitoring_service() -> ETFCandlestickMonitoringService:
     if _etf_candlestick_monitor is None:
         _etf_candlestick_monitor = ETFCandlestickMonitoringService()
     return _etf_candlestick_monitor
+
+
+def get_gold_data_monitoring_service() -> GoldDataMonitoringService:
+    """Singleton for GoldDataMonitoringService"""
+    global _gold_data_monitor
+    if _gold_data_monitor is None:
+        _gold_data_monitor = GoldDataMonitoringService()
+    return _gold_data_monitor
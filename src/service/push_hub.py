@@ -0,0 +1,303 @@
+import asyncio
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from src.config.logger_config import logger
+from src.config.variable_config import PAGINATION_CONFIG, WEBSOCKET_CONFIG
+from src.dto.gold_data_dto import GoldDataRequest
+from src.model.funding_rate import RealtimeFundingRate
+from src.service.gold_data_service import get_gold_data_service
+from src.service.realtime_funding_rate_cache import get_realtime_funding_rate_cache
+from src.utils.fast_json import encode_json
+from src.utils.streaming import sse_event
+from src.utils.time_fields import from_local_ms, local_ms, parse_time_value
+
+GOLD_CHANNEL = "gold"
+FUNDING_CHANNEL_PREFIX = "funding:"
+# Channel nội bộ của các stream SSE gold (không subscribe được qua WebSocket)
+GOLD_SSE_CHANNEL = "gold:sse"
+
+
+def funding_channel(symbol: str) -> str:
+    return f"{FUNDING_CHANNEL_PREFIX}{symbol}"
+
+
+def is_valid_channel(channel: str) -> bool:
+    """Channel hợp lệ: "gold" hoặc "funding:<SYMBOL>" """
+    if channel == GOLD_CHANNEL:
+        return True
+    return channel.startswith(FUNDING_CHANNEL_PREFIX) and len(channel) > len(
+        FUNDING_CHANNEL_PREFIX
+    )
+
+
+def gold_events(rows: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+    """Các event SSE của các bar gold, cũ nhất trước.
+
+    id là epoch ms thật của bar: `datetime` gold là giờ local của server.
+    """
+    events = []
+    for row in reversed(rows):
+        ts = parse_time_value(row.get("datetime"))
+        if ts is None:
+            continue
+        event_id = local_ms(ts)
+        events.append((event_id, sse_event(event_id, "bar", encode_json(row).decode())))
+    return events
+
+
+class Subscriber:
+    """Một kết nối WebSocket/SSE: các channel đang theo dõi và hàng đợi message giới hạn.
+
+    Khi hàng đợi đầy: bỏ message cũ nhất, hoặc với `drop_slow` thì đóng
+    subscriber (client SSE kết nối lại với Last-Event-ID nên không mất bar nào).
+    """
+
+    def __init__(self, queue_size: int, drop_slow: bool = False):
+        self.channels: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.drop_slow = drop_slow
+        self.closed = False
+        self.dropped = 0
+
+    def push(self, message: Any) -> None:
+        if self.closed:
+            return
+        # Client chậm: không chặn watcher và không tăng bộ nhớ
+        if self.queue.full():
+            if self.drop_slow:
+                self.closed = True
+                return
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class PushHub:
+    """Fan-out dữ liệu mới tới các subscriber WebSocket từ một watcher duy nhất.
+
+    - funding:<SYMBOL>: listener của RealtimeFundingRateCache (vốn đã poll
+      collection realtime theo watermark) nên không phát sinh query nào thêm.
+    - gold: một task đọc tail `ts > watermark` mỗi `gold_poll_seconds`, chỉ
+      query khi có ít nhất một subscriber gold (WebSocket hoặc SSE).
+
+    Message được encode một lần cho mọi subscriber; số query Mongo không phụ
+    thuộc số client.
+    """
+
+    def __init__(
+        self,
+        poll_seconds: Optional[float] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self._poll_seconds = poll_seconds or WEBSOCKET_CONFIG.get(
+            "gold_poll_seconds", 5
+        )
+        self._queue_size = queue_size or WEBSOCKET_CONFIG.get(
+            "subscriber_queue_size", 256
+        )
+        self._keepalive_seconds = WEBSOCKET_CONFIG.get("sse_keepalive_seconds", 15)
+        self._subscribers: Set[Subscriber] = set()
+        self._gold_watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._realtime_cache = get_realtime_funding_rate_cache()
+        self._gold_service = get_gold_data_service()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def connect(self, drop_slow: bool = False) -> Subscriber:
+        subscriber = Subscriber(self._queue_size, drop_slow)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        if subscriber.dropped:
+            logger.warning(
+                f"WebSocket subscriber dropped {subscriber.dropped} messages (slow consumer)"
+            )
+
+    def subscribe(self, subscriber: Subscriber, channels: Iterable[str]) -> List[str]:
+        """Thêm channel cho subscriber, trả về các channel không hợp lệ.
+
+        Channel funding mới nhận ngay bản ghi hiện có trong snapshot in-memory.
+        """
+        channels = list(channels)
+        invalid = [channel for channel in channels if not is_valid_channel(channel)]
+        added = {
+            channel
+            for channel in channels
+            if is_valid_channel(channel) and channel not in subscriber.channels
+        }
+        subscriber.channels |= added
+        for item in self._realtime_cache.snapshot():
+            channel = funding_channel(item.symbol)
+            if channel in added:
+                subscriber.push(self._funding_message(channel, item))
+        return invalid
+
+    def unsubscribe(self, subscriber: Subscriber, channels: Iterable[str]) -> None:
+        subscriber.channels -= set(channels)
+
+    def publish(self, channel: str, payload: Dict[str, Any]) -> int:
+        """Gửi một message JSON tới mọi subscriber của channel"""
+        return self._fan_out(channel, lambda: encode_json(payload).decode())
+
+    def _fan_out(self, channel: str, build: Callable[[], Any]) -> int:
+        """Dựng message một lần (chỉ khi có người nhận), trả về số subscriber nhận"""
+        message = None
+        delivered = 0
+        for subscriber in list(self._subscribers):
+            if channel not in subscriber.channels:
+                continue
+            if message is None:
+                message = build()
+            subscriber.push(message)
+            delivered += 1
+        return delivered
+
+    @staticmethod
+    def _funding_message(channel: str, item: RealtimeFundingRate) -> str:
+        return encode_json({"channel": channel, "data": item}).decode()
+
+    def _on_funding_update(self, items: List[RealtimeFundingRate]) -> None:
+        for item in items:
+            channel = funding_channel(item.symbol)
+            self.publish(channel, {"channel": channel, "data": item})
+
+    def _has_gold_subscribers(self) -> bool:
+        return any(
+            GOLD_CHANNEL in s.channels or GOLD_SSE_CHANNEL in s.channels
+            for s in self._subscribers
+        )
+
+    async def poll_gold(self) -> int:
+        """Một lần đọc tail gold, trả về số row đã phát"""
+        if not self._has_gold_subscribers():
+            # Không ai theo dõi: không query, lần sau bắt đầu lại từ row mới nhất
+            self._gold_watermark = None
+            return 0
+
+        if self._gold_watermark is None:
+            latest = await self._gold_service.latest_ts()
+            # Một stream SSE có thể đã đặt watermark trong lúc chờ query
+            if self._gold_watermark is None:
+                self._gold_watermark = latest
+            return 0
+
+        response = await self._gold_service.get_gold_data(
+            GoldDataRequest(since=self._gold_watermark)
+        )
+        if response.data:
+            self.publish(
+                GOLD_CHANNEL,
+                {
+                    "channel": GOLD_CHANNEL,
+                    "data": response.data,
+                    "watermark": response.watermark,
+                },
+            )
+            self._fan_out(GOLD_SSE_CHANNEL, lambda: gold_events(response.data))
+            self._gold_watermark = from_local_ms(response.watermark)
+        return len(response.data)
+
+    async def gold_event_stream(
+        self, last_event_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Stream SSE các bar gold mới, mỗi bar đúng một lần (id = ts epoch ms).
+
+        Subscriber được đăng ký trước khi đọc bù từ `last_event_id` (tail read
+        theo since, từng trang) nên không có khoảng hở; event có id không lớn
+        hơn id đã gửi bị bỏ qua. Client quá chậm bị ngắt và tự kết nối lại với
+        Last-Event-ID.
+        """
+        subscriber = self.connect(drop_slow=True)
+        subscriber.channels.add(GOLD_SSE_CHANNEL)
+        last_id = last_event_id
+        try:
+            yield "retry: 3000\n\n"
+
+            if last_event_id is not None:
+                since = from_local_ms(last_event_id)
+                while True:
+                    response = await self._gold_service.get_gold_data(
+                        GoldDataRequest(since=since)
+                    )
+                    # Tail reader chưa chạy: tiếp tục từ điểm đọc bù, không từ row
+                    # mới nhất (bar giữa hai mốc sẽ bị bỏ sót)
+                    if self._gold_watermark is None:
+                        self._gold_watermark = from_local_ms(response.watermark)
+                    for event_id, frame in gold_events(response.data):
+                        if last_id is None or event_id > last_id:
+                            last_id = event_id
+                            yield frame
+                    if len(response.data) < PAGINATION_CONFIG["max_page_size"]:
+                        break
+                    since = from_local_ms(response.watermark)
+
+            while not subscriber.closed:
+                try:
+                    events = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=self._keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                for event_id, frame in events:
+                    if last_id is None or event_id > last_id:
+                        last_id = event_id
+                        yield frame
+            logger.warning("Gold SSE consumer too slow, stream closed")
+        finally:
+            self.disconnect(subscriber)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_gold()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error polling gold for WebSocket subscribers: {str(e)}")
+            await asyncio.sleep(self._poll_seconds)
+
+    def start(self):
+        """Đăng ký listener funding và khởi động task gold (gọi trong lifespan)"""
+        self._realtime_cache.add_listener(self._on_funding_update)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"WebSocket push hub started (gold every {self._poll_seconds}s)")
+
+    async def stop(self):
+        """Dừng task gold"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global hub instance
+_push_hub = None
+
+
+def get_push_hub() -> PushHub:
+    """Singleton for PushHub"""
+    global _push_hub
+    if _push_hub is None:
+        _push_hub = PushHub()
+    return _push_hub
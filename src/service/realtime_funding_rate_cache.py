@@ -0,0 +1,171 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config.logger_config import logger
+from src.config.mongo_config import MongoDBConfig, get_db_and_collections_funding_rate
+from src.config.variable_config import CACHE_CONFIG
+from src.model.funding_rate import RealtimeFundingRate
+from src.utils.time_fields import parse_time_value
+
+
+def build_realtime_funding_rate(doc: Dict[str, Any]) -> RealtimeFundingRate:
+    """Chuyển document của collection realtime thành model RealtimeFundingRate"""
+    return RealtimeFundingRate(
+        symbol=doc.get("symbol"),
+        funding_cap=doc.get("funding_cap"),
+        funding_floor=doc.get("funding_floor"),
+        funding_hour=doc.get("funding_hour"),
+        funding_rate=doc.get("funding_rate"),
+        index_price=doc.get("index_price"),
+        interest_rate=doc.get("interest_rate"),
+        interval=doc.get("interval"),
+        mark_price=doc.get("mark_price"),
+        update_date=doc.get("update_date"),
+        update_time=doc.get("update_time"),
+    )
+
+
+def funding_update_time(item: RealtimeFundingRate) -> Optional[datetime]:
+    """Thời điểm cập nhật (update_date + update_time) của một bản ghi realtime"""
+    return parse_time_value(f"{item.update_date} {item.update_time}")
+
+
+class RealtimeFundingRateCache:
+    """Bảng in-memory symbol -> RealtimeFundingRate mới nhất.
+
+    Một task nền poll collection realtime mỗi `refresh_seconds`, chỉ đọc các
+    document có (update_date, update_time) >= watermark. Request đọc trực tiếp
+    từ bảng nên không phát sinh query Mongo. Các listener (ví dụ push hub
+    WebSocket) nhận những bản ghi vừa thay đổi sau mỗi lần refresh.
+    """
+
+    def __init__(self, db_client=None, refresh_seconds: Optional[float] = None):
+        self._client = db_client
+        self._db_name, self._realtime_col, _ = get_db_and_collections_funding_rate()
+        self._refresh_seconds = refresh_seconds or CACHE_CONFIG.get(
+            "realtime_funding_rate_refresh_seconds", 5
+        )
+        self._snapshot: Dict[str, RealtimeFundingRate] = {}
+        self._watermark: Optional[Tuple[str, str]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[List[RealtimeFundingRate]], None]] = []
+
+    @property
+    def ready(self) -> bool:
+        """True khi bảng đã được nạp ít nhất một lần"""
+        return self._watermark is not None
+
+    def _get_collection(self):
+        client = self._client or MongoDBConfig().get_async_client()
+        return client[self._db_name][self._realtime_col]
+
+    async def refresh(self) -> int:
+        """Đọc các document mới hơn watermark, trả về số symbol được cập nhật"""
+        if not self._db_name or not self._realtime_col:
+            return 0
+
+        coll = self._get_collection()
+
+        if self._watermark is None:
+            # Lần đầu: lấy document mới nhất cho mỗi symbol
+            pipeline = [
+                {"$sort": {"update_date": -1, "update_time": -1}},
+                {"$group": {"_id": "$symbol", "doc": {"$first": "$$ROOT"}}},
+                {"$replaceRoot": {"newRoot": "$doc"}},
+            ]
+            docs = await coll.aggregate(pipeline).to_list(length=None)
+        else:
+            # $gte để không bỏ sót document ghi muộn có cùng mốc thời gian
+            last_date, last_time = self._watermark
+            cursor = coll.find(
+                {
+                    "$or": [
+                        {"update_date": {"$gt": last_date}},
+                        {"update_date": last_date, "update_time": {"$gte": last_time}},
+                    ]
+                }
+            ).sort([("update_date", 1), ("update_time", 1)])
+            docs = await cursor.to_list(length=None)
+
+        changed: List[RealtimeFundingRate] = []
+        watermark = self._watermark or ("", "")
+        for doc in docs:
+            key = (doc.get("update_date") or "", doc.get("update_time") or "")
+            current = self._snapshot.get(doc.get("symbol"))
+            if current is not None and (current.update_date, current.update_time) > key:
+                continue
+            try:
+                item = build_realtime_funding_rate(doc)
+            except Exception as e:
+                logger.warning(f"Error parsing realtime funding rate doc: {str(e)}")
+                continue
+            # $gte đọc lại bản ghi ở đúng watermark: chỉ báo khi nội dung thay đổi
+            if current != item:
+                changed.append(item)
+            self._snapshot[item.symbol] = item
+            watermark = max(watermark, key)
+
+        self._watermark = watermark
+        if changed:
+            for listener in self._listeners:
+                try:
+                    listener(changed)
+                except Exception as e:
+                    logger.error(f"Error in realtime funding rate listener: {str(e)}")
+        return len(changed)
+
+    def add_listener(
+        self, listener: Callable[[List[RealtimeFundingRate]], None]
+    ) -> None:
+        """Đăng ký callback nhận các bản ghi vừa thay đổi (gọi đồng bộ, phải nhanh)"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def snapshot(self) -> List[RealtimeFundingRate]:
+        """Toàn bộ bản ghi mới nhất đang có trong bảng"""
+        return list(self._snapshot.values())
+
+    def get(self, symbols: List[str]) -> List[RealtimeFundingRate]:
+        """Bản ghi mới nhất của các symbol yêu cầu (bỏ qua symbol chưa có dữ liệu)"""
+        return [self._snapshot[s] for s in symbols if s in self._snapshot]
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing realtime funding rate cache: {str(e)}")
+            await asyncio.sleep(self._refresh_seconds)
+
+    def start(self):
+        """Khởi động task refresh nền (gọi trong lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Realtime funding rate cache started (every {self._refresh_seconds}s)"
+            )
+
+    async def stop(self):
+        """Dừng task refresh nền"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global cache instance
+_realtime_funding_rate_cache = None
+
+
+def get_realtime_funding_rate_cache() -> RealtimeFundingRateCache:
+    """Singleton for RealtimeFundingRateCache"""
+    global _realtime_funding_rate_cache
+    if _realtime_funding_rate_cache is None:
+        _realtime_funding_rate_cache = RealtimeFundingRateCache()
+    return _realtime_funding_rate_cache
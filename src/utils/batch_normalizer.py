@@ -0,0 +1,161 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Độ chính xác của chuỗi datetime đầu ra: "D" -> YYYY-MM-DD, "s" -> YYYY-MM-DD HH:MM:SS
+DATETIME_UNITS = ("D", "s")
+
+
+def format_datetimes(values: Sequence[datetime], unit: str) -> List[str]:
+    """Format cả cột BSON date một lần bằng numpy datetime64 thay vì strftime từng row"""
+    if not values:
+        return []
+    array = np.array(values, dtype="datetime64[ms]")
+    formatted = np.datetime_as_string(array, unit=unit)
+    if unit != "D":
+        formatted = np.char.replace(formatted, "T", " ")
+    return formatted.tolist()
+
+
+def _cast_column(
+    values: Sequence[Any],
+    dtype: Any,
+    convert: Callable[[Any], Any],
+    invalid_as_none: bool,
+) -> List[Any]:
+    # numpy đổi None thành nan một cách im lặng: tách None ra và giữ nguyên vị trí
+    if None in values:
+        result: List[Any] = [None] * len(values)
+        positions = [i for i, value in enumerate(values) if value is not None]
+        cast = _cast_column(
+            [values[i] for i in positions], dtype, convert, invalid_as_none
+        )
+        for i, value in zip(positions, cast):
+            result[i] = value
+        return result
+
+    try:
+        return np.asarray(values, dtype=dtype).tolist()
+    except (TypeError, ValueError, OverflowError):
+        pass
+
+    # Cột có giá trị không parse được: chuyển từng phần tử
+    result = []
+    for value in values:
+        try:
+            result.append(convert(value))
+        except (TypeError, ValueError, OverflowError):
+            result.append(None if invalid_as_none else value)
+    return result
+
+
+def to_float_column(values: Sequence[Any], invalid_as_none: bool = True) -> List[Any]:
+    """Chuyển cả cột sang float bằng một lần numpy cast.
+
+    Giá trị không parse được thành None (`invalid_as_none`) hoặc được giữ
+    nguyên để bước validate phía sau quyết định.
+    """
+    return _cast_column(values, np.float64, float, invalid_as_none)
+
+
+def to_int_column(values: Sequence[Any], invalid_as_none: bool = True) -> List[Any]:
+    """Chuyển cả cột sang int (ví dụ timestamp_ms lưu lẫn số và chuỗi)"""
+    return _cast_column(values, np.int64, int, invalid_as_none)
+
+
+@lru_cache(maxsize=65536)
+def date_part(value: str) -> Optional[str]:
+    """Phần YYYY-MM-DD của một chuỗi datetime (memoized: dữ liệu ngày lặp lại rất nhiều).
+
+    Thử "%Y-%m-%d %H:%M:%S", rồi ISO 8601, rồi cắt 10 ký tự đầu; None nếu
+    chuỗi quá ngắn.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    return value[:10] if len(value) >= 10 else None
+
+
+class BatchNormalizer:
+    """Chuẩn hóa cả một batch document theo cột thay vì từng row.
+
+    - `_id` đổi sang chuỗi.
+    - Field thời gian (`datetime_field`, None để bỏ qua): BSON date được format
+      một lần cho cả cột (numpy datetime64, độ chính xác `datetime_unit`);
+      chuỗi đi qua `parse_string` (nên được memoize) nếu có. Kết quả None thì
+      field bị bỏ khỏi row.
+    - Các field số được cast theo cột (`float_fields`, `int_fields`).
+
+    Dùng chung cho BTC dominance, gold và ETF; document được sửa tại chỗ.
+    """
+
+    def __init__(
+        self,
+        datetime_field: Optional[str] = "datetime",
+        datetime_unit: str = "s",
+        parse_string: Optional[Callable[[str], Optional[str]]] = None,
+        float_fields: Sequence[str] = (),
+        int_fields: Sequence[str] = (),
+        invalid_as_none: bool = True,
+    ):
+        if datetime_unit not in DATETIME_UNITS:
+            raise ValueError(f"datetime_unit must be one of {DATETIME_UNITS}")
+        self._datetime_field = datetime_field
+        self._datetime_unit = datetime_unit
+        self._parse_string = parse_string
+        self._float_fields = tuple(float_fields)
+        self._int_fields = tuple(int_fields)
+        self._invalid_as_none = invalid_as_none
+
+    def _normalize_datetimes(self, docs: List[Dict[str, Any]]) -> None:
+        field = self._datetime_field
+        bson_docs = []
+        for doc in docs:
+            value = doc.get(field)
+            if isinstance(value, datetime):
+                bson_docs.append(doc)
+            elif isinstance(value, str) and self._parse_string is not None:
+                parsed = self._parse_string(value)
+                if parsed is None:
+                    doc.pop(field, None)
+                else:
+                    doc[field] = parsed
+
+        formatted = format_datetimes(
+            [doc[field] for doc in bson_docs], self._datetime_unit
+        )
+        for doc, value in zip(bson_docs, formatted):
+            doc[field] = value
+
+    def _normalize_column(
+        self,
+        docs: List[Dict[str, Any]],
+        field: str,
+        convert: Callable[[Sequence[Any], bool], List[Any]],
+    ) -> None:
+        holders = [doc for doc in docs if field in doc]
+        if not holders:
+            return
+        values = convert([doc[field] for doc in holders], self._invalid_as_none)
+        for doc, value in zip(holders, values):
+            doc[field] = value
+
+    def normalize(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for doc in docs:
+            if "_id" in doc:
+                doc["_id"] = str(doc["_id"])
+
+        if self._datetime_field is not None:
+            self._normalize_datetimes(docs)
+        for field in self._float_fields:
+            self._normalize_column(docs, field, to_float_column)
+        for field in self._int_fields:
+            self._normalize_column(docs, field, to_int_column)
+        return docs
@@ -0,0 +1,183 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.config.logger_config import logger
+from src.config.variable_config import CACHE_CONFIG
+
+Row = Dict[str, Any]
+FetchFn = Callable[[date, date], Awaitable[List[Row]]]
+DayOfFn = Callable[[Row], Optional[date]]
+# (rows, kích thước ước lượng, thời điểm cache theo time.monotonic())
+Entry = Tuple[List[Row], int, float]
+
+
+def _estimate_size(rows: List[Row]) -> int:
+    """Ước lượng số byte của một chunk (đủ chính xác để giới hạn bộ nhớ)"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for key, value in row.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class DayRangeCache:
+    """Cache lịch sử chia theo ngày, dùng chung cho các service time-series.
+
+    Mỗi request `from_date`/`to_date` hoặc `days` được tách thành các chunk một
+    ngày. Ngày hiện tại luôn được đọc lại từ Mongo; một ngày chỉ được coi là đóng
+    (và cache) sau khi hết `grace` của dataset đó kể từ nửa đêm, cho các dataset
+    có nến ngày được ghi sau nửa đêm (BTC dominance, ETF). Ngày đã đóng được giữ
+    vô thời hạn (hoặc `ttl_seconds` nếu cấu hình) và bị loại theo LRU khi tổng
+    dung lượng vượt `max_bytes`.
+
+    Row trả về là bản sao nông của row trong cache: caller được sửa tự do mà
+    không làm hỏng cache của request khác.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float = 0):
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[Hashable, date], Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _open_from(grace: timedelta = timedelta(0)) -> date:
+        # Lấy thời điểm nhỏ hơn giữa giờ local và UTC để không đóng nhầm ngày hiện
+        # tại; ngày trước chỉ đóng khi đã qua nửa đêm thêm `grace`
+        return (min(datetime.now(), datetime.utcnow()) - grace).date()
+
+    def _get(self, key: Hashable, day: date) -> Optional[List[Row]]:
+        entry = self._entries.get((key, day))
+        if entry is None:
+            return None
+        rows, size, cached_at = entry
+        if self._ttl_seconds and time.monotonic() - cached_at > self._ttl_seconds:
+            del self._entries[(key, day)]
+            self._bytes -= size
+            return None
+        self._entries.move_to_end((key, day))
+        return rows
+
+    def _put(self, key: Hashable, day: date, rows: List[Row]) -> None:
+        size = _estimate_size(rows)
+        if size > self._max_bytes:
+            return
+        old = self._entries.pop((key, day), None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[(key, day)] = (rows, size, time.monotonic())
+        self._bytes += size
+        while self._bytes > self._max_bytes and self._entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    @staticmethod
+    def _spans(days: List[date]) -> List[Tuple[date, date]]:
+        """Gom các ngày liên tiếp thành các khoảng để fetch một lần mỗi khoảng"""
+        spans: List[Tuple[date, date]] = []
+        for day in days:
+            if spans and day == spans[-1][1] + timedelta(days=1):
+                spans[-1] = (spans[-1][0], day)
+            else:
+                spans.append((day, day))
+        return spans
+
+    async def get_range(
+        self,
+        key: Hashable,
+        start_day: date,
+        end_day: date,
+        fetch: FetchFn,
+        day_of: DayOfFn,
+        grace: timedelta = timedelta(0),
+    ) -> List[Row]:
+        """Trả về các row từ `start_day` đến `end_day`, ngày mới nhất trước.
+
+        - `key`: định danh dataset (ví dụ `("gold",)` hoặc `("etf", symbol)`)
+        - `fetch(from_day, to_day)`: đọc Mongo cho một khoảng ngày liên tiếp
+        - `day_of(row)`: ngày của một row, dùng để chia kết quả fetch thành chunk
+        - `grace`: thời gian sau nửa đêm mà ngày trước vẫn còn nhận dữ liệu
+        Thứ tự row trong mỗi chunk giữ nguyên thứ tự `fetch` trả về.
+        """
+        if end_day < start_day:
+            return []
+
+        open_from = self._open_from(grace)
+        days = [
+            start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)
+        ]
+
+        chunks: Dict[date, List[Row]] = {}
+        missing: List[date] = []
+        for day in days:
+            cached = self._get(key, day) if day < open_from else None
+            if cached is None:
+                missing.append(day)
+            else:
+                chunks[day] = cached
+
+        self.hits += len(days) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            spans = self._spans(missing)
+            results = await asyncio.gather(
+                *(fetch(span_start, span_end) for span_start, span_end in spans)
+            )
+            for (span_start, span_end), rows in zip(spans, results):
+                fetched: Dict[date, List[Row]] = {}
+                for row in rows:
+                    day = day_of(row)
+                    if day is None or not span_start <= day <= span_end:
+                        continue
+                    fetched.setdefault(day, []).append(row)
+
+                day = span_start
+                while day <= span_end:
+                    day_rows = fetched.get(day, [])
+                    chunks[day] = day_rows
+                    if day < open_from:
+                        self._put(key, day, day_rows)
+                    day += timedelta(days=1)
+
+            logger.info(
+                f"History cache {key}: {len(days) - len(missing)} cached days, "
+                f"{len(missing)} fetched in {len(spans)} queries"
+            )
+
+        result: List[Row] = []
+        for day in reversed(days):
+            result.extend(dict(row) for row in chunks.get(day, []))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "ttl_seconds": self._ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global cache instance
+_history_cache = None
+
+
+def get_history_cache() -> DayRangeCache:
+    """Singleton for DayRangeCache"""
+    global _history_cache
+    if _history_cache is None:
+        _history_cache = DayRangeCache(
+            CACHE_CONFIG.get("history_cache_max_bytes", 256 * 1024 * 1024),
+            CACHE_CONFIG.get("history_cache_ttl_seconds", 0),
+        )
+    return _history_cache
@@ -0,0 +1,79 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: vị trí của `n_out` điểm giữ hình dạng chuỗi.
+
+    `x` tăng dần. Điểm đầu và cuối luôn được giữ; các điểm còn lại chia thành
+    `n_out - 2` bucket, mỗi bucket chọn điểm tạo tam giác lớn nhất với điểm đã
+    chọn ở bucket trước và trung bình của bucket sau. Trung bình các bucket được
+    tính một lần bằng `np.add.reduceat`, diện tích tính theo cả bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[: edges[-1]], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[: edges[-1]], edges[:-1]) / counts
+    # Điểm "sau" của bucket cuối là điểm cuối cùng của chuỗi
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs(
+            (ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay)
+        )
+        # Giá trị thiếu (nan) không bao giờ thắng
+        a = lo + int(np.argmax(np.fmax(area, -1.0)))
+        selected[i + 1] = a
+    return selected
+
+
+def _x_values(rows: List[Dict[str, Any]], x_field: str) -> np.ndarray:
+    """Trục x (số) của các row; vị trí row nếu field thời gian thiếu hoặc không parse được"""
+    values = [row.get(x_field) for row in rows]
+    try:
+        if all(isinstance(value, str) for value in values):
+            dates = np.array(values, dtype="datetime64[ms]")
+            if not np.isnat(dates).any():
+                return dates.astype(np.int64).astype(np.float64)
+        else:
+            numbers = np.asarray(values, dtype=np.float64)
+            if not np.isnan(numbers).any():
+                return numbers
+    except (TypeError, ValueError):
+        pass
+    # Row mới nhất đứng trước: vị trí đảo ngược để x vẫn tăng theo thời gian
+    return np.arange(len(rows), 0, -1, dtype=np.float64)
+
+
+def downsample_rows(
+    rows: List[Dict[str, Any]],
+    max_points: int,
+    x_field: str,
+    y_field: str = "close",
+) -> List[Dict[str, Any]]:
+    """Giảm các row xuống tối đa `max_points` bằng LTTB trên chuỗi `y_field`.
+
+    Row được chọn giữ nguyên nội dung và thứ tự ban đầu (mới nhất trước).
+    """
+    if max_points >= len(rows):
+        return rows
+
+    x = _x_values(rows, x_field)
+    # None -> nan
+    y = np.array([row.get(y_field) for row in rows], dtype=np.float64)
+    order = np.argsort(x, kind="stable")
+    chosen = order[lttb_indices(x[order], y[order], max_points)]
+    return [rows[i] for i in np.sort(chosen)]
+
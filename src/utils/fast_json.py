@@ -0,0 +1,185 @@
+import typing
+from datetime import date
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Type
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from src.config.logger_config import logger
+
+Coercer = Callable[[Any], Any]
+_MISSING = object()
+# Float lớn hơn int64 không được Pydantic đổi sang int
+_INT_LIMIT = 2.0**63
+
+
+def _as_text(value: Any) -> str:
+    """Chuỗi số như Pydantic chấp nhận: bytes được decode, chỉ chữ số ASCII"""
+    if isinstance(value, bytes):
+        value = value.decode()
+    if not value.isascii():
+        raise ValueError(f"invalid number: {value!r}")
+    return value
+
+
+def _as_float(value: Any) -> float:
+    if isinstance(value, float):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    if isinstance(value, (str, bytes)):
+        return float(_as_text(value))
+    raise TypeError(f"expected a number, got {type(value).__name__}")
+
+
+def _as_int(value: Any) -> int:
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float) and value.is_integer() and abs(value) < _INT_LIMIT:
+        return int(value)
+    if isinstance(value, (str, bytes)):
+        text = _as_text(value).strip()
+        # "1.0", "1.00": phần thập phân toàn số 0 được chấp nhận như Pydantic
+        whole, dot, fraction = text.partition(".")
+        if dot and whole and fraction and not fraction.strip("0"):
+            text = whole
+        return int(text)
+    raise TypeError(f"expected an integer, got {type(value).__name__}")
+
+
+def _as_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"expected a string, got {type(value).__name__}")
+
+
+_COERCERS: Dict[Any, Coercer] = {float: _as_float, int: _as_int, str: _as_str}
+
+
+def _field_coercer(annotation: Any) -> Tuple[Coercer, bool]:
+    """(hàm chuyển kiểu, có nhận None hay không) cho annotation của một field"""
+    nullable = False
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        nullable = len(args) < len(typing.get_args(annotation))
+        if len(args) == 1:
+            annotation = args[0]
+
+    coercer = _COERCERS.get(annotation)
+    if coercer is None:
+        # Kiểu ít gặp: dùng validator của Pydantic cho riêng field này
+        coercer = TypeAdapter(annotation).validate_python
+    return coercer, nullable
+
+
+class RowSchema:
+    """Chuẩn hóa row (dict) theo một model Pydantic mà không dựng model cho từng row.
+
+    Lần đầu gặp một tập key, schema được kiểm tra một lần: field bắt buộc bị
+    thiếu làm cả tập key không hợp lệ, các field còn lại được gắn sẵn hàm chuyển
+    kiểu (float/int/str). Mỗi row sau đó chỉ còn là một lần chiếu key theo thứ tự
+    field của model, cho kết quả giống `Model(**row).model_dump()`.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self._model = model
+        self._fields: List[Tuple[str, Coercer, bool, Any]] = []
+        for name, field in model.model_fields.items():
+            coercer, nullable = _field_coercer(field.annotation)
+            default = _MISSING if field.is_required() else field.get_default()
+            self._fields.append((name, coercer, nullable, default))
+        self._plans: Dict[FrozenSet[str], Optional[List[Tuple]]] = {}
+
+    @property
+    def fields(self) -> List[str]:
+        return [name for name, _, _, _ in self._fields]
+
+    def _plan(self, keys: FrozenSet[str]) -> Optional[List[Tuple]]:
+        plan = self._plans.get(keys, _MISSING)
+        if plan is not _MISSING:
+            return plan
+
+        missing = [
+            name
+            for name, _, _, default in self._fields
+            if default is _MISSING and name not in keys
+        ]
+        if missing:
+            logger.warning(
+                f"{self._model.__name__}: rows with fields {sorted(keys)} are missing required {missing}, skipped"
+            )
+            plan = None
+        else:
+            plan = [
+                (name, coercer, nullable, default, name in keys)
+                for name, coercer, nullable, default in self._fields
+            ]
+        self._plans[keys] = plan
+        return plan
+
+    def project(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Row đã chuẩn hóa, None nếu row không hợp lệ với model"""
+        plan = self._plan(frozenset(row))
+        if plan is None:
+            return None
+
+        result = {}
+        for name, coercer, nullable, default, present in plan:
+            if not present:
+                result[name] = default
+                continue
+            value = row[name]
+            if value is None:
+                if not nullable:
+                    return None
+                result[name] = None
+            else:
+                try:
+                    result[name] = coercer(value)
+                except (TypeError, ValueError):
+                    return None
+        return result
+
+    def project_all(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chuẩn hóa nhiều row, bỏ qua (và log) các row không hợp lệ"""
+        data = []
+        for row in rows:
+            projected = self.project(row)
+            if projected is None:
+                logger.warning(f"Error parsing {self._model.__name__} item: {row}")
+                continue
+            data.append(projected)
+        return data
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode JSON bằng orjson (ObjectId, date, model Pydantic được chuyển sẵn)"""
+    return orjson.dumps(payload, default=_default)
+
+
+def json_response(payload: Any) -> Response:
+    """Response JSON được encode một lần bằng orjson.
+
+    Trả trực tiếp `Response` nên FastAPI bỏ qua bước validate lại với
+    `response_model`; dữ liệu đã được chuẩn hóa bởi `RowSchema` ở service.
+    """
+    if isinstance(payload, BaseModel):
+        payload = dict(payload)
+    return Response(
+        content=encode_json(payload),
+        media_type="application/json",
+    )
@@ -0,0 +1,126 @@
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+from src.config.variable_config import PAGINATION_CONFIG
+
+SortSpec = List[Tuple[str, int]]
+
+_JSON_OPTIONS = json_util.CANONICAL_JSON_OPTIONS
+
+
+class InvalidCursorError(ValueError):
+    """Cursor hỏng hoặc không thuộc query/sort của request (lỗi của client: 400).
+
+    Service không được nuốt lỗi này như lỗi query: phải raise lại để controller
+    trả 400 thay vì một trang rỗng.
+    """
+
+
+def encode_cursor(doc: Dict[str, Any], sort: SortSpec) -> str:
+    """Cursor opaque (base64 của extended JSON) từ các giá trị sort của document cuối trang"""
+    values = {field: doc.get(field) for field, _ in sort}
+    raw = json_util.dumps(values, json_options=_JSON_OPTIONS).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[SortSpec] = None) -> Dict[str, Any]:
+    """Giải mã cursor; InvalidCursorError nếu cursor hỏng hoặc sai các field sort"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json_util.loads(
+            base64.urlsafe_b64decode(padded.encode()).decode(),
+            json_options=_JSON_OPTIONS,
+        )
+    except (ValueError, binascii.Error, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {str(e)}")
+
+    if not isinstance(values, dict):
+        raise InvalidCursorError("Invalid cursor")
+    if sort is not None and list(values) != [field for field, _ in sort]:
+        raise InvalidCursorError("Cursor does not match the query sort order")
+    return values
+
+
+def page_size(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """Số document mỗi trang, None nếu request không yêu cầu phân trang"""
+    if limit is not None:
+        return min(limit, PAGINATION_CONFIG["max_page_size"])
+    if cursor is not None:
+        return PAGINATION_CONFIG["default_page_size"]
+    return None
+
+
+def keyset_filter(values: Dict[str, Any], sort: SortSpec) -> Dict[str, Any]:
+    """Filter lấy các document đứng sau `values` theo thứ tự `sort`.
+
+    Với sort (a desc, b desc) filter là
+    {$or: [{a: {$lt: va}}, {a: va, b: {$lt: vb}}]}, dùng được index trùng sort.
+    """
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {prev: values[prev] for prev, _ in sort[:i]}
+        branch[field] = {"$lt" if direction < 0 else "$gt": values[field]}
+        branches.append(branch)
+    return {"$or": branches}
+
+
+def _is_after(doc: Dict[str, Any], values: Dict[str, Any], sort: SortSpec) -> bool:
+    """`doc` có đứng sau `values` theo thứ tự `sort` không (như `keyset_filter`)"""
+    for field, direction in sort:
+        value = doc.get(field)
+        if value != values[field]:
+            return value < values[field] if direction < 0 else value > values[field]
+    return False
+
+
+def sort_documents(docs: List[Dict[str, Any]], sort: SortSpec) -> None:
+    """Sort tại chỗ theo `sort` (sort ổn định từ field cuối lên field đầu)"""
+    for field, direction in reversed(sort):
+        docs.sort(key=lambda doc: doc.get(field), reverse=direction < 0)
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    sort: SortSpec,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    extra: Optional[List[Dict[str, Any]]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Đọc một trang theo keyset, trả về (documents, next_cursor).
+
+    `sort` phải kết thúc bằng `_id` để thứ tự là duy nhất. Đọc `limit + 1`
+    document để biết còn trang sau hay không; bộ nhớ mỗi request chỉ phụ thuộc
+    `limit`, không phụ thuộc kích thước lịch sử.
+
+    `extra` là các document không query được trên Mongo theo `sort` (ví dụ
+    document chưa có `ts`, xem `src.utils.pending_ts`): chúng được lọc theo
+    cursor và trộn vào trang trong bộ nhớ.
+    """
+    values = decode_cursor(cursor, sort) if cursor else None
+    if values is not None:
+        query = {"$and": [query, keyset_filter(values, sort)]}
+
+    docs = (
+        await collection.find(query, projection)
+        .sort(sort)
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+
+    if extra:
+        if values is not None:
+            extra = [doc for doc in extra if _is_after(doc, values, sort)]
+        docs = docs + extra
+        sort_documents(docs, sort)
+        docs = docs[: limit + 1]
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort)
+    return docs, next_cursor
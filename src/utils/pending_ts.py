@@ -0,0 +1,141 @@
+from datetime import datetime, time, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.utils.time_fields import RAW_TIME_FIELD, TS_FIELD, raw_ts
+
+# Document chưa có `ts`: collector mới ghi, migration `normalize_time_fields` chưa
+# chạy tới. `{ts: null}` khớp cả field thiếu và dùng được các index bắt đầu
+# bằng `ts` (hoặc symbol, ts) với khoảng [null, null]
+PENDING_FILTER = {TS_FIELD: None}
+
+
+def _raw_bounds(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Optional[Dict[str, Any]]:
+    """Lọc thô trên field gốc theo ngày, cho cả kiểu BSON date và chuỗi.
+
+    Chuỗi "YYYY-MM-DD..." so sánh theo thứ tự từ điển nên chỉ chính xác tới
+    ngày; mốc chính xác được lọc lại sau khi parse.
+    """
+    if start is None and end is None:
+        return None
+    as_date: Dict[str, Any] = {}
+    as_string: Dict[str, Any] = {}
+    if start is not None:
+        as_date["$gte"] = datetime.combine(start.date(), time.min)
+        as_string["$gte"] = start.strftime("%Y-%m-%d")
+    if end is not None:
+        next_day = datetime.combine(end.date(), time.min) + timedelta(days=1)
+        as_date["$lt"] = next_day
+        as_string["$lt"] = next_day.strftime("%Y-%m-%d")
+    return {"$or": [{RAW_TIME_FIELD: as_date}, {RAW_TIME_FIELD: as_string}]}
+
+
+async def find_pending(
+    collection,
+    match: Optional[Dict[str, Any]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[datetime] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Các document chưa có `ts`, với `ts` parse từ field gốc (chỉ trong bộ nhớ).
+
+    Chỉ giữ document có `start <= ts <= end` và `ts > after`; document không
+    parse được bị bỏ qua. Kết quả tăng dần theo (ts, _id). API không ghi `ts`:
+    tập này chỉ gồm dữ liệu mới từ lần chạy migration gần nhất.
+    """
+    query: Dict[str, Any] = {**(match or {}), **PENDING_FILTER}
+    bounds = _raw_bounds(after or start, end)
+    if bounds is not None:
+        query.update(bounds)
+    if projection:
+        projection = {**projection, RAW_TIME_FIELD: 1}
+
+    docs = (
+        await collection.find(query, projection)
+        .sort([(TS_FIELD, 1), ("_id", 1)])
+        .to_list(length=None)
+    )
+    pending = []
+    for doc in docs:
+        ts = raw_ts(doc)
+        if ts is None:
+            continue
+        if start is not None and ts < start:
+            continue
+        if end is not None and ts > end:
+            continue
+        if after is not None and ts <= after:
+            continue
+        doc[TS_FIELD] = ts
+        pending.append(doc)
+    # Cursor đã theo _id (mọi ts đều null): sort ổn định giữ thứ tự đó khi trùng ts
+    pending.sort(key=lambda doc: doc[TS_FIELD])
+    return pending
+
+
+async def latest_pending(
+    collection, match: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Document chưa có `ts` được ghi gần nhất (theo _id), với `ts` đã parse"""
+    docs = (
+        await collection.find({**(match or {}), **PENDING_FILTER})
+        .sort([(TS_FIELD, -1), ("_id", -1)])
+        .limit(1)
+        .to_list(length=None)
+    )
+    for doc in docs:
+        ts = raw_ts(doc)
+        if ts is not None:
+            doc[TS_FIELD] = ts
+            return doc
+    return None
+
+
+def newest(*docs: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Document có `ts` lớn nhất trong các ứng viên (bỏ qua None)"""
+    candidates = [doc for doc in docs if doc is not None]
+    return max(candidates, key=lambda doc: doc[TS_FIELD], default=None)
+
+
+def merge_pending(
+    docs: List[Dict[str, Any]],
+    pending: List[Dict[str, Any]],
+    descending: bool = True,
+) -> List[Dict[str, Any]]:
+    """Gộp document pending vào kết quả đã sort theo `ts`"""
+    if not pending:
+        return docs
+    merged = docs + pending
+    merged.sort(key=lambda doc: doc[TS_FIELD], reverse=descending)
+    return merged
+
+
+async def merge_pending_batches(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    pending: List[Dict[str, Any]],
+    descending: bool = True,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Chèn document pending vào các batch của một cursor sort theo `ts`.
+
+    Mỗi document pending đi cùng batch đầu tiên có row cuối vượt qua nó nên thứ
+    tự toàn bộ stream vẫn đúng mà không đọc trước cursor.
+    """
+    queue = list(reversed(pending)) if descending else list(pending)
+    async for batch in batches:
+        if queue and batch:
+            boundary = batch[-1][TS_FIELD]
+            split = 0
+            while split < len(queue) and (
+                queue[split][TS_FIELD] >= boundary
+                if descending
+                else queue[split][TS_FIELD] <= boundary
+            ):
+                split += 1
+            if split:
+                batch = merge_pending(batch, queue[:split], descending)
+                queue = queue[split:]
+        yield batch
+    if queue:
+        yield queue
@@ -0,0 +1,123 @@
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+# interval -> (unit, binSize) của $dateTrunc
+INTERVALS = {
+    "5m": ("minute", 5),
+    "15m": ("minute", 15),
+    "1h": ("hour", 1),
+    "4h": ("hour", 4),
+    "1d": ("day", 1),
+    "1w": ("week", 1),
+}
+
+INTERVAL_PATTERN = f"^({'|'.join(INTERVALS)})$"
+
+_UNIT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+_EPOCH = datetime(1970, 1, 1)
+
+
+def bucket_start(value: datetime, interval: str) -> datetime:
+    """Đầu bucket chứa `value`, giống $dateTrunc (UTC, tuần bắt đầu từ thứ Hai)"""
+    unit, bin_size = INTERVALS[interval]
+    if unit == "week":
+        monday = value.date() - timedelta(days=value.weekday())
+        return datetime.combine(monday, time.min)
+    seconds = _UNIT_SECONDS[unit] * bin_size
+    elapsed = int((value - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=elapsed - elapsed % seconds)
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """Như `_number`: double hoặc None nếu không chuyển được"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def ohlc_rows(
+    docs: List[Dict[str, Any]], time_field: str, interval: str
+) -> List[Dict[str, Any]]:
+    """Bar theo `interval` tính trong Python, cùng ngữ nghĩa với `ohlc_pipeline`.
+
+    `docs` tăng dần theo `time_field` (open/close là row đầu/cuối của bucket).
+    Kết quả giống output `$group` ("_id" là đầu bucket), bucket giảm dần.
+    """
+    bars: Dict[datetime, Dict[str, Any]] = {}
+    for doc in docs:
+        key = bucket_start(doc[time_field], interval)
+        high, low = _to_number(doc.get("high")), _to_number(doc.get("low"))
+        volume = _to_number(doc.get("volume"))
+        bar = bars.get(key)
+        if bar is None:
+            bar = bars[key] = {
+                **doc,
+                "_id": key,
+                "open": _to_number(doc.get("open")),
+                "high": high,
+                "low": low,
+                "volume": 0.0,
+            }
+        else:
+            # $max/$min bỏ qua null
+            if high is not None and (bar["high"] is None or high > bar["high"]):
+                bar["high"] = high
+            if low is not None and (bar["low"] is None or low < bar["low"]):
+                bar["low"] = low
+        bar["close"] = _to_number(doc.get("close"))
+        if volume is not None:
+            bar["volume"] += volume
+    return [bars[key] for key in sorted(bars, reverse=True)]
+
+
+def _number(field: str) -> Dict[str, Any]:
+    # Một số collection lưu giá dạng chuỗi: chuyển sang double, lỗi thành null
+    return {
+        "$convert": {"input": f"${field}", "to": "double", "onError": None, "onNull": None}
+    }
+
+
+def ohlc_pipeline(
+    match: Dict[str, Any],
+    time_expr: Any,
+    sort_field: str,
+    interval: str,
+    project: Dict[str, Any],
+    group_extra: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Pipeline gộp bar theo `interval` trên Mongo ($dateTrunc + $group).
+
+    - `time_expr`: biểu thức BSON date của mỗi document (ví dụ "$ts").
+    - `sort_field`: field sort tăng dần trước $group (dùng index của $match) để
+      $first/$last đúng là open/close của bucket.
+    - `project`: các field đầu ra, tham chiếu "$_id" (thời điểm bắt đầu bucket)
+      và "$open"/"$high"/"$low"/"$close"/"$volume".
+
+    Kết quả sort theo bucket giảm dần (mới nhất trước) như các query lịch sử.
+    """
+    unit, bin_size = INTERVALS[interval]
+    bucket: Dict[str, Any] = {"date": time_expr, "unit": unit, "binSize": bin_size}
+    if unit == "week":
+        bucket["startOfWeek"] = "monday"
+
+    group: Dict[str, Any] = {
+        "_id": {"$dateTrunc": bucket},
+        "open": {"$first": _number("open")},
+        "high": {"$max": _number("high")},
+        "low": {"$min": _number("low")},
+        "close": {"$last": _number("close")},
+        "volume": {"$sum": _number("volume")},
+    }
+    if group_extra:
+        group.update(group_extra)
+
+    return [
+        {"$match": match},
+        {"$sort": {sort_field: 1}},
+        {"$group": group},
+        {"$sort": {"_id": -1}},
+        {"$project": {"_id": 0, **project}},
+    ]
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from pydantic import BaseModel
+
+
+def request_key(request: BaseModel) -> Tuple[str, str]:
+    """Key chuẩn hóa của một request DTO (tên class + JSON các tham số)"""
+    return type(request).__name__, request.model_dump_json()
+
+
+class SingleFlight:
+    """Gộp các query giống hệt nhau đang chạy đồng thời thành một lần gọi.
+
+    Caller đầu tiên cho một key sẽ chạy `fn()` trong một task riêng; các caller
+    đến sau khi task chưa xong chỉ chờ và nhận chung kết quả (hoặc exception).
+    Task được shield nên một client ngắt kết nối không hủy query của người khác.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+
+# Global single-flight instance
+_single_flight = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Singleton for SingleFlight"""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
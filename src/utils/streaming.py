@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+from src.config.logger_config import logger
+from src.config.variable_config import STREAMING_CONFIG
+
+# Giá trị của tham số `format` trả về dạng stream (json giữ response cũ)
+STREAM_FORMAT_PATTERN = "^(json|ndjson|csv)$"
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _encode_rows(
+    rows: AsyncIterator[Dict[str, Any]], fmt: str, columns: List[str]
+) -> AsyncIterator[str]:
+    """Ghi các row thành NDJSON/CSV, flush mỗi `batch_size` row"""
+    batch_size = STREAMING_CONFIG["batch_size"]
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        # Gửi header ngay để client nhận byte đầu tiên trước khi query xong batch đầu
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    count = 0
+    try:
+        async for row in rows:
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(row, default=str, separators=(",", ":")))
+                buffer.write("\n")
+            count += 1
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+    except Exception as e:
+        # Header HTTP đã gửi nên không đổi được status code: raise lại để server
+        # hủy response chunked (client thấy transfer không hoàn chỉnh) thay vì
+        # kết thúc body bình thường với dữ liệu bị cắt
+        logger.error(f"Error while streaming {fmt} rows after {count} rows: {str(e)}")
+        raise
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def cursor_batches(cursor, size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Đọc cursor Motor thành từng list `size` document để chuẩn hóa theo batch"""
+    while True:
+        batch = await cursor.to_list(length=size)
+        if not batch:
+            return
+        yield batch
+
+
+async def iterate_rows(rows: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """Async iterator trên các row đã có sẵn trong bộ nhớ"""
+    for row in rows:
+        yield row
+
+
+def sse_event(event_id: int, event: str, data: str) -> str:
+    """Một event Server-Sent Events (data là một dòng JSON)"""
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+def watermark_headers(watermark: Optional[int]) -> Optional[Dict[str, str]]:
+    """Header mang watermark của response `since` khi trả dạng stream"""
+    if watermark is None:
+        return None
+    return {"X-Watermark": str(watermark)}
+
+
+def stream_rows(
+    rows: AsyncIterator[Dict[str, Any]],
+    fmt: str,
+    columns: List[str],
+    filename: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """StreamingResponse NDJSON/CSV cho một async iterator các row"""
+    headers = dict(headers or {})
+    if fmt == "csv":
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return StreamingResponse(
+        _encode_rows(rows, fmt, columns), media_type=_MEDIA_TYPES[fmt], headers=headers
+    )
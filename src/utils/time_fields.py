@@ -0,0 +1,92 @@
+import calendar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+# Field thời gian chuẩn (BSON date, naive UTC/wall-clock như dữ liệu gốc) được
+# tool `src.migration.normalize_time_fields` thêm vào các collection time-series.
+# `ts` của gold là giờ wall-clock local của server: watermark/id epoch ms của gold
+# dùng `local_ms`/`from_local_ms` và `parse_time_value(..., local=True)`
+TS_FIELD = "ts"
+
+# Field thời gian gốc do collector ghi, nguồn của `ts`
+RAW_TIME_FIELD = "datetime"
+
+_EPOCH = datetime(1970, 1, 1)
+_STRING_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def utc_ms(value: datetime) -> int:
+    """Epoch milliseconds của một datetime naive được hiểu là UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return calendar.timegm(value.timetuple()) * 1000 + value.microsecond // 1000
+
+
+def from_utc_ms(value: int) -> datetime:
+    """Datetime naive UTC từ epoch milliseconds"""
+    return _EPOCH + timedelta(milliseconds=value)
+
+
+def local_ms(value: datetime) -> int:
+    """Epoch milliseconds của một datetime naive được hiểu là giờ local của server"""
+    return utc_ms(value if value.tzinfo is not None else value.astimezone())
+
+
+def from_local_ms(value: int) -> datetime:
+    """Datetime naive theo giờ local của server từ epoch milliseconds"""
+    return _to_naive(from_utc_ms(value).replace(tzinfo=timezone.utc), local=True)
+
+
+def _to_naive(value: datetime, local: bool) -> datetime:
+    """Bỏ tzinfo sau khi đổi về UTC (hoặc giờ local của server nếu `local`)"""
+    return value.astimezone(None if local else timezone.utc).replace(tzinfo=None)
+
+
+def parse_time_value(value: Any, local: bool = False) -> Optional[datetime]:
+    """Chuyển một giá trị thời gian bất kỳ đang có trong DB thành datetime naive.
+
+    Hỗ trợ BSON date, chuỗi "%Y-%m-%d %H:%M:%S", ISO 8601 (có hoặc không có
+    offset, offset được đổi về UTC), "YYYY-MM-DD", và epoch milliseconds dạng số
+    hoặc chuỗi. Trả về None nếu không parse được.
+
+    Với `local=True`, các giá trị chỉ một thời điểm tuyệt đối (epoch ms, ISO có
+    offset) được đổi về giờ local của server thay vì UTC, để so sánh với `ts`
+    wall-clock local (gold); giá trị naive giữ nguyên.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return _to_naive(value, local)
+        return value
+
+    from_ms = from_local_ms if local else from_utc_ms
+    if isinstance(value, (int, float)):
+        return from_ms(int(value))
+
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip()
+    if text.isdigit() and len(text) >= 12:
+        return from_ms(int(text))
+
+    for fmt in _STRING_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        return _to_naive(parsed, local)
+    return parsed
+
+
+def raw_ts(doc: Dict[str, Any]) -> Optional[datetime]:
+    """Giá trị `ts` của một document gold/ETF, parse từ field thời gian gốc"""
+    return parse_time_value(doc.get(RAW_TIME_FIELD))
@@ -0,0 +1,75 @@
+"""DayRangeCache: ngày đã đóng được cache, `grace` giữ ngày trước còn mở và row
+trả về là bản sao (caller sửa row không làm hỏng cache).
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+from src.utils.day_range_cache import DayRangeCache
+
+TODAY = date(2024, 3, 10)
+
+
+class _Fetcher:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, from_day: date, to_day: date):
+        self.calls.append((from_day, to_day))
+        days = (to_day - from_day).days + 1
+        return [
+            {"day": from_day + timedelta(days=i), "close": 1.0} for i in range(days)
+        ]
+
+
+def _cache_at(now: datetime) -> DayRangeCache:
+    cache = DayRangeCache(max_bytes=1024 * 1024)
+    cache._open_from = lambda grace=timedelta(0): (now - grace).date()
+    return cache
+
+
+def _get(cache, fetch, grace=timedelta(0)):
+    return asyncio.run(
+        cache.get_range(
+            ("test",),
+            TODAY - timedelta(days=2),
+            TODAY,
+            fetch,
+            lambda row: row["day"],
+            grace=grace,
+        )
+    )
+
+
+def test_closed_days_are_cached_and_today_is_refetched():
+    cache = _cache_at(datetime(2024, 3, 10, 3, 0))
+    fetch = _Fetcher()
+    first = _get(cache, fetch)
+    second = _get(cache, fetch)
+
+    assert [row["day"] for row in first] == [
+        TODAY,
+        TODAY - timedelta(days=1),
+        TODAY - timedelta(days=2),
+    ]
+    assert first == second
+    assert fetch.calls[1:] == [(TODAY, TODAY)]
+
+
+def test_grace_keeps_previous_day_open():
+    cache = _cache_at(datetime(2024, 3, 10, 3, 0))
+    fetch = _Fetcher()
+    _get(cache, fetch, grace=timedelta(hours=6))
+    _get(cache, fetch, grace=timedelta(hours=6))
+
+    # 03:00 còn trong grace 6h: hôm qua vẫn được đọc lại cùng hôm nay
+    assert fetch.calls[1:] == [(TODAY - timedelta(days=1), TODAY)]
+
+
+def test_returned_rows_are_copies():
+    cache = _cache_at(datetime(2024, 3, 10, 3, 0))
+    fetch = _Fetcher()
+    for row in _get(cache, fetch):
+        row["close"] = None
+
+    assert all(row["close"] == 1.0 for row in _get(cache, fetch))
@@ -0,0 +1,56 @@
+"""LTTB (max_points): giữ điểm đầu/cuối, trả đúng `max_points` row và giữ thứ tự."""
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.utils.downsample import downsample_rows, lttb_indices
+
+START = datetime(2025, 9, 10)
+
+
+def _rows(count):
+    # Row mới nhất trước, như response của các service lịch sử
+    return [
+        {
+            "datetime": f"{START + timedelta(minutes=i):%Y-%m-%d %H:%M:%S}",
+            "close": math.sin(i / 7) * 10 + i % 5,
+        }
+        for i in reversed(range(count))
+    ]
+
+
+@pytest.mark.parametrize("max_points", [3, 10, 250, 999])
+def test_keeps_first_last_and_exact_count(max_points):
+    rows = _rows(1000)
+    result = downsample_rows(rows, max_points, "datetime")
+
+    assert len(result) == max_points
+    assert result[0] is rows[0]
+    assert result[-1] is rows[-1]
+
+
+def test_preserves_order_and_row_content():
+    rows = _rows(500)
+    result = downsample_rows(rows, 50, "datetime")
+
+    positions = [rows.index(row) for row in result]
+    assert positions == sorted(positions)
+    assert all(row in rows for row in result)
+
+
+def test_short_series_is_returned_unchanged():
+    rows = _rows(20)
+    assert downsample_rows(rows, 20, "datetime") is rows
+    assert downsample_rows(rows, 50, "datetime") is rows
+
+
+def test_indices_are_distinct_and_increasing():
+    x = np.arange(100, dtype=np.float64)
+    y = np.cos(x / 5)
+    indices = lttb_indices(x, y, 17)
+
+    assert len(indices) == 17
+    assert indices[0] == 0 and indices[-1] == 99
+    assert (np.diff(indices) > 0).all()
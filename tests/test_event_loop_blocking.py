@@ -0,0 +1,138 @@
+"""Query gold lịch sử chậm không được chặn event loop của các request realtime."""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from mongomock_motor import AsyncMongoMockClient
+
+from src.config.mongo_config import get_db_and_collections_funding_rate
+from src.config.variable_config import DB_GOLD_DATA
+from src.dto.funding_rate_dto import RealtimeFundingRateRequest
+from src.dto.gold_data_dto import GoldDataRequest
+from src.service.funding_rate_service import FundingRateService
+from src.service.gold_data_service import GoldDataService
+from src.service.realtime_funding_rate_cache import RealtimeFundingRateCache
+from src.utils.time_fields import TS_FIELD
+
+# Thời gian phản hồi giả lập của một query gold nhiều ngày
+SLOW_QUERY_SECONDS = 1.0
+
+
+class SlowCursor:
+    """Cursor chậm: `to_list` chờ không chặn, còn duyệt đồng bộ (kiểu pymongo)
+    chặn cả thread như một driver blocking."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, *args, **kwargs):
+        self._cursor = self._cursor.limit(*args, **kwargs)
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(SLOW_QUERY_SECONDS)
+        return await self._cursor.to_list(length=length)
+
+    def __iter__(self):
+        time.sleep(SLOW_QUERY_SECONDS)
+        return iter([])
+
+
+class SlowCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return SlowCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, *args, **kwargs):
+        return SlowCursor(self._collection.aggregate(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+async def _seed(client) -> None:
+    now = datetime.now().replace(second=0, microsecond=0)
+    gold_db = client[DB_GOLD_DATA["database_name"]]
+    gold = gold_db[DB_GOLD_DATA["collection_history_name"]]
+    await gold.insert_many(
+        [
+            {
+                TS_FIELD: now - timedelta(minutes=i),
+                "datetime": f"{now - timedelta(minutes=i):%Y-%m-%d %H:%M:%S}",
+                "open": 1.0,
+                "high": 1.0,
+                "low": 1.0,
+                "close": 1.0,
+                "volume": 1.0,
+            }
+            for i in range(500)
+        ]
+    )
+
+    db_name, realtime_col, _ = get_db_and_collections_funding_rate()
+    await client[db_name][realtime_col].insert_many(
+        [
+            {
+                "symbol": symbol,
+                "funding_rate": 0.0001,
+                "index_price": 1.0,
+                "mark_price": 1.0,
+                "update_date": now.strftime("%Y-%m-%d"),
+                "update_time": now.strftime("%H:%M:%S"),
+            }
+            for symbol in ("BTCUSDT", "ETHUSDT")
+        ]
+    )
+
+
+async def _timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+async def _run_scenario():
+    client = AsyncMongoMockClient()
+    await _seed(client)
+
+    # Snapshot realtime chưa nạp: mỗi request realtime đi qua Mongo
+    funding_service = FundingRateService(
+        db_client=client, realtime_cache=RealtimeFundingRateCache(db_client=client)
+    )
+    gold_service = GoldDataService()
+    gold_collection = client[DB_GOLD_DATA["database_name"]][
+        DB_GOLD_DATA["collection_history_name"]
+    ]
+    gold_service._get_collection = lambda: SlowCollection(gold_collection)
+
+    def realtime():
+        return funding_service.get_realtime_funding_rate_data(
+            RealtimeFundingRateRequest(symbols="BTCUSDT,ETHUSDT")
+        )
+
+    baseline = [await _timed(realtime()) for _ in range(5)]
+
+    gold_task = asyncio.create_task(gold_service.get_gold_data(GoldDataRequest(day=3)))
+    await asyncio.sleep(0.05)
+    during = []
+    while not gold_task.done():
+        during.append(await _timed(realtime()))
+        await asyncio.sleep(0.05)
+    gold_response = await gold_task
+    return baseline, during, gold_response
+
+
+def test_realtime_latency_stays_flat_during_slow_gold_query():
+    baseline, during, gold_response = asyncio.run(_run_scenario())
+
+    # Realtime vẫn được phục vụ trong suốt thời gian query gold đang chạy
+    assert len(during) >= 5
+    assert max(during) < max(baseline) + 0.1
+    assert max(during) < SLOW_QUERY_SECONDS / 4
+    assert len(gold_response.data) == 500
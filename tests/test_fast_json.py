@@ -0,0 +1,83 @@
+"""`RowSchema.project_all` phải cho đúng kết quả của `Model(**row).model_dump()`,
+kể cả với row thiếu field hoặc có giá trị sai kiểu (row không hợp lệ bị bỏ qua).
+"""
+import pytest
+from pydantic import ValidationError
+
+from src.model.btc_dominance import BTCDominanceModel
+from src.model.etf_candlestick import ETFCandlestickModel
+from src.model.gold_data import GoldDataModel
+from src.utils.fast_json import RowSchema
+
+# Giá trị có thể gặp trong Mongo: số, chuỗi số, giá trị rỗng, sai kiểu
+VALUES = [
+    1.5,
+    2,
+    True,
+    None,
+    " 1.5 ",
+    "1e3",
+    "1.0",
+    "1.5",
+    "1_000",
+    "abc",
+    "",
+    "１",
+    b"7",
+    2.0**63,
+    float("inf"),
+    10**30,
+    [1],
+]
+
+
+def _expected(model, rows):
+    data = []
+    for row in rows:
+        try:
+            data.append(model(**row).model_dump())
+        except ValidationError:
+            continue
+    return data
+
+
+def _valid_row(model):
+    return {
+        name: "2025-09-10" if name == "datetime" else "BTC" if name == "symbol" else 1.0
+        for name in model.model_fields
+    }
+
+
+@pytest.mark.parametrize(
+    "model", [GoldDataModel, BTCDominanceModel, ETFCandlestickModel]
+)
+def test_matches_model_dump_for_each_field_value(model):
+    rows = []
+    for name in model.model_fields:
+        for value in VALUES:
+            rows.append({**_valid_row(model), name: value})
+
+    assert RowSchema(model).project_all(rows) == _expected(model, rows)
+
+
+@pytest.mark.parametrize(
+    "model", [GoldDataModel, BTCDominanceModel, ETFCandlestickModel]
+)
+def test_matches_model_dump_with_missing_and_extra_fields(model):
+    rows = []
+    for name in model.model_fields:
+        row = _valid_row(model)
+        del row[name]
+        rows.append(row)
+    rows.append({**_valid_row(model), "_id": "abc", "ts": "2025-09-10"})
+    rows.append({})
+
+    assert RowSchema(model).project_all(rows) == _expected(model, rows)
+
+
+def test_output_follows_model_field_order():
+    row = {"volume": "3", "close": 2, "datetime": "2025-09-10 07:00"}
+    [projected] = RowSchema(GoldDataModel).project_all([row])
+
+    assert list(projected) == list(GoldDataModel.model_fields)
+    assert projected == GoldDataModel(**row).model_dump()
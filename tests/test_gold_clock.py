@@ -0,0 +1,42 @@
+"""Gold: `ts` là giờ wall-clock local của server; `since`, watermark và id event
+SSE là epoch ms thật của giờ đó (không lệch theo UTC offset).
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from src.service.push_hub import gold_events
+from src.utils.time_fields import from_local_ms, local_ms, parse_time_value
+
+# 2025-09-10 07:00 giờ Việt Nam (UTC+7)
+LOCAL_TS = datetime(2025, 9, 10, 7, 0)
+EPOCH_MS = 1757462400000
+
+
+@pytest.fixture(autouse=True)
+def vietnam_time(monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Ho_Chi_Minh")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_local_ms_round_trip():
+    assert local_ms(LOCAL_TS) == EPOCH_MS
+    assert from_local_ms(EPOCH_MS) == LOCAL_TS
+
+
+def test_since_is_converted_to_local_time():
+    assert parse_time_value(str(EPOCH_MS), local=True) == LOCAL_TS
+    assert parse_time_value("2025-09-10T00:00:00Z", local=True) == LOCAL_TS
+    assert parse_time_value("2025-09-10T07:00:00+07:00", local=True) == LOCAL_TS
+    # Không có offset: đã là giờ local
+    assert parse_time_value("2025-09-10T07:00:00", local=True) == LOCAL_TS
+
+
+def test_sse_event_id_is_epoch_ms():
+    [(event_id, _)] = gold_events([{"datetime": "2025-09-10 07:00:00", "close": 1.0}])
+    assert event_id == EPOCH_MS
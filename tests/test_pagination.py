@@ -0,0 +1,108 @@
+"""Keyset pagination: trùng ts, trang cuối, và cursor của route/sort khác (400,
+không phải một trang rỗng)."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from src.dto.gold_data_dto import GoldDataRequest
+from src.service.gold_data_service import GoldDataService
+from src.utils.pagination import (
+    InvalidCursorError,
+    encode_cursor,
+    fetch_page,
+    keyset_filter,
+)
+from src.utils.time_fields import TS_FIELD
+
+SORT = [(TS_FIELD, -1), ("_id", -1)]
+FUNDING_SORT = [("funding_date", -1), ("funding_time", -1), ("_id", -1)]
+NOW = datetime.now().replace(second=0, microsecond=0)
+
+
+def _docs():
+    # 3 document mỗi phút: các document cùng ts chỉ phân biệt được bằng _id
+    return [
+        {"_id": ObjectId(), TS_FIELD: NOW - timedelta(minutes=minute), "close": 1.0}
+        for minute in range(4)
+        for _ in range(3)
+    ]
+
+
+async def _collection(docs):
+    collection = AsyncMongoMockClient()["test"]["gold"]
+    await collection.insert_many(docs)
+    return collection
+
+
+def _funding_cursor():
+    doc = {"funding_date": "2025-09-10", "funding_time": "08:00:00", "_id": ObjectId()}
+    return encode_cursor(doc, FUNDING_SORT)
+
+
+async def _all_pages(docs, limit):
+    collection = await _collection(docs)
+    pages, cursor = [], None
+    while True:
+        docs, cursor = await fetch_page(collection, {}, SORT, limit, cursor)
+        pages.append(docs)
+        if cursor is None:
+            return pages
+
+
+def test_keyset_filter_orders_by_each_sort_field():
+    ts, oid = NOW, ObjectId()
+    assert keyset_filter({TS_FIELD: ts, "_id": oid}, SORT) == {
+        "$or": [{TS_FIELD: {"$lt": ts}}, {TS_FIELD: ts, "_id": {"$lt": oid}}]
+    }
+    ascending = [(TS_FIELD, 1), ("_id", 1)]
+    assert keyset_filter({TS_FIELD: ts, "_id": oid}, ascending) == {
+        "$or": [{TS_FIELD: {"$gt": ts}}, {TS_FIELD: ts, "_id": {"$gt": oid}}]
+    }
+
+
+def test_pages_split_ties_on_ts_without_gaps_or_repeats():
+    docs = _docs()
+    pages = asyncio.run(_all_pages(docs, limit=5))
+
+    # Trang cắt giữa các document cùng ts: không mất, không lặp document nào
+    assert [len(page) for page in pages] == [5, 5, 2]
+    ids = [doc["_id"] for page in pages for doc in page]
+    expected = sorted(docs, key=lambda doc: (doc[TS_FIELD], doc["_id"]), reverse=True)
+    assert ids == [doc["_id"] for doc in expected]
+
+
+def test_last_page_has_no_next_cursor():
+    async def _run():
+        collection = await _collection(_docs())
+        return await fetch_page(collection, {}, SORT, 12)
+
+    docs, next_cursor = asyncio.run(_run())
+    assert len(docs) == 12
+    assert next_cursor is None
+
+
+def test_cursor_of_another_sort_is_rejected():
+    cursor = _funding_cursor()
+
+    async def _run():
+        collection = await _collection(_docs())
+        return await fetch_page(collection, {}, SORT, 5, cursor)
+
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(_run())
+
+
+def test_service_raises_mismatched_cursor_instead_of_empty_page():
+    cursor = _funding_cursor()
+
+    async def _run():
+        collection = await _collection(_docs())
+        service = GoldDataService()
+        service._get_collection = lambda: collection
+        return await service.get_gold_data(GoldDataRequest(day=1, cursor=cursor))
+
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(_run())
@@ -0,0 +1,72 @@
+"""`bucket_start` phải cho cùng đầu bucket với `$dateTrunc` trong `ohlc_pipeline`
+(rollup và bar gộp trong Python trộn với bar gộp trên Mongo).
+
+mongomock không có `$dateTrunc`: giá trị mong đợi theo đúng định nghĩa của
+MongoDB (bin đếm từ mốc 2000-01-01T00:00:00Z, tuần bắt đầu từ `startOfWeek`).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.resample import bucket_start, ohlc_pipeline
+
+# Mốc mặc định của $dateTrunc khi binSize > 1
+_REFERENCE = datetime(2000, 1, 1)
+
+
+def _date_trunc_hours(value, bin_hours):
+    bins = (value - _REFERENCE) // timedelta(hours=bin_hours)
+    return _REFERENCE + bins * timedelta(hours=bin_hours)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (datetime(2025, 9, 10, 13, 47, 12), datetime(2025, 9, 10, 12)),
+        (datetime(2025, 9, 10, 0, 0), datetime(2025, 9, 10, 0)),
+        (datetime(2025, 9, 10, 3, 59, 59, 999000), datetime(2025, 9, 10, 0)),
+        (datetime(2024, 2, 29, 23, 10), datetime(2024, 2, 29, 20)),
+        (datetime(2000, 1, 1, 5, 0), datetime(2000, 1, 1, 4)),
+    ],
+)
+def test_4h_buckets_match_date_trunc(value, expected):
+    assert bucket_start(value, "4h") == expected
+    assert bucket_start(value, "4h") == _date_trunc_hours(value, 4)
+
+
+def test_4h_buckets_over_a_week_of_minutes():
+    start = datetime(2025, 9, 7, 22, 0)
+    for minute in range(0, 7 * 24 * 60, 7):
+        value = start + timedelta(minutes=minute, seconds=13)
+        assert bucket_start(value, "4h") == _date_trunc_hours(value, 4)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        # Thứ Tư -> thứ Hai cùng tuần
+        (datetime(2025, 9, 10, 13, 47), datetime(2025, 9, 8)),
+        (datetime(2025, 9, 8, 0, 0), datetime(2025, 9, 8)),
+        # Chủ nhật vẫn thuộc tuần bắt đầu từ thứ Hai trước đó
+        (datetime(2025, 9, 14, 23, 59, 59), datetime(2025, 9, 8)),
+        # Tuần vắt qua năm mới
+        (datetime(2025, 1, 1, 8, 0), datetime(2024, 12, 30)),
+    ],
+)
+def test_1w_buckets_start_on_monday(value, expected):
+    assert bucket_start(value, "1w") == expected
+
+
+def test_pipeline_truncates_weeks_from_monday():
+    pipeline = ohlc_pipeline({}, "$ts", "ts", "1w", {})
+    bucket = pipeline[2]["$group"]["_id"]["$dateTrunc"]
+    assert bucket == {
+        "date": "$ts",
+        "unit": "week",
+        "binSize": 1,
+        "startOfWeek": "monday",
+    }
+
+    pipeline = ohlc_pipeline({}, "$ts", "ts", "4h", {})
+    bucket = pipeline[2]["$group"]["_id"]["$dateTrunc"]
+    assert bucket == {"date": "$ts", "unit": "hour", "binSize": 4}